@@ -0,0 +1,8 @@
+"""
+SolarCommon - Shared helpers for the solar PythonParts and automation scripts
+
+Imported from the PythonParts in this folder as well as from the external
+scripts in auto_generate/. property_pool, instancing and plan use the
+Allplan API; backend can substitute it with the pure-Python stand-ins in
+headless/.
+"""
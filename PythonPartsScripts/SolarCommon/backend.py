@@ -0,0 +1,145 @@
+"""
+Backend - Select the Allplan API or the headless stand-ins
+============================================================================
+The scripts import the Allplan modules by their usual names
+(NemAll_Python_Geometry, PythonPartUtil, ...). install_backend() decides
+what those names resolve to:
+
+    allplan   the real Allplan Python API (ImportError if not available)
+    headless  the pure-Python stand-ins from SolarCommon.headless
+    auto      Allplan when importable, headless otherwise
+
+The choice comes from the argument, the SOLAR_BACKEND environment variable,
+the backend already installed in this process, or the default, in that
+order. Call it before importing any Allplan module, e.g.:
+
+    from SolarCommon.backend import install_backend
+    install_backend()
+    import NemAll_Python_Geometry as AllplanGeo
+
+Inside Allplan nothing has to be called: the real modules are imported.
+============================================================================
+"""
+
+import importlib
+import os
+import sys
+import types
+
+ALLPLAN = "allplan"
+HEADLESS = "headless"
+AUTO = "auto"
+BACKENDS = (ALLPLAN, HEADLESS, AUTO)
+
+BACKEND_ENV_VAR = "SOLAR_BACKEND"
+
+# Allplan module name -> headless module (relative to SolarCommon.headless)
+API_MODULES = {
+    'NemAll_Python_Geometry': 'geometry',
+    'NemAll_Python_BaseElements': 'base_elements',
+    'NemAll_Python_BasisElements': 'basis_elements',
+    'NemAll_Python_IFW_ElementAdapter': 'element_adapter',
+}
+
+# PythonParts framework modules -> class provided by headless.framework
+FRAMEWORK_MODULES = {
+    'BuildingElement': 'BuildingElement',
+    'CreateElementResult': 'CreateElementResult',
+    'PythonPartUtil': 'PythonPartUtil',
+    'TypeCollections.ModelEleList': 'ModelEleList',
+}
+
+_active_backend = None
+
+
+def install_backend(name=None, default=AUTO):
+    """
+    Make the Allplan module names resolve to the selected backend
+
+    Args:
+        name (str):     'allplan', 'headless' or 'auto', see module docstring
+        default (str):  Used when neither name nor SOLAR_BACKEND is given
+                        and no backend is installed yet
+
+    Returns:
+        str: Installed backend, 'allplan' or 'headless'
+
+    Raises:
+        ValueError:  Unknown backend name
+        ImportError: 'allplan' requested but the Allplan API is not available
+    """
+    global _active_backend
+
+    name = (name or os.environ.get(BACKEND_ENV_VAR) or _active_backend or default).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {', '.join(BACKENDS)}")
+
+    if name == _active_backend or (name == AUTO and _active_backend is not None):
+        return _active_backend
+    if _active_backend is not None:
+        raise ImportError(f"Backend '{_active_backend}' is already installed, cannot switch to '{name}'")
+
+    if name in (ALLPLAN, AUTO):
+        try:
+            importlib.import_module('NemAll_Python_Geometry')
+            name = ALLPLAN
+        except ImportError:
+            if name == ALLPLAN:
+                raise
+            name = HEADLESS
+
+    if name == HEADLESS:
+        _register_headless_modules()
+
+    _active_backend = name
+    return name
+
+
+def active_backend():
+    """Installed backend ('allplan' or 'headless'), None before install_backend()"""
+    return _active_backend
+
+
+def is_headless():
+    """True if the headless stand-ins are installed"""
+    return _active_backend == HEADLESS
+
+
+def _register_headless_modules():
+    """Register the stand-ins under the Allplan module names"""
+    from .headless import framework
+
+    for module_name, headless_name in API_MODULES.items():
+        sys.modules[module_name] = importlib.import_module(f'.headless.{headless_name}', __package__)
+
+    for module_name, class_name in FRAMEWORK_MODULES.items():
+        module = types.ModuleType(module_name)
+        setattr(module, class_name, getattr(framework, class_name))
+        sys.modules[module_name] = module
+
+        package_name, _, child = module_name.rpartition('.')
+        if package_name:
+            package = sys.modules.get(package_name) or types.ModuleType(package_name)
+            package.__path__ = getattr(package, '__path__', [])
+            setattr(package, child, module)
+            sys.modules[package_name] = package
+
+# ============================================================================
+# BUILD ELEMENT
+# ============================================================================
+
+def make_build_element(**values):
+    """
+    Build a BuildingElement for calling create_element headless
+
+    Every keyword becomes a parameter with a .value attribute, like the
+    parameters defined in the .pyp palette:
+
+        build_ele = make_build_element(NumRows=4, NumCols=10, ...)
+
+    Returns:
+        BuildingElement: Headless building element
+    """
+    from .headless.framework import BuildingElement
+
+    return BuildingElement(**values)
@@ -0,0 +1,195 @@
+"""
+Carport Bays - One roof layout repeated along a row
+============================================================================
+A carport row is a series of identical bays. A project with a "bays" block
+(or the SolarCarportRoof PythonPart with more than one bay) repeats its roof
+along X every `pitch` mm:
+
+    "bays": {"count": 40, "pitch": 4500,
+             "overrides": [{"bay": 0, "modules": {"cols": 3}},
+                           {"bay": 12, "skip": true},
+                           {"bay": 39, "roof": {"createSecondSide": false}}]}
+
+An override changes some parameters of one bay (modules, gaps, plate, roof,
+colors; bay 0 is the first one) or leaves it empty ("skip", e.g. for a
+driveway). Bays with the same parameters are one bay type: its layout is
+computed once and every bay of the type is a translated copy, so the
+layouts kept in memory grow with the number of types, not of bays.
+============================================================================
+"""
+
+import json
+
+OVERRIDE_KEYS = ('modules', 'gaps', 'plate', 'roof', 'colors')
+
+# Palette override keys -> (section, key) in the project parameters
+PALETTE_KEYS = {
+    'rows': ('modules', 'rows'),
+    'cols': ('modules', 'cols'),
+    'secondSide': ('roof', 'createSecondSide'),
+    'angle': ('roof', 'angle'),
+    'ridgeHeight': ('roof', 'ridgeHeight'),
+}
+BOOLEAN_KEYS = {'secondSide'}
+INTEGER_KEYS = {'rows', 'cols'}
+
+
+class BayType:
+    """
+    Bays of a row that share the same parameters
+
+    Attributes:
+        params (dict):    Parameters of these bays, the project itself for
+                          bays without override
+        bays (list):      Bay indices, 0 = first bay
+        offsets (list):   X offset of every bay (mm)
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.bays = []
+        self.offsets = []
+
+    @property
+    def count(self):
+        """Number of bays of this type"""
+        return len(self.bays)
+
+
+def apply_override(params, override):
+    """
+    Parameters of a bay with an override
+
+    Args:
+        params (dict):    Project parameters
+        override (dict):  Override of the bay, e.g. {"bay": 3, "modules": {"cols": 2}}
+
+    Returns:
+        dict: Copy of the project parameters without "bays", each overridden
+        section merged key by key
+    """
+    bay = {key: value for key, value in params.items() if key != 'bays'}
+    for key in OVERRIDE_KEYS:
+        if key in override:
+            bay[key] = {**params.get(key, {}), **override[key]}
+    return bay
+
+
+def bay_types(params):
+    """
+    Group the bays of a project by their parameters
+
+    Args:
+        params (dict): Project parameters, without "bays" for a single bay
+
+    Returns:
+        list: BayType in order of their first bay, skipped bays left out
+    """
+    bays = params.get('bays')
+    if not bays:
+        single = BayType(params)
+        single.bays.append(0)
+        single.offsets.append(0.0)
+        return [single]
+
+    pitch = bays['pitch']
+    overrides = {override['bay']: override for override in bays.get('overrides', [])}
+
+    types = {}
+    for bay in range(bays['count']):
+        override = overrides.get(bay, {})
+        if override.get('skip', False):
+            continue
+        changes = {key: override[key] for key in OVERRIDE_KEYS if key in override}
+        key = json.dumps(changes, sort_keys=True) if changes else None
+        bay_type = types.get(key)
+        if bay_type is None:
+            bay_type = types[key] = BayType(apply_override(params, override) if changes else params)
+        bay_type.bays.append(bay)
+        bay_type.offsets.append(bay * pitch)
+    return list(types.values())
+
+
+def side_count(params):
+    """Number of roof sides of a project or bay (1 or 2)"""
+    return 2 if params.get('roof', {}).get('createSecondSide', False) else 1
+
+
+def bay_module_count(params):
+    """
+    Number of modules of all bays and roof sides of a project
+
+    Args:
+        params (dict): Project parameters
+
+    Returns:
+        int: Module count
+    """
+    return sum(bay_type.count * side_count(bay_type.params) *
+               bay_type.params['modules']['rows'] * bay_type.params['modules']['cols']
+               for bay_type in bay_types(params))
+
+
+def bay_row_count(params):
+    """
+    Number of module rows of all bays and roof sides of a project
+
+    Args:
+        params (dict): Project parameters
+
+    Returns:
+        int: Row count
+    """
+    return sum(bay_type.count * side_count(bay_type.params) * bay_type.params['modules']['rows']
+               for bay_type in bay_types(params))
+
+
+def parse_bay_overrides(text):
+    """
+    Parse the bay overrides of the palette
+
+    "2: cols=3, secondSide=0; 7: skip" changes the column count and removes
+    the second side of bay 2 (0 = first bay) and leaves bay 7 empty. Keys are
+    rows, cols, secondSide, angle and ridgeHeight.
+
+    Args:
+        text (str): Overrides separated by ';'
+
+    Returns:
+        list: Overrides in the JSON config format, empty if the text is empty
+
+    Raises:
+        ValueError: If an override is malformed
+    """
+    overrides = []
+    for item in (text or "").split(';'):
+        if not item.strip():
+            continue
+        bay, _, changes = item.partition(':')
+        try:
+            override = {'bay': int(bay)}
+        except ValueError:
+            raise ValueError(f"Invalid bay override '{item.strip()}', expected 'bay: key=value, ...'") from None
+        for change in changes.split(','):
+            change = change.strip()
+            if not change:
+                continue
+            if change == 'skip':
+                override['skip'] = True
+                continue
+            name, _, value = (part.strip() for part in change.partition('='))
+            if name not in PALETTE_KEYS:
+                raise ValueError(f"Unknown bay override key '{name}', expected skip or one of "
+                                 f"{', '.join(PALETTE_KEYS)}")
+            try:
+                number = float(value)
+            except ValueError:
+                raise ValueError(f"Invalid value for {name} in bay override '{item.strip()}'") from None
+            section, key = PALETTE_KEYS[name]
+            if name in BOOLEAN_KEYS:
+                number = bool(number)
+            elif name in INTEGER_KEYS:
+                number = int(number)
+            override.setdefault(section, {})[key] = number
+        overrides.append(override)
+    return overrides
@@ -0,0 +1,289 @@
+"""
+Bill of Materials - Quantities computed from the layout parameters
+============================================================================
+Counts, lengths, areas and weights of the parts SystemCreator and
+auto_generate_solar.py would build, computed with the same formulas as the
+layout (fit_grid, pack_panels, compute_array_layout) but without any
+geometry. A grid costs O(1), so quotes for thousands of configurations need
+neither Allplan nor the 3D model. A mixed-orientation array is the
+exception: system_bom runs the pack_panels search (memoized, up to its time
+budget), which is O(n^2) in the surface size and limits it to about a
+thousand configurations per minute. When the blocks are already known (the
+model is being built), blocks_bom costs O(blocks).
+
+Items:
+    module   solar modules: count, area, weight
+    rung     bars under the left/right module edges, 2 per module
+    profile  horizontal profiles, one per row line of a block
+    gutter   vertical bars at the left/right of a block
+    plate    support plate of a generated project
+
+Lengths are in m, areas in m², weights in kg. Merging collinear members
+(MergeMembers) changes the model, not the quantities: rungs are counted as
+the pieces under the modules.
+
+Export:
+    write_bom([bom, ...], "quote.csv")    one line per project and item
+    write_bom([bom, ...], "quote.json")   items and totals per project
+============================================================================
+"""
+
+import csv
+import json
+import os
+
+from .bays import bay_types, side_count
+from .packing import pack_panels, DEFAULT_TIME_BUDGET
+
+MODULE_WEIGHT = 11.0       # kg/m² of module area
+ALUMINIUM_DENSITY = 2700   # kg/m³, solid rungs, profiles and gutters of the model
+STEEL_DENSITY = 7850       # kg/m³, support plate
+ITEM_40X40_WEIGHT = 1.5    # kg/m, real ITEM 40x40 profile (AutoArray_full_real_profiles)
+
+CSV_FIELDS = ['project', 'item', 'count', 'length_m', 'area_m2', 'weight_kg']
+
+# ============================================================================
+# BILL OF MATERIALS
+# ============================================================================
+
+class BomItem:
+    """
+    One line of a bill of materials
+
+    Attributes:
+        item (str):      Part name ('module', 'rung', ...)
+        count (int):     Pieces
+        length (float):  Total length (m), 0 for parts counted by area
+        area (float):    Total area (m²)
+        weight (float):  Total weight (kg)
+    """
+
+    def __init__(self, item, count, length=0.0, area=0.0, weight=0.0):
+        self.item = item
+        self.count = count
+        self.length = length
+        self.area = area
+        self.weight = weight
+
+    def to_dict(self):
+        return {'item': self.item, 'count': self.count,
+                'length_m': round(self.length, 3), 'area_m2': round(self.area, 3),
+                'weight_kg': round(self.weight, 2)}
+
+
+class BillOfMaterials:
+    """Parts of one project or PythonPart"""
+
+    def __init__(self, name="", items=None):
+        """
+        Initialisation of class BillOfMaterials
+
+        Args:
+            name (str):    Project name
+            items (list):  BomItems
+        """
+        self.name = name
+        self.items = items or []
+
+    def add(self, item, count, length=0.0, area=0.0, weight=0.0):
+        """Add to the line of a part, created on first use"""
+        for line in self.items:
+            if line.item == item:
+                line.count += count
+                line.length += length
+                line.area += area
+                line.weight += weight
+                return line
+        line = BomItem(item, count, length, area, weight)
+        self.items.append(line)
+        return line
+
+    def get(self, item):
+        """Line of a part, an empty one if the part is not used"""
+        for line in self.items:
+            if line.item == item:
+                return line
+        return BomItem(item, 0)
+
+    @property
+    def module_count(self):
+        return self.get('module').count
+
+    @property
+    def total_weight(self):
+        """Weight of all parts (kg)"""
+        return sum(line.weight for line in self.items)
+
+    def to_dict(self):
+        return {'project': self.name,
+                'items': [line.to_dict() for line in self.items],
+                'total_weight_kg': round(self.total_weight, 2)}
+
+# ============================================================================
+# QUANTITIES
+# ============================================================================
+
+def _member_weight(length, section_width, section_height):
+    """Weight of a solid aluminium bar, length in m and section in mm"""
+    return length * section_width * section_height * 1e-6 * ALUMINIUM_DENSITY
+
+
+def _grid_size(surface_width, surface_height, panel_width, panel_height, spacing):
+    """(rows, cols) of fit_grid, without its cell arrays"""
+    cols = max(0, int((surface_width + spacing) // (panel_width + spacing)))
+    rows = max(0, int((surface_height + spacing) // (panel_height + spacing)))
+    return rows, cols
+
+
+def system_bom(surface_width, surface_height, panel_width, panel_height, spacing,
+               panel_thickness, gutter_width, gutter_height, profile_thickness,
+               rung_thickness, mixed_orientation=False, time_budget=DEFAULT_TIME_BUDGET,
+               profile_weight=None, name=""):
+    """
+    Bill of materials of a SystemCreator array
+
+    Args:
+        surface_width, surface_height (float): Available surface (mm)
+        panel_width, panel_height (float):      Panel size, orientation applied (mm)
+        spacing, panel_thickness (float):       As in SystemCreator (mm)
+        gutter_width, gutter_height (float):    Gutter section (mm)
+        profile_thickness (float):              Square profile section (mm)
+        rung_thickness (float):                 Rung width, its height is panel_thickness (mm)
+        mixed_orientation (bool):               Blocks of pack_panels instead of the grid
+        time_budget (float):                    Seconds of the packing search,
+                                                None for no limit
+        profile_weight (float):                 Profile weight (kg/m), solid section if None
+        name (str):                             Project name
+
+    Returns:
+        BillOfMaterials: module, rung, profile and gutter lines
+    """
+    if mixed_orientation:
+        blocks = pack_panels(surface_width, surface_height, panel_width,
+                             panel_height, spacing, time_budget).blocks
+    else:
+        rows, cols = _grid_size(surface_width, surface_height, panel_width, panel_height, spacing)
+        blocks = [(rows, cols, panel_width, panel_height)]
+    return blocks_bom(blocks, spacing, panel_thickness, gutter_width, gutter_height,
+                      profile_thickness, rung_thickness, profile_weight, name)
+
+
+def blocks_bom(blocks, spacing, panel_thickness, gutter_width, gutter_height,
+               profile_thickness, rung_thickness, profile_weight=None, name=""):
+    """
+    Bill of materials of the blocks of a SystemCreator array
+
+    Args:
+        blocks (list):                          PanelBlocks (e.g. of a packing) or
+                                                (rows, cols, panel_width, panel_height)
+        spacing, panel_thickness (float):       As in SystemCreator (mm)
+        gutter_width, gutter_height (float):    Gutter section (mm)
+        profile_thickness (float):              Square profile section (mm)
+        rung_thickness (float):                 Rung width, its height is panel_thickness (mm)
+        profile_weight (float):                 Profile weight (kg/m), solid section if None
+        name (str):                             Project name
+
+    Returns:
+        BillOfMaterials: module, rung, profile and gutter lines
+    """
+    blocks = [block if isinstance(block, tuple) else
+              (block.grid.rows, block.grid.cols, block.panel_width, block.panel_height)
+              for block in blocks]
+
+    bom = BillOfMaterials(name)
+    for item in ('module', 'rung', 'profile', 'gutter'):
+        bom.add(item, 0)
+
+    for rows, cols, block_width, block_height in blocks:
+        if not rows or not cols:
+            continue
+        used_width = (cols * block_width + (cols - 1) * spacing) / 1000
+        used_height = (rows * block_height + (rows - 1) * spacing) / 1000
+        modules = rows * cols
+        module_area = modules * block_width * block_height * 1e-6
+
+        rung_length = 2 * modules * block_height / 1000
+        profile_length = (rows + 1) * used_width
+        gutter_length = 2 * used_height
+
+        bom.add('module', modules, area=module_area, weight=module_area * MODULE_WEIGHT)
+        bom.add('rung', 2 * modules, rung_length,
+                weight=_member_weight(rung_length, rung_thickness, panel_thickness))
+        bom.add('profile', rows + 1, profile_length,
+                weight=(profile_length * profile_weight if profile_weight is not None else
+                        _member_weight(profile_length, profile_thickness, profile_thickness)))
+        bom.add('gutter', 2, gutter_length,
+                weight=_member_weight(gutter_length, gutter_width, gutter_height))
+    return bom
+
+
+def project_bom(project):
+    """
+    Bill of materials of an auto_generate_solar.py project
+
+    Args:
+        project (dict): Project parameters (see solar_config.json)
+
+    Returns:
+        BillOfMaterials: module and plate lines, all roof sides and bays included
+    """
+    bom = BillOfMaterials(project.get('name', ""))
+    for bay_type in bay_types(project):
+        params = bay_type.params
+        modules = params['modules']
+        rows, cols = modules['rows'], modules['cols']
+        width, height = modules['width'], modules['height']
+        row_gap, col_gap = params['gaps']['row'], params['gaps']['col']
+        copies = bay_type.count * side_count(params)
+
+        module_area = copies * rows * cols * width * height * 1e-6
+        plate_area = copies * (cols * width + (cols - 1) * col_gap) * (rows * height + (rows - 1) * row_gap) * 1e-6
+        plate_volume = plate_area * params['plate']['thickness'] / 1000
+
+        bom.add('module', copies * rows * cols, area=module_area, weight=module_area * MODULE_WEIGHT)
+        bom.add('plate', copies, area=plate_area, weight=plate_volume * STEEL_DENSITY)
+    return bom
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def write_csv(boms, csv_file):
+    """Write one line per project and item"""
+    with open(csv_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for bom in boms:
+            for line in bom.items:
+                writer.writerow(dict(line.to_dict(), project=bom.name))
+
+
+def write_json(boms, json_file):
+    """Write the items and total weight of every project"""
+    boms = [bom.to_dict() for bom in boms]
+    with open(json_file, 'w') as f:
+        json.dump({'projects': boms,
+                   'total_weight_kg': round(sum(bom['total_weight_kg'] for bom in boms), 2)},
+                  f, indent=1)
+
+
+def write_bom(boms, bom_file):
+    """
+    Export bills of materials, the format is taken from the extension
+
+    Args:
+        boms (iterable): BillOfMaterials
+        bom_file (str):  .csv or .json file
+
+    Returns:
+        int: Number of projects written
+
+    Raises:
+        ValueError: If the extension is neither .csv nor .json
+    """
+    extension = os.path.splitext(bom_file)[1].lower()
+    if extension not in ('.csv', '.json'):
+        raise ValueError(f"Unsupported BOM format '{extension}', use .csv or .json")
+    boms = list(boms)
+    (write_csv if extension == '.csv' else write_json)(boms, bom_file)
+    return len(boms)
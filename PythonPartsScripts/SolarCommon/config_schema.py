@@ -0,0 +1,459 @@
+"""
+Config Schema - Compiled validator for solar configs
+============================================================================
+The config format is described once as a schema (CONFIG_SCHEMA) and
+compiled into nested check functions on first use. Validation is a single
+pass over the config that collects every error with its JSON path instead
+of stopping at the first one:
+
+    $.projects[3].modules.width: must be a number > 0, got -1000
+    $.projects[7].colors: missing required key 'pv'
+
+Unknown keys are accepted, so newer configs still validate with older
+scripts.
+============================================================================
+"""
+
+from functools import lru_cache
+
+from .bays import apply_override
+from .layout import FRAME_THICKNESS
+from .lod import LEVELS
+
+MAX_STANDARD_GRID = 20  # rows/cols limit unless the project sets "largeArray"
+MAX_COLOR_ID = 256      # Allplan color IDs are 1-256
+MAX_REPORTED_ERRORS = 50
+
+# ============================================================================
+# ERRORS
+# ============================================================================
+
+class ValidationError:
+    """One schema violation"""
+
+    __slots__ = ('path', 'message')
+
+    def __init__(self, path, message):
+        self.path = path
+        self.message = message
+
+    def __str__(self):
+        return f"{self.path}: {self.message}"
+
+    def __repr__(self):
+        return f"ValidationError({self.path!r}, {self.message!r})"
+
+
+class ConfigError(ValueError):
+    """Invalid config, carries all ValidationErrors"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        shown = "\n".join(f"  {error}" for error in errors[:MAX_REPORTED_ERRORS])
+        more = len(errors) - MAX_REPORTED_ERRORS
+        if more > 0:
+            shown += f"\n  ... and {more} more"
+        super().__init__(f"{len(errors)} error(s) in config:\n{shown}")
+
+# ============================================================================
+# SCHEMA TYPES
+# ============================================================================
+# Each type compiles to check(value, path, errors), appending ValidationErrors.
+
+def _describe(value):
+    text = repr(value)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+
+class Number:
+    """Int or float (bool excluded) within optional bounds"""
+
+    def __init__(self, minimum=None, maximum=None, exclusive_minimum=False,
+                 exclusive_maximum=False, integer=False):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.exclusive_minimum = exclusive_minimum
+        self.exclusive_maximum = exclusive_maximum
+        self.integer = integer
+
+    def describe(self):
+        text = "an integer" if self.integer else "a number"
+        bounds = []
+        if self.minimum is not None:
+            bounds.append(f"{'>' if self.exclusive_minimum else '>='} {self.minimum}")
+        if self.maximum is not None:
+            bounds.append(f"{'<' if self.exclusive_maximum else '<='} {self.maximum}")
+        return f"{text} {' and '.join(bounds)}".rstrip()
+
+    def compile(self):
+        types = (int,) if self.integer else (int, float)
+        low, high = self.minimum, self.maximum
+        low_exclusive, high_exclusive = self.exclusive_minimum, self.exclusive_maximum
+        expected = f"must be {self.describe()}"
+
+        def check(value, path, errors):
+            if (type(value) not in types or
+                    value != value or  # NaN
+                    (low is not None and (value <= low if low_exclusive else value < low)) or
+                    (high is not None and (value >= high if high_exclusive else value > high))):
+                errors.append(ValidationError(path, f"{expected}, got {_describe(value)}"))
+        return check
+
+
+class Boolean:
+    """true / false"""
+
+    def compile(self):
+        def check(value, path, errors):
+            if type(value) is not bool:
+                errors.append(ValidationError(path, f"must be true or false, got {_describe(value)}"))
+        return check
+
+
+class String:
+    """String, non-empty by default"""
+
+    def __init__(self, min_length=1):
+        self.min_length = min_length
+
+    def compile(self):
+        min_length = self.min_length
+
+        def check(value, path, errors):
+            if type(value) is not str or len(value) < min_length:
+                errors.append(ValidationError(
+                    path, f"must be a string of at least {min_length} character(s), got {_describe(value)}"))
+        return check
+
+
+class Choice:
+    """One of a fixed set of strings"""
+
+    def __init__(self, *choices):
+        self.choices = choices
+
+    def compile(self):
+        choices = frozenset(self.choices)
+        expected = f"must be one of {', '.join(repr(c) for c in self.choices)}"
+
+        def check(value, path, errors):
+            if type(value) is not str or value not in choices:
+                errors.append(ValidationError(path, f"{expected}, got {_describe(value)}"))
+        return check
+
+
+class AnyOf:
+    """Value matching at least one of several types"""
+
+    def __init__(self, *options, description):
+        self.options = options
+        self.description = description
+
+    def compile(self):
+        checks = [option.compile() for option in self.options]
+        expected = f"must be {self.description}"
+
+        def check(value, path, errors):
+            for option_check in checks:
+                option_errors = []
+                option_check(value, path, option_errors)
+                if not option_errors:
+                    return
+            errors.append(ValidationError(path, f"{expected}, got {_describe(value)}"))
+        return check
+
+
+class Object:
+    """
+    JSON object with required and optional fields
+
+    Rules are extra functions rule(value, path, errors) run after the fields
+    for checks across fields; they skip values of the wrong type, which the
+    field checks already report.
+    """
+
+    def __init__(self, required=None, optional=None, rules=()):
+        self.required = required or {}
+        self.optional = optional or {}
+        self.rules = rules
+
+    def compile(self):
+        required = [(key, spec.compile()) for key, spec in self.required.items()]
+        optional = [(key, spec.compile()) for key, spec in self.optional.items()]
+        rules = self.rules
+
+        def check(value, path, errors):
+            if type(value) is not dict:
+                errors.append(ValidationError(path, f"must be an object, got {_describe(value)}"))
+                return
+            for key, field_check in required:
+                if key in value:
+                    field_check(value[key], f"{path}.{key}", errors)
+                else:
+                    errors.append(ValidationError(path, f"missing required key '{key}'"))
+            for key, field_check in optional:
+                if key in value:
+                    field_check(value[key], f"{path}.{key}", errors)
+            for rule in rules:
+                rule(value, path, errors)
+        return check
+
+
+class Array:
+    """JSON array of items of one type"""
+
+    def __init__(self, items, rules=()):
+        self.items = items
+        self.rules = rules
+
+    def compile(self):
+        item_check = self.items.compile()
+        rules = self.rules
+
+        def check(value, path, errors):
+            if type(value) is not list:
+                errors.append(ValidationError(path, f"must be an array, got {_describe(value)}"))
+                return
+            for index, item in enumerate(value):
+                item_check(item, f"{path}[{index}]", errors)
+            for rule in rules:
+                rule(value, path, errors)
+        return check
+
+# ============================================================================
+# SOLAR CONFIG SCHEMA
+# ============================================================================
+
+def _grid_limit(project, path, errors):
+    """rows/cols above MAX_STANDARD_GRID need "largeArray": true"""
+    modules = project.get('modules')
+    if project.get('largeArray') is True or type(modules) is not dict:
+        return
+    for key in ('rows', 'cols'):
+        value = modules.get(key)
+        if type(value) is int and value > MAX_STANDARD_GRID:
+            errors.append(ValidationError(
+                f"{path}.modules.{key}",
+                f"must be <= {MAX_STANDARD_GRID} (set \"largeArray\": true for bigger arrays), "
+                f"got {value}"))
+
+
+def _pv_fits_frame(project, path, errors):
+    """The PV layer sits on the frame: the module must be thicker than the frame"""
+    modules = project.get('modules')
+    thickness = modules.get('thickness') if type(modules) is dict else None
+    if type(thickness) in (int, float) and 0 < thickness <= FRAME_THICKNESS:
+        errors.append(ValidationError(
+            f"{path}.modules.thickness",
+            f"must be > {FRAME_THICKNESS} (frame thickness), got {thickness}"))
+
+
+def _bays_fit(project, path, errors):
+    """
+    Each override names an existing bay once, overridden grids keep the
+    project limits and every bay is at most as wide as the pitch
+    """
+    bays = project.get('bays')
+    if type(bays) is not dict or type(bays.get('overrides', [])) is not list:
+        return
+    count, pitch = bays.get('count'), bays.get('pitch')
+    bays_path = f"{path}.bays"
+
+    def plate_width(params):
+        modules, gaps = params.get('modules'), params.get('gaps')
+        try:
+            width = modules['cols'] * modules['width'] + (modules['cols'] - 1) * gaps['col']
+        except (KeyError, TypeError):
+            return None
+        return width if type(width) in (int, float) else None
+
+    first_index = {}
+    widths = [(plate_width(project), f"{path}.modules")]
+    for index, override in enumerate(bays.get('overrides', [])):
+        override_path = f"{bays_path}.overrides[{index}]"
+        bay = override.get('bay') if type(override) is dict else None
+        if type(bay) is not int:
+            continue
+        if type(count) is int and bay >= count:
+            errors.append(ValidationError(f"{override_path}.bay",
+                                          f"must be < bays.count ({count}), got {bay}"))
+        if bay in first_index:
+            errors.append(ValidationError(f"{override_path}.bay",
+                                          f"duplicate of {bays_path}.overrides[{first_index[bay]}].bay {bay}"))
+        else:
+            first_index[bay] = index
+        if override.get('skip') is True:
+            continue
+        try:
+            bay_params = apply_override(project, override)
+        except TypeError:
+            continue  # a section is not an object, reported by the field checks
+        if type(override.get('modules')) is dict:
+            _grid_limit(dict(bay_params, modules=override['modules']), override_path, errors)
+            _pv_fits_frame(dict(bay_params, modules=override['modules']), override_path, errors)
+        widths.append((plate_width(bay_params), override_path))
+
+    widths = [(width, width_path) for width, width_path in widths if width is not None]
+    if type(pitch) not in (int, float) or pitch <= 0 or not widths:
+        return
+    width, width_path = max(widths, key=lambda item: item[0])
+    if width > pitch:
+        errors.append(ValidationError(f"{bays_path}.pitch",
+                                      f"must be >= the widest plate, {width:g} at {width_path}, "
+                                      f"got {pitch}"))
+
+
+def _unique_name(project, index, path, first_index, errors):
+    name = project.get('name') if type(project) is dict else None
+    if type(name) is not str:
+        return
+    if name in first_index:
+        errors.append(ValidationError(f"{path}[{index}].name",
+                                      f"duplicate of {path}[{first_index[name]}].name {name!r}"))
+    else:
+        first_index[name] = index
+
+
+def _unique_names(projects, path, errors):
+    first_index = {}
+    for index, project in enumerate(projects):
+        _unique_name(project, index, path, first_index, errors)
+
+
+COLOR_ID = Number(1, MAX_COLOR_ID, integer=True)
+LENGTH = Number(0, exclusive_minimum=True)   # mm, > 0
+DISTANCE = Number(0)                          # mm, >= 0
+COORDINATE = Number()                         # mm
+
+ROOF = Object(optional={
+    'createSecondSide': Boolean(),
+    'angle': Number(0, 90, exclusive_maximum=True),
+    'ridgeHeight': DISTANCE,
+})
+
+PROJECT_SCHEMA = Object(
+    required={
+        'name': String(),
+        'modules': Object(required={
+            'rows': Number(1, integer=True),
+            'cols': Number(1, integer=True),
+            'width': LENGTH,
+            'height': LENGTH,
+            'thickness': LENGTH,
+        }),
+        'gaps': Object(required={'row': DISTANCE, 'col': DISTANCE}),
+        'plate': Object(required={'thickness': LENGTH, 'offset': COORDINATE}),
+        'roof': ROOF,
+        'placement': Object(required={'x': COORDINATE, 'y': COORDINATE, 'z': COORDINATE}),
+    },
+    optional={
+        'enabled': Boolean(),
+        'largeArray': Boolean(),
+        'lod': Choice(*LEVELS),
+        'colors': Object(required={'plate': COLOR_ID, 'frame': COLOR_ID, 'pv': COLOR_ID}),
+        'bays': Object(
+            required={'count': Number(1, integer=True), 'pitch': LENGTH},
+            optional={'overrides': Array(Object(
+                required={'bay': Number(0, integer=True)},
+                optional={
+                    'skip': Boolean(),
+                    'modules': Object(optional={
+                        'rows': Number(1, integer=True),
+                        'cols': Number(1, integer=True),
+                        'width': LENGTH,
+                        'height': LENGTH,
+                        'thickness': LENGTH,
+                    }),
+                    'gaps': Object(optional={'row': DISTANCE, 'col': DISTANCE}),
+                    'plate': Object(optional={'thickness': LENGTH, 'offset': COORDINATE}),
+                    'roof': ROOF,
+                    'colors': Object(optional={'plate': COLOR_ID, 'frame': COLOR_ID, 'pv': COLOR_ID}),
+                }))},
+        ),
+    },
+    rules=(_grid_limit, _pv_fits_frame, _bays_fit),
+)
+
+CONFIG_SCHEMA = Object(
+    required={'projects': Array(PROJECT_SCHEMA, rules=(_unique_names,))},
+    optional={
+        'version': AnyOf(String(), Number(), description="a string or a number"),
+        'metadata': Object(),
+    },
+)
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def compiled_validator(schema_name='config'):
+    """
+    Return the compiled check function of a schema (compiled once per process)
+
+    Args:
+        schema_name (str): 'config' for a whole config, 'project' for one project
+
+    Returns:
+        function: check(value, path, errors)
+    """
+    schema = {'config': CONFIG_SCHEMA, 'project': PROJECT_SCHEMA}[schema_name]
+    return schema.compile()
+
+
+def check_config(config):
+    """
+    Validate a whole config in one pass
+
+    Args:
+        config (dict): Loaded configuration
+
+    Returns:
+        list: ValidationErrors, empty if the config is valid
+    """
+    errors = []
+    compiled_validator('config')(config, "$", errors)
+    return errors
+
+
+def check_project(project, index=None):
+    """
+    Validate a single project (e.g. one read from a config stream)
+
+    Args:
+        project (dict): Project configuration
+        index (int):    Position in the config, used in the error paths
+
+    Returns:
+        list: ValidationErrors, empty if the project is valid
+    """
+    errors = []
+    path = "$" if index is None else f"$.projects[{index}]"
+    compiled_validator('project')(project, path, errors)
+    return errors
+
+
+def unique_projects(projects):
+    """
+    Pass streamed projects through, rejecting a name used by an earlier one
+
+    check_project() only sees one project; this applies the unique name rule
+    of check_config() to a stream. Apply it before dropping disabled
+    projects, so the error paths are the positions in the config.
+
+    Args:
+        projects (iterable): Project configurations, in config order
+
+    Yields:
+        dict: The projects, unchanged
+
+    Raises:
+        ConfigError: At the first project whose name was already used
+    """
+    first_index = {}
+    for index, project in enumerate(projects):
+        errors = []
+        _unique_name(project, index, "$.projects", first_index, errors)
+        if errors:
+            raise ConfigError(errors)
+        yield project
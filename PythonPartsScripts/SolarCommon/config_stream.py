@@ -0,0 +1,206 @@
+"""
+Config Stream - Read solar configs one project at a time
+============================================================================
+json.load keeps a whole config in memory before the first project can be
+generated. ConfigStream yields the projects one by one while the file is
+read in chunks, so memory stays flat with the config size and generation
+starts as soon as the first project has been read.
+
+Two formats are supported:
+
+    .json            the usual {"version": ..., "projects": [...]} file,
+                     parsed incrementally (one project decoded at a time)
+    .jsonl/.ndjson   JSON Lines: one project object per line, empty lines
+                     are skipped
+
+Top-level keys other than "projects" (version, metadata, ...) are collected
+in ConfigStream.header: keys before "projects" are available as soon as the
+first project is yielded, keys after it once the stream is exhausted.
+============================================================================
+"""
+
+import json
+import os
+
+CHUNK_SIZE = 1 << 20  # characters read per chunk
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class ConfigStream:
+    """Iterator over the projects of a config file"""
+
+    def __init__(self, config_file, chunk_size=CHUNK_SIZE):
+        """
+        Initialisation of class ConfigStream
+
+        Args:
+            config_file (str): Path to a .json or .jsonl config
+            chunk_size (int):  Characters read from the file at a time
+
+        Raises:
+            FileNotFoundError: If the config file doesn't exist
+        """
+        if not os.path.exists(config_file):
+            raise FileNotFoundError(f"Config file not found: {config_file}")
+
+        self.config_file = config_file
+        self.chunk_size = chunk_size
+        self.header = {}
+        self.project_count = 0
+        self.json_lines = config_file.lower().endswith(JSON_LINES_EXTENSIONS)
+
+    def __iter__(self):
+        reader = self._read_json_lines if self.json_lines else self._read_json
+        for project in reader():
+            self.project_count += 1
+            yield project
+
+    # ========================================================================
+    # JSON LINES
+    # ========================================================================
+
+    def _read_json_lines(self):
+        with open(self.config_file, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    project = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{self.config_file}, line {line_number}: {e.msg}") from None
+                if not isinstance(project, dict):
+                    raise ValueError(f"{self.config_file}, line {line_number}: "
+                                     f"expected a project object")
+                yield project
+
+    # ========================================================================
+    # INCREMENTAL JSON
+    # ========================================================================
+
+    def _read_json(self):
+        with open(self.config_file, 'r') as f:
+            self._file = f
+            self._buffer = ""
+            self._pos = 0
+            self._eof = False
+
+            self._expect('{')
+            if self._peek() == '}':
+                return
+            while True:
+                key = self._value()
+                if not isinstance(key, str):
+                    self._error("expected a key string")
+                self._expect(':')
+
+                if key == 'projects':
+                    yield from self._projects()
+                else:
+                    self.header[key] = self._value()
+
+                if self._next_delimiter(',}') == '}':
+                    return
+
+    def _projects(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            project = self._value()
+            if not isinstance(project, dict):
+                self._error("expected a project object")
+            yield project
+            if self._next_delimiter(',]') == ']':
+                return
+
+    def _value(self):
+        """Decode the next JSON value, reading more of the file as needed"""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+                # A value ending at the buffer end may be cut (e.g. a number)
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    self._error(e.msg)
+            if not self._read_chunk():
+                self._error("unexpected end of file")
+
+    def _read_chunk(self):
+        """Append the next chunk to the buffer, dropping the consumed part"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return True  # one more decode attempt knowing the file has ended
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._read_chunk() or self._eof:
+                return
+
+    def _peek(self):
+        self._skip_whitespace()
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else ''
+
+    def _expect(self, char):
+        if self._peek() != char:
+            self._error(f"expected '{char}'")
+        self._pos += 1
+
+    def _next_delimiter(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            self._error(f"expected one of {', '.join(repr(c) for c in chars)}")
+        self._pos += 1
+        return char
+
+    def _error(self, message):
+        raise ValueError(f"{self.config_file}: invalid config ({message}) "
+                         f"near: {self._buffer[self._pos:self._pos + 40]!r}")
+
+
+def iter_projects(config_file, chunk_size=CHUNK_SIZE):
+    """
+    Yield the projects of a .json or .jsonl config one at a time
+
+    Args:
+        config_file (str): Path to the config file
+        chunk_size (int):  Characters read from the file at a time
+
+    Returns:
+        ConfigStream: Iterable of project dicts (header in .header)
+    """
+    return ConfigStream(config_file, chunk_size)
+
+
+def load_projects(config_file):
+    """
+    Load a whole config as a dict, for .json as well as .jsonl files
+
+    Args:
+        config_file (str): Path to the config file
+
+    Returns:
+        dict: Config with its "projects" list
+    """
+    stream = ConfigStream(config_file)
+    if not stream.json_lines:
+        with open(config_file, 'r') as f:
+            return json.load(f)
+    projects = list(stream)
+    return {'projects': projects}
@@ -0,0 +1,9 @@
+"""
+Headless Allplan API - pure-Python stand-ins
+============================================================================
+Minimal implementations of the Allplan modules used by the solar scripts,
+so layouts, creators and generators run (and can be profiled) on machines
+without Allplan. Install them with SolarCommon.backend.install_backend();
+do not import these modules directly from the scripts.
+============================================================================
+"""
@@ -0,0 +1,61 @@
+"""
+Headless NemAll_Python_BaseElements
+============================================================================
+CommonProperties, CreateElements and DeleteElements. Created elements are
+stored in the headless document (see element_adapter.DocumentAdapter)
+together with the matrix they were inserted with; nothing is drawn.
+============================================================================
+"""
+
+from .element_adapter import BaseElementAdapterList
+
+
+class CommonProperties:
+    """Format properties of an element"""
+
+    def __init__(self, other=None):
+        self.Color = 1
+        self.Pen = 1
+        self.Stroke = 1
+        self.Layer = 0
+        self.LineStyle = 1
+        self.ColorByLayer = False
+        if other is not None:
+            self.__dict__.update(other.__dict__)
+
+    def __repr__(self):
+        return f"CommonProperties(Color={self.Color}, LineStyle={self.LineStyle}, Layer={self.Layer})"
+
+
+def CreateElements(doc, insertion_matrix, model_elements, model_uuids, asso_ref_obj):
+    """
+    Insert elements into the headless document
+
+    Args:
+        doc:              Headless DocumentAdapter, None discards the elements
+        insertion_matrix: Matrix3D applied on insertion (recorded, not applied)
+        model_elements:   Elements to insert
+        model_uuids:      Ignored
+        asso_ref_obj:     Ignored
+
+    Returns:
+        BaseElementAdapterList: One adapter per inserted element, empty if
+        doc is None
+    """
+    if doc is None:
+        return BaseElementAdapterList()
+    return doc.add_elements(insertion_matrix, model_elements)
+
+
+def DeleteElements(doc, elements):
+    """
+    Delete elements from the headless document
+
+    Args:
+        doc:      Headless DocumentAdapter
+        elements: BaseElementAdapters of the elements to delete
+
+    Returns:
+        int: Number of deleted elements
+    """
+    return doc.delete_elements(elements)
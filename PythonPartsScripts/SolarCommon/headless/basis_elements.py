@@ -0,0 +1,40 @@
+"""
+Headless NemAll_Python_BasisElements
+============================================================================
+ModelElement3D and ModelElement2D: a pair of common properties and
+geometry. Profile catalog elements (ProfileElement) are not available
+headless; callers fall back to cuboids as they do when a catalog profile
+is missing in Allplan.
+============================================================================
+"""
+
+
+class ModelElement3D:
+    """3D model element: common properties plus geometry"""
+
+    __slots__ = ('common_properties', 'geometry')
+
+    def __init__(self, common_properties, geometry):
+        self.common_properties = common_properties
+        self.geometry = geometry
+
+    def __repr__(self):
+        return f"ModelElement3D({self.common_properties!r}, {type(self.geometry).__name__})"
+
+    def GetCommonProperties(self):
+        return self.common_properties
+
+    def SetCommonProperties(self, common_properties):
+        self.common_properties = common_properties
+
+    def GetGeometryObject(self):
+        return self.geometry
+
+    def SetGeometryObject(self, geometry):
+        self.geometry = geometry
+
+
+class ModelElement2D(ModelElement3D):
+    """2D model element (plan symbols): common properties plus 2D geometry"""
+
+    __slots__ = ()
@@ -0,0 +1,114 @@
+"""
+Headless NemAll_Python_IFW_ElementAdapter
+============================================================================
+DocumentAdapter keeps the elements passed to CreateElements in memory, so
+scripts can be run and checked end to end without Allplan. Every element
+gets a GUID and a BaseElementAdapter, so elements can be found again by
+GUID and deleted like in a real document.
+============================================================================
+"""
+
+import uuid
+
+
+class GUID:
+    """Element GUID"""
+
+    def __init__(self, value=0):
+        self.value = value
+
+    @staticmethod
+    def FromString(text):
+        return GUID(uuid.UUID(text).int)
+
+    def __eq__(self, other):
+        return isinstance(other, GUID) and self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __str__(self):
+        return str(uuid.UUID(int=self.value))
+
+    def __repr__(self):
+        return f"GUID('{self}')"
+
+
+class BaseElementAdapter:
+    """Reference to an element of a document, null if it doesn't exist"""
+
+    def __init__(self, doc=None, guid=None):
+        self.document = doc
+        self.guid = guid
+
+    @staticmethod
+    def FromGUID(guid, doc):
+        """Adapter of the element with this GUID, a null adapter if there is none"""
+        if guid in doc.elements:
+            return BaseElementAdapter(doc, guid)
+        return BaseElementAdapter()
+
+    def IsNull(self):
+        return self.guid is None or self.guid not in self.document.elements
+
+    def GetElementUUID(self):
+        return self.guid
+
+    def GetModelElement(self):
+        return self.document.elements[self.guid]
+
+
+class BaseElementAdapterList(list):
+    """List of BaseElementAdapter"""
+
+
+class DocumentAdapter:
+    """In-memory document"""
+
+    _active = None
+
+    def __init__(self, name="Headless"):
+        self.name = name
+        self.insertions = []  # (insertion matrix, elements) per CreateElements call
+        self.elements = {}    # GUID -> element, in insertion order
+        self._next_guid = 1
+
+    @classmethod
+    def GetActiveDocument(cls):
+        """Return the process-wide headless document (created on first use)"""
+        if cls._active is None:
+            cls._active = cls()
+        return cls._active
+
+    def GetDocumentName(self):
+        return self.name
+
+    @property
+    def element_count(self):
+        """Number of elements in the document"""
+        return len(self.elements)
+
+    def add_elements(self, insertion_matrix, elements):
+        """Store one CreateElements call, return an adapter per new element"""
+        elements = list(elements)
+        self.insertions.append((insertion_matrix, elements))
+
+        adapters = BaseElementAdapterList()
+        for element in elements:
+            guid = GUID(self._next_guid)
+            self._next_guid += 1
+            self.elements[guid] = element
+            adapters.append(BaseElementAdapter(self, guid))
+        return adapters
+
+    def delete_elements(self, adapters):
+        """Remove elements, return the number actually deleted"""
+        deleted = 0
+        for adapter in adapters:
+            if self.elements.pop(adapter.guid, None) is not None:
+                deleted += 1
+        return deleted
+
+    def clear(self):
+        self.insertions = []
+        self.elements = {}
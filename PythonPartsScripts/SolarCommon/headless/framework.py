@@ -0,0 +1,80 @@
+"""
+Headless PythonParts framework
+============================================================================
+Stand-ins for the framework modules the PythonParts import:
+BuildingElement, CreateElementResult, PythonPartUtil and
+TypeCollections.ModelEleList.
+
+PythonPartUtil.create_pythonpart returns the elements of all views as one
+flat list (Allplan wraps them in a PythonPart macro instead); the views are
+kept in PythonPartUtil.views for inspection.
+============================================================================
+"""
+
+from . import basis_elements
+
+
+class Parameter:
+    """Palette parameter with a value attribute"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"Parameter({self.value!r})"
+
+
+class BuildingElement:
+    """Palette parameters as attributes, each with a value (see backend.make_build_element)"""
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, Parameter(value))
+
+
+class ModelEleList(list):
+    """List of model elements sharing default common properties"""
+
+    def __init__(self, common_props=None):
+        super().__init__()
+        self.common_props = common_props
+
+    def append_geometry_2d(self, geometry, common_props=None):
+        self.append(basis_elements.ModelElement2D(common_props or self.common_props, geometry))
+
+    def append_geometry_3d(self, geometry, common_props=None):
+        self.append(basis_elements.ModelElement3D(common_props or self.common_props, geometry))
+
+
+class PythonPartUtil:
+    """Collects the views of a PythonPart"""
+
+    def __init__(self, common_props=None):
+        self.common_props = common_props
+        self.views = []  # (kind, ModelEleList), kind is '2d', '3d' or '2d3d'
+
+    def add_pythonpart_view_2d(self, elements):
+        self.views.append(('2d', elements))
+
+    def add_pythonpart_view_3d(self, elements):
+        self.views.append(('3d', elements))
+
+    def add_pythonpart_view_2d3d(self, elements):
+        self.views.append(('2d3d', elements))
+
+    def create_pythonpart(self, build_ele, *args, **kwargs):
+        return [element for _, elements in self.views for element in elements]
+
+
+class CreateElementResult:
+    """Result of create_element"""
+
+    def __init__(self, elements=None, handles=None, placement_point=None,
+                 multi_placement=False, **kwargs):
+        self.elements = elements if elements is not None else []
+        self.handles = handles if handles is not None else []
+        self.placement_point = placement_point
+        self.multi_placement = multi_placement
+        self.__dict__.update(kwargs)
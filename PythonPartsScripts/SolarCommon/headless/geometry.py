@@ -0,0 +1,403 @@
+"""
+Headless NemAll_Python_Geometry
+============================================================================
+Pure-Python stand-in for the subset of the Allplan geometry API used by the
+solar scripts: points, vectors, 3D matrices, axis placements, cuboid
+polyhedra, 3D polylines and 2D polylines (plan symbols), plus the
+Move / Transform functions.
+
+A Polyhedron3D is stored as its list of vertices (x, y, z) only; the face
+topology of a cuboid is the same for every solid (CUBOID_FACES). That is
+enough to place, transform and measure the solids, it is not a modeling
+kernel.
+
+Angles are radians, or any object with a Rad attribute (like AllplanGeo.Angle).
+============================================================================
+"""
+
+import math
+
+# Vertex indices of the cuboid faces (counter-clockwise seen from outside)
+CUBOID_FACES = ((0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4),
+                (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7))
+
+
+def _rad(angle):
+    """Angle in radians from a float or an Angle-like object"""
+    return getattr(angle, 'Rad', angle)
+
+# ============================================================================
+# POINTS AND VECTORS
+# ============================================================================
+
+class Point3D:
+    """3D point"""
+
+    __slots__ = ('X', 'Y', 'Z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.X, self.Y, self.Z = x, y, z
+
+    def __add__(self, other):
+        return Point3D(self.X + other.X, self.Y + other.Y, self.Z + other.Z)
+
+    def __sub__(self, other):
+        if isinstance(other, Vector3D):
+            return Point3D(self.X - other.X, self.Y - other.Y, self.Z - other.Z)
+        return Vector3D(self.X - other.X, self.Y - other.Y, self.Z - other.Z)
+
+    def __mul__(self, matrix):
+        return Point3D(*matrix.transform_point(self.X, self.Y, self.Z))
+
+    def __eq__(self, other):
+        return (isinstance(other, Point3D) and not isinstance(other, Vector3D) and
+                (self.X, self.Y, self.Z) == (other.X, other.Y, other.Z))
+
+    def __hash__(self):
+        return hash((self.X, self.Y, self.Z))
+
+    def __repr__(self):
+        return f"Point3D({self.X}, {self.Y}, {self.Z})"
+
+    def Values(self):
+        return self.X, self.Y, self.Z
+
+    def GetDistance(self, other):
+        return math.dist(self.Values(), other.Values())
+
+
+class Vector3D:
+    """3D vector"""
+
+    __slots__ = ('X', 'Y', 'Z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        if isinstance(x, (Point3D, Vector3D)) and isinstance(y, (Point3D, Vector3D)):
+            x, y, z = y.X - x.X, y.Y - x.Y, y.Z - x.Z  # Vector3D(from_point, to_point)
+        self.X, self.Y, self.Z = x, y, z
+
+    def __add__(self, other):
+        return Vector3D(self.X + other.X, self.Y + other.Y, self.Z + other.Z)
+
+    def __sub__(self, other):
+        return Vector3D(self.X - other.X, self.Y - other.Y, self.Z - other.Z)
+
+    def __neg__(self):
+        return Vector3D(-self.X, -self.Y, -self.Z)
+
+    def __mul__(self, other):
+        if isinstance(other, Matrix3D):
+            return Vector3D(*other.transform_vector(self.X, self.Y, self.Z))
+        return Vector3D(self.X * other, self.Y * other, self.Z * other)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return (isinstance(other, Vector3D) and
+                (self.X, self.Y, self.Z) == (other.X, other.Y, other.Z))
+
+    def __hash__(self):
+        return hash((self.X, self.Y, self.Z))
+
+    def __repr__(self):
+        return f"Vector3D({self.X}, {self.Y}, {self.Z})"
+
+    def Values(self):
+        return self.X, self.Y, self.Z
+
+    def GetLength(self):
+        return math.sqrt(self.X * self.X + self.Y * self.Y + self.Z * self.Z)
+
+    def Normalize(self):
+        length = self.GetLength()
+        if length:
+            self.X, self.Y, self.Z = self.X / length, self.Y / length, self.Z / length
+        return self
+
+    def DotProduct(self, other):
+        return self.X * other.X + self.Y * other.Y + self.Z * other.Z
+
+    def CrossProduct(self, other):
+        return Vector3D(self.Y * other.Z - self.Z * other.Y,
+                        self.Z * other.X - self.X * other.Z,
+                        self.X * other.Y - self.Y * other.X)
+
+# ============================================================================
+# PLACEMENT AND MATRIX
+# ============================================================================
+
+class AxisPlacement3D:
+    """Local coordinate system given by origin, X direction and Z direction"""
+
+    def __init__(self, origin=None, x_direction=None, z_direction=None):
+        self.Origin = origin if origin is not None else Point3D()
+        self.XDirection = (x_direction if x_direction is not None else Vector3D(1, 0, 0))
+        self.ZDirection = (z_direction if z_direction is not None else Vector3D(0, 0, 1))
+
+    def GetYDirection(self):
+        return self.ZDirection.CrossProduct(self.XDirection)
+
+    def GetTransformationMatrix(self):
+        """Matrix mapping local coordinates to world coordinates"""
+        x_dir = Vector3D(*self.XDirection.Values()).Normalize()
+        z_dir = Vector3D(*self.ZDirection.Values()).Normalize()
+        y_dir = z_dir.CrossProduct(x_dir)
+        matrix = Matrix3D()
+        matrix.rotation = [x_dir.X, y_dir.X, z_dir.X,
+                           x_dir.Y, y_dir.Y, z_dir.Y,
+                           x_dir.Z, y_dir.Z, z_dir.Z]
+        matrix.translation = [self.Origin.X, self.Origin.Y, self.Origin.Z]
+        return matrix
+
+
+class Matrix3D:
+    """
+    Affine 3D transformation: p' = R * p + t
+
+    R is kept row-major in rotation, t in translation. Combining follows the
+    Allplan convention: a * b applies a first, then b.
+    """
+
+    __slots__ = ('rotation', 'translation')
+
+    def __init__(self, other=None):
+        if other is None:
+            self.rotation = [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+            self.translation = [0.0, 0.0, 0.0]
+        else:
+            self.rotation = list(other.rotation)
+            self.translation = list(other.translation)
+
+    def transform_point(self, x, y, z):
+        r, t = self.rotation, self.translation
+        return (r[0] * x + r[1] * y + r[2] * z + t[0],
+                r[3] * x + r[4] * y + r[5] * z + t[1],
+                r[6] * x + r[7] * y + r[8] * z + t[2])
+
+    def transform_vector(self, x, y, z):
+        r = self.rotation
+        return (r[0] * x + r[1] * y + r[2] * z,
+                r[3] * x + r[4] * y + r[5] * z,
+                r[6] * x + r[7] * y + r[8] * z)
+
+    def __mul__(self, other):
+        """Combined matrix: self first, then other"""
+        a, b = self.rotation, other.rotation
+        result = Matrix3D()
+        result.rotation = [sum(b[row * 3 + k] * a[k * 3 + col] for k in range(3))
+                           for row in range(3) for col in range(3)]
+        result.translation = list(other.transform_point(*self.translation))
+        return result
+
+    def __eq__(self, other):
+        return (isinstance(other, Matrix3D) and self.rotation == other.rotation and
+                self.translation == other.translation)
+
+    def IsIdentity(self):
+        return self == Matrix3D()
+
+    def SetTranslation(self, vector):
+        self.translation = [vector.X, vector.Y, vector.Z]
+
+    def GetTranslation(self):
+        return Vector3D(*self.translation)
+
+    def Translate(self, vector):
+        """Append a translation"""
+        self.translation = [self.translation[0] + vector.X,
+                            self.translation[1] + vector.Y,
+                            self.translation[2] + vector.Z]
+
+    def SetRotation(self, axis, angle=None):
+        """
+        Set the rotation part, the translation is kept
+
+        Args:
+            axis:  AxisPlacement3D (rotation to its local axes) or Vector3D
+            angle: Rotation angle around the vector (if axis is a vector)
+        """
+        if isinstance(axis, AxisPlacement3D):
+            self.rotation = axis.GetTransformationMatrix().rotation
+        else:
+            self.rotation = _axis_rotation(axis, _rad(angle)).rotation
+
+    def Rotation(self, axis, angle):
+        """Append a rotation around an axis vector through the origin"""
+        self._append(_axis_rotation(axis, _rad(angle)))
+
+    def RotateX(self, angle):
+        self._append(_axis_rotation(Vector3D(1, 0, 0), _rad(angle)))
+
+    def RotateY(self, angle):
+        self._append(_axis_rotation(Vector3D(0, 1, 0), _rad(angle)))
+
+    def RotateZ(self, angle):
+        self._append(_axis_rotation(Vector3D(0, 0, 1), _rad(angle)))
+
+    def _append(self, other):
+        combined = self * other
+        self.rotation, self.translation = combined.rotation, combined.translation
+
+
+def _axis_rotation(axis, angle):
+    """Rotation matrix around a unit axis through the origin (Rodrigues)"""
+    u = Vector3D(*axis.Values()).Normalize()
+    c, s = math.cos(angle), math.sin(angle)
+    k = 1 - c
+    matrix = Matrix3D()
+    matrix.rotation = [c + u.X * u.X * k, u.X * u.Y * k - u.Z * s, u.X * u.Z * k + u.Y * s,
+                       u.Y * u.X * k + u.Z * s, c + u.Y * u.Y * k, u.Y * u.Z * k - u.X * s,
+                       u.Z * u.X * k - u.Y * s, u.Z * u.Y * k + u.X * s, c + u.Z * u.Z * k]
+    return matrix
+
+# ============================================================================
+# GEOMETRY OBJECTS
+# ============================================================================
+
+class Polyhedron3D:
+    """Polyhedron stored as its vertex list"""
+
+    __slots__ = ('vertices',)
+
+    def __init__(self, vertices=None):
+        self.vertices = vertices if vertices is not None else []
+
+    @staticmethod
+    def CreateCuboid(*args):
+        """
+        Create a cuboid
+
+        CreateCuboid(point1, point2):                      axis-parallel box
+        CreateCuboid(placement, length, width, height):    box in a placement
+        """
+        if len(args) == 2:
+            (x1, y1, z1), (x2, y2, z2) = args[0].Values(), args[1].Values()
+            return Polyhedron3D([(x, y, z) for z in (z1, z2)
+                                 for x, y in ((x1, y1), (x2, y1), (x2, y2), (x1, y2))])
+        if len(args) == 4:
+            placement, length, width, height = args
+            matrix = placement.GetTransformationMatrix()
+            return Polyhedron3D([matrix.transform_point(x, y, z) for z in (0, height)
+                                 for x, y in ((0, 0), (length, 0), (length, width), (0, width))])
+        raise TypeError(f"CreateCuboid() takes 2 or 4 arguments ({len(args)} given)")
+
+    def GetVerticesCount(self):
+        return len(self.vertices)
+
+    def GetVertices(self):
+        return [Point3D(*vertex) for vertex in self.vertices]
+
+    def GetFacesCount(self):
+        return len(CUBOID_FACES) if len(self.vertices) == 8 else 0
+
+    def IsValid(self):
+        return bool(self.vertices)
+
+    def Transform(self, matrix):
+        return Polyhedron3D([matrix.transform_point(*vertex) for vertex in self.vertices])
+
+
+class Polyline3D:
+    """Open or closed 3D polyline"""
+
+    __slots__ = ('Points',)
+
+    def __init__(self, points=None):
+        self.Points = list(points) if points is not None else []
+
+    def __iadd__(self, point):
+        self.Points.append(point)
+        return self
+
+    def Count(self):
+        return len(self.Points)
+
+    def IsValid(self):
+        return len(self.Points) >= 2
+
+    def Transform(self, matrix):
+        return Polyline3D([point * matrix for point in self.Points])
+
+
+class Point2D:
+    """2D point"""
+
+    __slots__ = ('X', 'Y')
+
+    def __init__(self, x=0.0, y=0.0):
+        self.X, self.Y = x, y
+
+    def __eq__(self, other):
+        return isinstance(other, Point2D) and (self.X, self.Y) == (other.X, other.Y)
+
+    def __hash__(self):
+        return hash((self.X, self.Y))
+
+    def __repr__(self):
+        return f"Point2D({self.X}, {self.Y})"
+
+    def Values(self):
+        return self.X, self.Y
+
+
+class Polyline2D:
+    """Open or closed 2D polyline"""
+
+    __slots__ = ('Points',)
+
+    def __init__(self, points=None):
+        self.Points = list(points) if points is not None else []
+
+    def __iadd__(self, point):
+        self.Points.append(point)
+        return self
+
+    def Count(self):
+        return len(self.Points)
+
+    def IsValid(self):
+        return len(self.Points) >= 2
+
+
+class MinMax3D:
+    """Axis-parallel bounding box"""
+
+    def __init__(self, min_point, max_point):
+        self.Min, self.Max = min_point, max_point
+
+    def __repr__(self):
+        return f"MinMax3D({self.Min!r}, {self.Max!r})"
+
+# ============================================================================
+# FUNCTIONS
+# ============================================================================
+
+def Move(geometry, vector):
+    """Return a copy of the geometry translated by vector"""
+    if isinstance(geometry, Polyhedron3D):
+        dx, dy, dz = vector.X, vector.Y, vector.Z
+        return Polyhedron3D([(x + dx, y + dy, z + dz) for x, y, z in geometry.vertices])
+    matrix = Matrix3D()
+    matrix.SetTranslation(vector)
+    return Transform(geometry, matrix)
+
+
+def Transform(geometry, matrix):
+    """Return a transformed copy of the geometry"""
+    if isinstance(geometry, Vector3D):
+        return geometry * matrix
+    if isinstance(geometry, Point3D):
+        return geometry * matrix
+    return geometry.Transform(matrix)
+
+
+def CalcMinMax(geometry):
+    """Bounding box of a point, polyhedron or polyline"""
+    if isinstance(geometry, Polyhedron3D):
+        coordinates = geometry.vertices
+    elif isinstance(geometry, Polyline3D):
+        coordinates = [point.Values() for point in geometry.Points]
+    else:
+        coordinates = [geometry.Values()]
+    xs, ys, zs = zip(*coordinates)
+    return MinMax3D(Point3D(min(xs), min(ys), min(zs)), Point3D(max(xs), max(ys), max(zs)))
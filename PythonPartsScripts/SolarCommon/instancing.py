@@ -0,0 +1,97 @@
+"""
+Instancing - Build a cuboid once, place copies by translation
+============================================================================
+Every module, frame, PV layer or rung of an array is the same box at a
+different offset. A CuboidPrototype creates the Polyhedron3D once (at the
+origin, optionally already rotated) and returns translated copies of it, so
+placing a module costs a Move instead of a full CreateCuboid.
+
+Allplan macro placements would avoid the copies altogether, but they are
+separate document objects and cannot be mixed into the plain element lists
+returned by the creators, so copies are used.
+============================================================================
+"""
+
+import NemAll_Python_Geometry as AllplanGeo
+
+
+class CuboidPrototype:
+    """Cuboid created once at the origin and placed by translation"""
+
+    def __init__(self, size_x, size_y, size_z, transform=None):
+        """
+        Initialisation of class CuboidPrototype
+
+        Args:
+            size_x, size_y, size_z (float): Cuboid dimensions (mm)
+            transform (Matrix3D):           Rotation applied once to the prototype,
+                                            placements are then given in the
+                                            rotated frame's world coordinates
+        """
+        self.size = (size_x, size_y, size_z)
+        self.solid = AllplanGeo.Polyhedron3D.CreateCuboid(AllplanGeo.Point3D(0, 0, 0),
+                                                          AllplanGeo.Point3D(size_x, size_y, size_z))
+        if transform is not None:
+            self.solid = AllplanGeo.Transform(self.solid, transform)
+
+    @classmethod
+    def from_box(cls, box, transform=None):
+        """
+        Create the prototype matching a [[x1, y1, z1], [x2, y2, z2]] box
+
+        Args:
+            box (list):           Min and max corner
+            transform (Matrix3D): Optional rotation, see __init__
+
+        Returns:
+            CuboidPrototype: Prototype with the box dimensions
+        """
+        (x1, y1, z1), (x2, y2, z2) = box
+        return cls(x2 - x1, y2 - y1, z2 - z1, transform)
+
+    def place(self, x, y, z):
+        """
+        Return a copy of the prototype with its origin moved to (x, y, z)
+
+        Args:
+            x, y, z (float): Target of the prototype origin (mm)
+
+        Returns:
+            Polyhedron3D: Translated copy
+        """
+        return AllplanGeo.Move(self.solid, AllplanGeo.Vector3D(x, y, z))
+
+    def place_all(self, origins):
+        """
+        Place one copy per origin
+
+        Args:
+            origins: (N, 3) array or list of [x, y, z]
+
+        Returns:
+            list: Translated copies in origin order
+        """
+        if hasattr(origins, 'tolist'):
+            origins = origins.tolist()
+        return [self.place(x, y, z) for x, y, z in origins]
+
+
+def rotation_matrix(rotation):
+    """
+    Matrix3D of a rotation about the origin given as a (3, 3) array
+
+    Used as the transform of a CuboidPrototype: the prototype is rotated once,
+    its placements are then computed for all copies together (e.g. with
+    SolarCommon.layout.transform_points).
+
+    Args:
+        rotation: Orthonormal (3, 3) array, columns are the rotated X, Y and Z axes
+
+    Returns:
+        Matrix3D: Rotation without translation
+    """
+    x_axis = AllplanGeo.Vector3D(*[float(v) for v in rotation[:, 0]])
+    z_axis = AllplanGeo.Vector3D(*[float(v) for v in rotation[:, 2]])
+    matrix = AllplanGeo.Matrix3D()
+    matrix.SetRotation(AllplanGeo.AxisPlacement3D(AllplanGeo.Point3D(0, 0, 0), x_axis, z_axis))
+    return matrix
@@ -0,0 +1,360 @@
+"""
+Solar Array Layout - Vectorized layout kernel
+============================================================================
+Computes the support plate, module frame and PV layer boxes of a solar array
+in one pass with NumPy. No Allplan objects are created here: every box is
+stored as its (min corner, max corner) pair, so a whole project is a handful
+of (N, 2, 3) coordinate arrays that can be built into Allplan geometry at the
+very end, tested and benchmarked without Allplan.
+============================================================================
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+FRAME_THICKNESS = 30  # mm
+DEFAULT_COLORS = {'plate': 7, 'frame': 4, 'pv': 21}
+GRID_FIT_CACHE_SIZE = 256  # fitted grids kept by fit_grid
+RUN_TOLERANCE = 1e-6       # mm, segments closer than gap + tolerance are merged
+
+# ============================================================================
+# LAYOUT
+# ============================================================================
+
+class ArrayLayout:
+    """
+    Computed layout of one solar array
+
+    Boxes are stored as [[x1, y1, z1], [x2, y2, z2]] corner pairs. Modules
+    are ordered row by row (row-major), frame i and PV layer i belong to the
+    same module.
+
+    Attributes:
+        rows (int):          Number of module rows
+        cols (int):          Number of module columns
+        plate (ndarray):     (2, 3) support plate box
+        frames (ndarray):    (N, 2, 3) module frame boxes
+        pvs (ndarray):       (N, 2, 3) PV layer boxes
+        colors (dict):       Allplan color IDs {'plate', 'frame', 'pv'}
+    """
+
+    def __init__(self, rows, cols, plate, frames, pvs, colors):
+        self.rows = rows
+        self.cols = cols
+        self.plate = plate
+        self.frames = frames
+        self.pvs = pvs
+        self.colors = colors
+
+    @property
+    def module_count(self):
+        """Number of modules in the layout"""
+        return len(self.frames)
+
+    @property
+    def plate_size(self):
+        """(width, height, thickness) of the support plate"""
+        return tuple((self.plate[1] - self.plate[0]).tolist())
+
+    def translated(self, dx, dy, dz):
+        """
+        Return a copy of the layout moved by (dx, dy, dz)
+
+        Args:
+            dx, dy, dz (float): Translation (mm)
+
+        Returns:
+            ArrayLayout: Translated layout
+        """
+        offset = np.array([dx, dy, dz], dtype=float)
+        return ArrayLayout(self.rows, self.cols,
+                           self.plate + offset,
+                           self.frames + offset,
+                           self.pvs + offset,
+                           self.colors)
+
+
+def module_origins(rows, cols, pitch_x, pitch_y, z=0.0):
+    """
+    Compute the lower-left corner of every module of a regular grid
+
+    Args:
+        rows (int):       Number of rows
+        cols (int):       Number of columns
+        pitch_x (float):  Distance between two column origins (mm)
+        pitch_y (float):  Distance between two row origins (mm)
+        z (float):        Z coordinate of all origins (mm)
+
+    Returns:
+        ndarray: (rows * cols, 3) origins, row-major
+    """
+    origins = np.empty((rows * cols, 3), dtype=float)
+    origins[:, 0] = np.tile(np.arange(cols) * pitch_x, rows)
+    origins[:, 1] = np.repeat(np.arange(rows) * pitch_y, cols)
+    origins[:, 2] = z
+    return origins
+
+
+class GridFit:
+    """
+    Panel grid fitted into a surface (see fit_grid)
+
+    Shared between callers through the fit_grid cache: the origin arrays are
+    read-only, copy them before modifying.
+
+    Attributes:
+        rows (int):            Number of panel rows that fit
+        cols (int):            Number of panel columns that fit
+        used_width (float):    Width covered by the grid, no trailing spacing (mm)
+        used_height (float):   Height covered by the grid, no trailing spacing (mm)
+        pitch_x (float):       Distance between two column origins (mm)
+        pitch_y (float):       Distance between two row origins (mm)
+        cells (ndarray):       (rows * cols, 3) lower-left corner of every cell, z = 0
+        origins (ndarray):     (N, 3) cells whose panel lies within the surface
+    """
+
+    def __init__(self, rows, cols, used_width, used_height, pitch_x, pitch_y, cells, origins):
+        self.rows = rows
+        self.cols = cols
+        self.used_width = used_width
+        self.used_height = used_height
+        self.pitch_x = pitch_x
+        self.pitch_y = pitch_y
+        self.cells = cells
+        self.origins = origins
+
+    @property
+    def panel_count(self):
+        """Number of panels within the surface"""
+        return len(self.origins)
+
+
+@lru_cache(maxsize=GRID_FIT_CACHE_SIZE)
+def fit_grid(surface_width, surface_height, panel_width, panel_height, spacing):
+    """
+    Fit as many panels as possible into a surface, row-major from (0, 0)
+
+    PythonParts are recreated on every parameter change, so the result is
+    memoized on the arguments: revisiting a value (e.g. dragging a slider
+    back) returns the cached fit.
+
+    Args:
+        surface_width, surface_height (float): Available surface (mm)
+        panel_width, panel_height (float):      Panel size (mm)
+        spacing (float):                        Gap between panels (mm)
+
+    Returns:
+        GridFit: Fitted grid (shared, read-only arrays)
+    """
+    pitch_x = panel_width + spacing
+    pitch_y = panel_height + spacing
+    cols = max(0, int((surface_width + spacing) // pitch_x))
+    rows = max(0, int((surface_height + spacing) // pitch_y))
+
+    cells = module_origins(rows, cols, pitch_x, pitch_y)
+    inside = ((cells[:, 0] + panel_width <= surface_width) &
+              (cells[:, 1] + panel_height <= surface_height))
+    origins = cells if inside.all() else cells[inside]
+    cells.flags.writeable = False
+    origins.flags.writeable = False
+
+    return GridFit(rows, cols,
+                   cols * panel_width + (cols - 1) * spacing,
+                   rows * panel_height + (rows - 1) * spacing,
+                   pitch_x, pitch_y, cells, origins)
+
+
+def block_grid(rows, cols, panel_width, panel_height, spacing):
+    """
+    Grid of exactly rows x cols panels, e.g. one block of a packing
+
+    Args:
+        rows, cols (int):                  Grid size
+        panel_width, panel_height (float): Panel size (mm)
+        spacing (float):                   Gap between panels (mm)
+
+    Returns:
+        GridFit: Grid whose cells all hold a panel (read-only arrays)
+    """
+    pitch_x = panel_width + spacing
+    pitch_y = panel_height + spacing
+    cells = module_origins(rows, cols, pitch_x, pitch_y)
+    cells.flags.writeable = False
+    return GridFit(rows, cols,
+                   cols * panel_width + (cols - 1) * spacing,
+                   rows * panel_height + (rows - 1) * spacing,
+                   pitch_x, pitch_y, cells, cells)
+
+
+def merge_runs(segments, gap):
+    """
+    Coalesce collinear segments into continuous members
+
+    Segments are given as [line, start, end]: a member on the line at
+    coordinate 'line' (e.g. the x of a rung) from start to end. Consecutive
+    segments of a line that are at most 'gap' apart become one run.
+
+    Args:
+        segments (list):  [line, start, end] rows or (N, 3) arrays of them
+        gap (float):      Largest gap bridged between two segments (mm)
+
+    Returns:
+        ndarray: (M, 3) runs [line, start, end] sorted by line and start
+    """
+    segments = np.vstack(segments).astype(float) if len(segments) else np.empty((0, 3))
+    if not len(segments):
+        return segments
+
+    lines = np.round(segments[:, 0], 6)
+    order = np.lexsort((segments[:, 1], lines))
+    segments, lines = segments[order], lines[order]
+
+    new_run = np.ones(len(segments), dtype=bool)
+    new_run[1:] = ((lines[1:] != lines[:-1]) |
+                   (segments[1:, 1] > segments[:-1, 2] + gap + RUN_TOLERANCE))
+    starts = np.flatnonzero(new_run)
+    return np.column_stack([segments[starts, 0], segments[starts, 1],
+                            np.maximum.reduceat(segments[:, 2], starts)])
+
+
+def compute_array_layout(rows, cols, module_w, module_h, module_t,
+                         row_gap, col_gap, plate_t, plate_off,
+                         frame_thickness=FRAME_THICKNESS, colors=None):
+    """
+    Compute plate, frame and PV boxes for a rows x cols module array
+
+    Args:
+        rows, cols (int):           Grid size
+        module_w, module_h (float): Module width/height (mm)
+        module_t (float):           Module thickness including frame (mm)
+        row_gap, col_gap (float):   Gaps between modules (mm)
+        plate_t (float):            Support plate thickness (mm)
+        plate_off (float):          Support plate offset from ground (mm)
+        frame_thickness (float):    Frame height, PV layer sits above (mm)
+        colors (dict):              Allplan color IDs, defaults if None
+
+    Returns:
+        ArrayLayout: Computed layout
+    """
+    plate_width = cols * module_w + (cols - 1) * col_gap
+    plate_height = rows * module_h + (rows - 1) * row_gap
+    plate = np.array([[0.0, 0.0, plate_off],
+                      [plate_width, plate_height, plate_off + plate_t]])
+
+    origins = module_origins(rows, cols, module_w + col_gap, module_h + row_gap,
+                             plate_off + plate_t)
+
+    inset = frame_thickness / 2
+    frame_box = np.array([[0.0, 0.0, 0.0],
+                          [module_w, module_h, frame_thickness]])
+    pv_box = np.array([[inset, inset, frame_thickness],
+                       [module_w - inset, module_h - inset, module_t]])
+
+    frames = origins[:, np.newaxis, :] + frame_box
+    pvs = origins[:, np.newaxis, :] + pv_box
+
+    return ArrayLayout(rows, cols, plate, frames, pvs,
+                       dict(colors or DEFAULT_COLORS))
+
+
+def compute_project_layout(params):
+    """
+    Compute the layout of a project from its JSON configuration
+
+    Args:
+        params (dict): Project parameters (see solar_config.json)
+
+    Returns:
+        ArrayLayout: Computed layout, placement not applied
+    """
+    modules = params['modules']
+    return compute_array_layout(
+        modules['rows'], modules['cols'],
+        modules['width'], modules['height'], modules['thickness'],
+        params['gaps']['row'], params['gaps']['col'],
+        params['plate']['thickness'], params['plate']['offset'],
+        colors=params.get('colors', DEFAULT_COLORS)
+    )
+
+
+# ============================================================================
+# ROOF SIDES
+# ============================================================================
+
+def translation_matrix(dx, dy, dz):
+    """(4, 4) affine matrix of a translation by (dx, dy, dz)"""
+    matrix = np.eye(4)
+    matrix[:3, 3] = [dx, dy, dz]
+    return matrix
+
+
+def transform_points(matrix, points):
+    """
+    Apply an affine matrix to many points at once
+
+    Args:
+        matrix (ndarray):  (4, 4) affine matrix
+        points (ndarray):  (N, 3) points
+
+    Returns:
+        ndarray: (N, 3) transformed points
+    """
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def roof_second_side_matrix(plate_height, plate_top, angle, ridge_height):
+    """
+    Placement of the second roof side, as built by the SolarCarportRoof
+    PythonPart: the axes are permuted (X -> Y, Y -> Z, Z -> X), rotated by
+    twice the roof angle about X and moved to the ridge
+
+    Args:
+        plate_height (float):  Depth of one side, along Y (mm)
+        plate_top (float):     Z of the top of the support plate (mm)
+        angle (float):         Roof angle (degrees)
+        ridge_height (float):  Height of the ridge above the plate (mm)
+
+    Returns:
+        ndarray: (4, 4) affine matrix, side coordinates to project coordinates
+    """
+    c, s = math.cos(math.radians(2 * angle)), math.sin(math.radians(2 * angle))
+    rotate_x = np.array([[1.0, 0.0, 0.0], [0.0, c, -s], [0.0, s, c]])
+    permute = np.array([[0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotate_x @ permute
+    matrix[:3, 3] = [0.0, plate_height, plate_top + ridge_height]
+    return matrix
+
+
+def roof_side_transforms(params):
+    """
+    Placement of every roof side of a project
+
+    All sides share the layout of compute_project_layout; the first one is
+    placed as computed, the second one (roof.createSecondSide) by
+    roof_second_side_matrix.
+
+    Args:
+        params (dict): Project parameters (see solar_config.json)
+
+    Returns:
+        list: (4, 4) affine matrices, one per side, placement not applied
+    """
+    transforms = [np.eye(4)]
+    roof = params.get('roof', {})
+    if roof.get('createSecondSide', False):
+        modules, plate = params['modules'], params['plate']
+        rows = modules['rows']
+        plate_height = rows * modules['height'] + (rows - 1) * params['gaps']['row']
+        transforms.append(roof_second_side_matrix(plate_height,
+                                                  plate['offset'] + plate['thickness'],
+                                                  roof.get('angle', 0),
+                                                  roof.get('ridgeHeight', 0)))
+    return transforms
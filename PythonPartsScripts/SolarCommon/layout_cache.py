@@ -0,0 +1,290 @@
+"""
+Layout Cache - Content-addressed on-disk cache of computed layouts
+============================================================================
+A layout only depends on the parameters that shape the array (modules,
+gaps, plate, colors), not on its name, placement or roof (the roof sides
+are placed copies of it, see layout.roof_side_transforms). Those
+parameters are normalized and hashed (SHA-256) into the cache key, so a project that
+did not change since the last run - or that repeats another project at a
+different position - loads its layout instead of computing it again.
+
+Each entry is one .npy file of float64 boxes, shape (2N + 2, 2, 3):
+
+    [0]           header  [[format, rows, cols], [plate, frame, pv colors]]
+    [1]           support plate box
+    [2 : N+2]     frame boxes
+    [N+2 : 2N+2]  PV layer boxes
+
+Layouts below min_modules are not cached: the vectorized kernel computes
+them faster than a file is opened. The cache is bounded in size: when it
+grows above max_bytes the least recently used entries (oldest modification
+time, refreshed on every hit) are deleted. Cache errors never fail a
+generation, a broken or unreadable entry is just a miss.
+============================================================================
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .layout import ArrayLayout, DEFAULT_COLORS, FRAME_THICKNESS, compute_project_layout
+
+CACHE_FORMAT = 1                 # bump when the entry layout or the kernel output changes
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+MIN_CACHED_MODULES = 1000        # smaller layouts compute faster than they load
+ENTRY_EXTENSION = ".npy"
+
+# ============================================================================
+# KEYS
+# ============================================================================
+
+def _normalize(value):
+    """Numbers as floats (1000 and 1000.0 give the same key), dicts sorted by json"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def layout_key(params):
+    """
+    Cache key of a project layout
+
+    Args:
+        params (dict): Project parameters (see solar_config.json)
+
+    Returns:
+        str: Hex SHA-256 of the normalized layout parameters
+    """
+    shape = {
+        'format': CACHE_FORMAT,
+        'frameThickness': FRAME_THICKNESS,
+        'modules': params['modules'],
+        'gaps': params['gaps'],
+        'plate': params['plate'],
+        'colors': params.get('colors', DEFAULT_COLORS),
+    }
+    text = json.dumps(_normalize(shape), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# ============================================================================
+# ENTRY FORMAT
+# ============================================================================
+
+def pack_layout(layout):
+    """
+    Pack a layout into a single (2N + 2, 2, 3) float64 array
+
+    Args:
+        layout (ArrayLayout): Layout to store
+
+    Returns:
+        ndarray: Header, plate, frames and PV boxes
+    """
+    n = layout.module_count
+    packed = np.empty((2 * n + 2, 2, 3), dtype=float)
+    colors = layout.colors
+    packed[0] = [[CACHE_FORMAT, layout.rows, layout.cols],
+                 [colors['plate'], colors['frame'], colors['pv']]]
+    packed[1] = layout.plate
+    packed[2:n + 2] = layout.frames
+    packed[n + 2:] = layout.pvs
+    return packed
+
+
+def unpack_layout(packed):
+    """
+    Rebuild a layout from pack_layout output
+
+    Args:
+        packed (ndarray): Packed layout
+
+    Returns:
+        ArrayLayout: Layout (plate, frames and pvs are views of packed)
+
+    Raises:
+        ValueError: If the array is not a packed layout of this format
+    """
+    if packed.ndim != 3 or packed.shape[1:] != (2, 3) or len(packed) % 2:
+        raise ValueError(f"not a packed layout, shape {packed.shape}")
+    (format_id, rows, cols), (plate_color, frame_color, pv_color) = packed[0].tolist()
+    n = len(packed) // 2 - 1
+    if format_id != CACHE_FORMAT or rows * cols != n:
+        raise ValueError("packed layout of another format or inconsistent size")
+    colors = {'plate': int(plate_color), 'frame': int(frame_color), 'pv': int(pv_color)}
+    return ArrayLayout(int(rows), int(cols), packed[1], packed[2:n + 2], packed[n + 2:], colors)
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class LayoutCache:
+    """Size-bounded LRU cache of layouts in a directory"""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, min_modules=MIN_CACHED_MODULES):
+        """
+        Initialisation of class LayoutCache
+
+        Args:
+            cache_dir (str):   Directory of the entries, created on first store
+            max_bytes (int):   Size above which the oldest entries are evicted
+            min_modules (int): Smallest module count worth caching
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.min_modules = min_modules
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self._size = None  # bytes on disk, scanned on first store
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + ENTRY_EXTENSION)
+
+    def accepts(self, params):
+        """True if the layout of a project is large enough to be cached"""
+        modules = params['modules']
+        return modules['rows'] * modules['cols'] >= self.min_modules
+
+    def load(self, params):
+        """
+        Load the layout of a project if it is cached
+
+        Args:
+            params (dict): Project parameters
+
+        Returns:
+            ArrayLayout: Cached layout, None on a miss or if not accepted
+        """
+        if not self.accepts(params):
+            return None
+        path = self.path(layout_key(params))
+        try:
+            layout = unpack_layout(np.load(path, allow_pickle=False))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):
+            # Truncated or foreign file: drop it, it is rewritten on store
+            self.misses += 1
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)  # most recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return layout
+
+    def store(self, params, layout):
+        """
+        Store the layout of a project unless it is already cached
+
+        Args:
+            params (dict):        Project parameters
+            layout (ArrayLayout): Layout computed from params, placement not applied
+
+        Returns:
+            bool: True if a new entry was written
+        """
+        if not self.accepts(params):
+            return False
+        path = self.path(layout_key(params))
+        if os.path.exists(path):
+            return False
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self._size is None:
+                self._size = self.size()
+            # Write aside and rename, readers never see a partial entry
+            with open(temp_path, 'wb') as f:
+                np.save(f, pack_layout(layout), allow_pickle=False)
+            os.replace(temp_path, path)
+            self._size += os.path.getsize(path)
+        except OSError:
+            self._remove(temp_path)
+            return False
+
+        self.stored += 1
+        if self._size > self.max_bytes:
+            self.evict()
+        return True
+
+    def entries(self):
+        """(mtime, size, path) of every entry, oldest first"""
+        try:
+            scan = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return []
+        entries = []
+        for entry in scan:
+            if not entry.name.endswith(ENTRY_EXTENSION):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def size(self):
+        """Total size of the entries on disk (bytes)"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                self.evicted += 1
+        self._size = total
+
+    def clear(self):
+        """Delete every entry"""
+        for _, _, path in self.entries():
+            self._remove(path)
+        self._size = 0
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+def cached_project_layout(params, cache=None):
+    """
+    Layout of a project, loaded from the cache or computed and stored
+
+    Args:
+        params (dict):       Project parameters
+        cache (LayoutCache): Cache to use, None to always compute
+
+    Returns:
+        ArrayLayout: Layout, placement not applied
+    """
+    if cache is None:
+        return compute_project_layout(params)
+    layout = cache.load(params)
+    if layout is None:
+        layout = compute_project_layout(params)
+        cache.store(params, layout)
+    return layout
@@ -0,0 +1,130 @@
+"""
+Level of Detail - Simplified module geometry for site-level views
+============================================================================
+Parks with tens of thousands of modules make Allplan sluggish when every
+module is a frame plus a PV layer. The creators therefore accept a level of
+detail:
+
+    full  every part as built so far (frame + PV layer, rungs, profiles, ...)
+    box   one box per module, the mounting structure reduced to its
+          outermost members
+    slab  one slab per row of modules (or per run of adjacent modules when a
+          row has holes), the module outlines drawn as one polyline per row
+
+The level only changes the geometry: module counts and bills of materials
+are computed from the layout (see SolarCommon.bom) and stay the same.
+
+Everything here works on the coordinate arrays of the layout, the creators
+turn the boxes and outline points into Allplan geometry.
+============================================================================
+"""
+
+import numpy as np
+
+from .layout import RUN_TOLERANCE
+
+FULL = "full"
+BOX = "box"
+SLAB = "slab"
+LEVELS = (FULL, BOX, SLAB)  # index = palette value of LevelOfDetail
+
+
+def parse_lod(value):
+    """
+    Level of detail from a palette value or a name
+
+    Args:
+        value: Palette index (0 = full, 1 = box, 2 = slab), a level name or
+               None for full detail
+
+    Returns:
+        str: One of LEVELS
+
+    Raises:
+        ValueError: Unknown level
+    """
+    if value is None or value == "":
+        return FULL
+    if isinstance(value, str):
+        name = value.strip().lower()
+        if name.isdigit():
+            value = int(name)
+        elif name in LEVELS:
+            return name
+        else:
+            raise ValueError(f"Unknown level of detail '{value}', expected one of {', '.join(LEVELS)}")
+    index = int(value)
+    if not 0 <= index < len(LEVELS):
+        raise ValueError(f"Level of detail {index} out of range 0-{len(LEVELS) - 1}")
+    return LEVELS[index]
+
+
+def row_runs(origins, width, gap):
+    """
+    Split module origins into runs of adjacent modules of the same row
+
+    A run ends at the end of a row or where the next module is more than
+    'gap' away (a hole left by an obstacle or the surface outline).
+
+    Args:
+        origins (ndarray):  (N, 3) lower-left corners of the modules
+        width (float):      Module width along X (mm)
+        gap (float):        Gap between two adjacent modules (mm)
+
+    Returns:
+        list: (K, 3) origin arrays, sorted by row and X
+    """
+    origins = np.asarray(origins, dtype=float)
+    if not len(origins):
+        return []
+
+    rows = np.round(origins[:, 1], 6)
+    order = np.lexsort((origins[:, 0], rows))
+    origins, rows = origins[order], rows[order]
+
+    new_run = np.ones(len(origins), dtype=bool)
+    new_run[1:] = ((rows[1:] != rows[:-1]) |
+                   (origins[1:, 0] > origins[:-1, 0] + width + gap + RUN_TOLERANCE))
+    return np.split(origins, np.flatnonzero(new_run)[1:])
+
+
+def run_slabs(runs, width, height, thickness):
+    """
+    One slab box per run, covering its modules and the gaps between them
+
+    Args:
+        runs (list):        (K, 3) origin arrays (see row_runs)
+        width, height (float): Module size (mm)
+        thickness (float):  Slab thickness (mm)
+
+    Returns:
+        ndarray: (M, 2, 3) [[x1, y1, z1], [x2, y2, z2]] boxes
+    """
+    slabs = np.empty((len(runs), 2, 3))
+    for i, run in enumerate(runs):
+        x1, y1, z1 = run[0]
+        slabs[i] = [[x1, y1, z1], [run[-1, 0] + width, y1 + height, z1 + thickness]]
+    return slabs
+
+
+def run_outline(run, width, height, z=None):
+    """
+    Outline of all modules of a run as a single polyline
+
+    The path follows the lower edge of the run and goes around every
+    module; the gaps between modules are bridged along the lower edge.
+
+    Args:
+        run (ndarray):         (K, 3) module origins of one run
+        width, height (float): Module size (mm)
+        z (float):             Z of the outline, the origins' Z if None
+
+    Returns:
+        ndarray: (4 K + 1, 3) closed polyline points
+    """
+    corners = np.array([[0.0, 0.0, 0.0], [0.0, height, 0.0],
+                        [width, height, 0.0], [width, 0.0, 0.0]])
+    points = (run[:, np.newaxis, :] + corners).reshape(-1, 3)
+    if z is not None:
+        points[:, 2] = z
+    return np.vstack([points, points[:1]])
@@ -0,0 +1,156 @@
+"""
+Solar Logger - Buffered logging for scripts and PythonParts
+============================================================================
+Log calls only append the record to an in-memory buffer; the buffer is
+formatted and written with a single file open when it is full, when an
+ERROR is logged, or when flush_logs() is called. Each log file gets one
+buffer shared by all loggers writing to it.
+
+Levels: TRACE (5) for per-module tracing, then the standard DEBUG, INFO,
+WARNING, ERROR plus SUCCESS (25). The level can be overridden with the
+SOLAR_LOG_LEVEL environment variable (e.g. SOLAR_LOG_LEVEL=TRACE); at the
+default levels per-module TRACE calls return before creating a record.
+
+Call flush_logs() at the end of create_element / main to write everything
+that is still buffered.
+============================================================================
+"""
+
+import atexit
+import logging
+import os
+import sys
+
+# ============================================================================
+# LEVELS AND FORMATS
+# ============================================================================
+
+TRACE = 5
+SUCCESS = 25
+
+logging.addLevelName(TRACE, "TRACE")
+logging.addLevelName(SUCCESS, "SUCCESS")
+
+LEVEL_ENV_VAR = "SOLAR_LOG_LEVEL"
+TIMESTAMP_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+MESSAGE_FORMAT = "%(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+BUFFER_CAPACITY = 1000  # records kept in memory before writing
+
+# Logger name -> logger, log file path -> BufferedFileHandler
+_loggers = {}
+_file_handlers = {}
+
+# ============================================================================
+# LOGGER AND HANDLER
+# ============================================================================
+
+class _SolarLogger(logging.Logger):
+    """
+    Logger without caller lookup
+
+    The formats used here never show file or line, so the stack walk done
+    by logging.Logger for every record is skipped.
+    """
+
+    def findCaller(self, stack_info=False, stacklevel=1):
+        return "(unknown file)", 0, "(unknown function)", None
+
+
+class BufferedFileHandler(logging.Handler):
+    """Handler collecting records in memory and appending them to a file in batches"""
+
+    def __init__(self, log_file, capacity=BUFFER_CAPACITY, flush_level=logging.ERROR):
+        """
+        Initialisation of class BufferedFileHandler
+
+        Args:
+            log_file (str):    Path of the log file (appended to)
+            capacity (int):    Number of buffered records that triggers a write
+            flush_level (int): Records at or above this level are written at once
+        """
+        super().__init__()
+        self.log_file = log_file
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.buffer = []
+
+    def emit(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.capacity or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if not self.buffer:
+                return
+            records, self.buffer = self.buffer, []
+            text = "".join(self.format(record) + "\n" for record in records)
+            with open(self.log_file, "a") as f:
+                f.write(text)
+        except OSError:
+            pass  # logging must never break element creation
+        finally:
+            self.release()
+
+
+def _level_from_env(default):
+    """Return the level set in SOLAR_LOG_LEVEL, or default"""
+    name = os.environ.get(LEVEL_ENV_VAR, "").strip().upper()
+    if not name:
+        return default
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else default
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+def get_logger(name, log_file, level=logging.INFO, fmt=TIMESTAMP_FORMAT, console=False):
+    """
+    Return a logger writing to log_file through a shared buffer
+
+    Calling it again with the same name returns the same, already configured
+    logger, so it is safe at module level of reloaded PythonParts.
+
+    Args:
+        name (str):      Logger name
+        log_file (str):  Path of the log file (appended to)
+        level (int):     Minimum level, SOLAR_LOG_LEVEL takes precedence
+        fmt (str):       Record format (used when the file is first opened)
+        console (bool):  Also echo the records to stdout immediately
+
+    Returns:
+        logging.Logger: Configured logger
+    """
+    if name in _loggers:
+        return _loggers[name]
+
+    formatter = logging.Formatter(fmt, DATE_FORMAT)
+    log_file = os.path.abspath(os.path.expanduser(log_file))
+    if log_file not in _file_handlers:
+        file_handler = BufferedFileHandler(log_file)
+        file_handler.setFormatter(formatter)
+        _file_handlers[log_file] = file_handler
+
+    logger = _SolarLogger(name, _level_from_env(level))
+    logger.propagate = False
+    logger.addHandler(_file_handlers[log_file])
+
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+
+    _loggers[name] = logger
+    return logger
+
+
+def flush_logs():
+    """Write the buffered records of all log files"""
+    for file_handler in _file_handlers.values():
+        file_handler.flush()
+
+
+atexit.register(flush_logs)
@@ -0,0 +1,210 @@
+"""
+Run Manifest - What the last run put into the document
+============================================================================
+The manifest records, per generated project, the hash of its layout
+parameters (the layout cache key, its roof, bays and level of detail), its
+placement and the ids of the elements inserted for it. The next run
+compares the config against it:
+
+    added      project not in the manifest
+    changed    parameters or placement differ: new elements are inserted,
+               then the recorded ones are deleted
+    unchanged  skipped, its elements stay in the document
+    removed    in the manifest but no longer (enabled) in the config: its
+               elements are deleted
+    invalid    in the config but its parameters can't be compared (a
+               streamed project that fails validation): its elements stay
+
+This module only compares and stores; inserting and deleting is done by the
+caller, so the diff works the same with Allplan, the headless backend or a
+fake document.
+============================================================================
+"""
+
+import hashlib
+import json
+import os
+
+from .layout_cache import layout_key, _normalize
+from .lod import FULL, parse_lod
+
+MANIFEST_VERSION = 1
+
+ADDED = "added"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+INVALID = "invalid"
+
+DEFAULT_ROOF = {'createSecondSide': False, 'angle': 0, 'ridgeHeight': 0}
+
+
+def project_hash(project):
+    """
+    Hash of the parameters that shape a project (name and placement excluded)
+
+    The level of detail is hashed by its name, so 0, "full" and "Full" are
+    the same project.
+    """
+    key = layout_key(project)
+    lod = parse_lod(project.get('lod'))
+    roof = {**DEFAULT_ROOF, **project.get('roof', {})}
+    shape = [key, _normalize(roof), _normalize(project.get('bays'))]
+    if lod != FULL:
+        shape.append(lod)  # same layout, other geometry
+    text = json.dumps(shape, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def project_placement(project):
+    """Placement of a project as [x, y, z] floats"""
+    placement = project['placement']
+    return [float(placement['x']), float(placement['y']), float(placement['z'])]
+
+
+class ManifestDiff:
+    """Project names by status, in config order"""
+
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.unchanged = []
+        self.removed = []
+        self.invalid = []
+
+    def add(self, status, name):
+        getattr(self, status).append(name)
+
+    @property
+    def config_names(self):
+        """Names of every project read from the config, valid or not"""
+        return set(self.added) | set(self.changed) | set(self.unchanged) | set(self.invalid)
+
+    @property
+    def has_changes(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        text = (f"{len(self.added)} added, {len(self.changed)} changed, "
+                f"{len(self.removed)} removed, {len(self.unchanged)} unchanged")
+        return text + f", {len(self.invalid)} invalid" if self.invalid else text
+
+
+class RunManifest:
+    """Projects generated into one document by earlier runs"""
+
+    def __init__(self, document=None, projects=None):
+        """
+        Initialisation of class RunManifest
+
+        Args:
+            document (str):  Name of the document the projects were inserted into
+            projects (dict): name -> {'hash', 'placement', 'elements'}
+        """
+        self.document = document
+        self.projects = projects or {}
+
+    @classmethod
+    def load(cls, manifest_file):
+        """
+        Load a manifest, an empty one if the file doesn't exist
+
+        Args:
+            manifest_file (str): Path to the manifest
+
+        Returns:
+            RunManifest: Loaded manifest
+
+        Raises:
+            ValueError: If the file is not a manifest of this version
+        """
+        if not os.path.exists(manifest_file):
+            return cls()
+        try:
+            with open(manifest_file, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid manifest {manifest_file}: {e}") from None
+        if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest {manifest_file}: "
+                             f"expected version {MANIFEST_VERSION}")
+        return cls(data.get('document'), data.get('projects', {}))
+
+    def save(self, manifest_file):
+        """
+        Write the manifest (to a temporary file first, then renamed)
+
+        Args:
+            manifest_file (str): Path to the manifest
+        """
+        temp_file = manifest_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION,
+                       'document': self.document,
+                       'projects': self.projects}, f, indent=1)
+        os.replace(temp_file, manifest_file)
+
+    def status(self, project):
+        """
+        Compare a project with its last run
+
+        Args:
+            project (dict): Project parameters
+
+        Returns:
+            str: ADDED, CHANGED or UNCHANGED
+        """
+        entry = self.projects.get(project['name'])
+        if entry is None:
+            return ADDED
+        if (entry['hash'] != project_hash(project) or
+                entry['placement'] != project_placement(project)):
+            return CHANGED
+        return UNCHANGED
+
+    def record(self, project, element_ids):
+        """
+        Record a generated project
+
+        Args:
+            project (dict):     Project parameters
+            element_ids (list): Ids of the inserted elements, None if unknown
+
+        Returns:
+            dict: Previous entry of the project (its elements are now
+            obsolete), None if it is new
+        """
+        previous = self.projects.get(project['name'])
+        self.projects[project['name']] = {
+            'hash': project_hash(project),
+            'placement': project_placement(project),
+            'elements': element_ids,
+        }
+        return previous
+
+    def forget(self, name):
+        """Remove a project, return its entry"""
+        return self.projects.pop(name, None)
+
+
+def diff_projects(manifest, projects):
+    """
+    Compare the enabled projects of a config with a manifest
+
+    Args:
+        manifest (RunManifest): Last run
+        projects (iterable):    Enabled project configurations
+
+    Returns:
+        ManifestDiff: Project names by status
+    """
+    diff = ManifestDiff()
+    for project in projects:
+        try:
+            diff.add(manifest.status(project), project['name'])
+        except (KeyError, TypeError, ValueError):
+            if isinstance(project.get('name'), str):
+                diff.add(INVALID, project['name'])
+    seen = diff.config_names
+    diff.removed = [name for name in manifest.projects if name not in seen]
+    return diff
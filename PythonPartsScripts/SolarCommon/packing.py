@@ -0,0 +1,309 @@
+"""
+Panel Packing - Mixed-orientation panel layouts
+============================================================================
+A single-orientation grid (fit_grid) leaves a strip along the surface edge
+empty whenever the surface is not a multiple of the panel pitch. pack_panels
+fills the surface with blocks of panels as given and rotated by 90 degrees
+to get more panels in.
+
+Panels are handled by their pitch (size + spacing) in a surface enlarged by
+one spacing, so blocks placed side by side keep the spacing between them.
+The search has two stages:
+
+    1. two-block patterns: k columns (or rows) of one orientation, the rest
+       of the surface filled with the other one - O(n), always run
+    2. guillotine strip peeling: dynamic programming over the raster points
+       of the surface (widths and heights made of whole panel pitches);
+       every step cuts a full-height column or full-width row of one
+       orientation off the remaining rectangle. Exact for this family of
+       layouts, but O(n^2), so it stops at the time budget and the best
+       stage-1 layout is kept. Without a time budget it always finishes,
+       so the result only depends on the arguments.
+
+The result is never worse than the grid it replaces: if mixing orientations
+gains nothing, the plain grid is returned.
+============================================================================
+"""
+
+import math
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import wraps
+
+from .layout import block_grid, fit_grid
+
+DEFAULT_TIME_BUDGET = 0.2  # seconds for the exact search
+PACKING_CACHE_SIZE = 64    # packings kept by pack_panels
+EPS = 1e-6                 # mm, tolerance of the fit comparisons
+
+# ============================================================================
+# RESULT
+# ============================================================================
+
+class PanelBlock:
+    """
+    Uniform block of panels of a packing
+
+    Attributes:
+        x, y (float):                      Lower-left corner in the surface (mm)
+        rotated (bool):                    Panels turned by 90 degrees
+        panel_width, panel_height (float): Panel size in this block (mm)
+        grid (GridFit):                    Panel cells relative to (x, y)
+    """
+
+    def __init__(self, x, y, rotated, panel_width, panel_height, grid):
+        self.x = x
+        self.y = y
+        self.rotated = rotated
+        self.panel_width = panel_width
+        self.panel_height = panel_height
+        self.grid = grid
+
+
+class PackingResult:
+    """
+    Packed surface
+
+    Attributes:
+        blocks (list):        PanelBlocks
+        panel_count (int):    Panels of all blocks
+        grid_count (int):     Panels of the single-orientation grid
+        used_width (float):   Extent of the blocks in X (mm)
+        used_height (float):  Extent of the blocks in Y (mm)
+        complete (bool):      The exact search finished within the time budget
+        elapsed (float):      Search time (s)
+    """
+
+    def __init__(self, blocks, grid_count, complete, elapsed):
+        self.blocks = blocks
+        self.panel_count = sum(block.grid.panel_count for block in blocks)
+        self.grid_count = grid_count
+        self.used_width = max((block.x + block.grid.used_width for block in blocks), default=0.0)
+        self.used_height = max((block.y + block.grid.used_height for block in blocks), default=0.0)
+        self.complete = complete
+        self.elapsed = elapsed
+
+    @property
+    def gain(self):
+        """Panels gained over the grid"""
+        return self.panel_count - self.grid_count
+
+    @property
+    def gain_ratio(self):
+        """Relative gain over the grid (0.1 = 10 % more panels)"""
+        return self.gain / self.grid_count if self.grid_count else 0.0
+
+    def describe_gain(self):
+        """Gain as text, e.g. '+3 modules (+15.0 %)'"""
+        text = f"{self.gain:+d} modules ({self.gain_ratio:+.1%})"
+        return text if self.complete else text + ", time budget reached"
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+# Strips are (x, y, orientation, cols, rows) in pitch space; orientation 0
+# is the panel as given, 1 rotated. sizes[o] is the (x, y) pitch.
+
+def _fit(length, pitch):
+    return int((length + EPS) // pitch)
+
+
+def _two_block_layouts(width, height, sizes):
+    """Best stage-1 layout: (count, strips)"""
+    best_count, best_strips = 0, []
+    for o in (0, 1):
+        q = 1 - o
+        (ow, oh), (qw, qh) = sizes[o], sizes[q]
+
+        # k columns of o on the left, the rest in q
+        o_rows, q_rows = _fit(height, oh), _fit(height, qh)
+        for k in range(_fit(width, ow) + 1):
+            q_cols = _fit(width - k * ow, qw)
+            count = k * o_rows + q_cols * q_rows
+            if count > best_count:
+                best_count = count
+                best_strips = [(0.0, 0.0, o, k, o_rows), (k * ow, 0.0, q, q_cols, q_rows)]
+
+        # k rows of o at the bottom, the rest in q
+        o_cols, q_cols = _fit(width, ow), _fit(width, qw)
+        for k in range(_fit(height, oh) + 1):
+            q_rows = _fit(height - k * oh, qh)
+            count = k * o_cols + q_cols * q_rows
+            if count > best_count:
+                best_count = count
+                best_strips = [(0.0, 0.0, o, o_cols, k), (0.0, k * oh, q, q_cols, q_rows)]
+
+    return best_count, [strip for strip in best_strips if strip[3] and strip[4]]
+
+
+def _raster(length, a, b, deadline):
+    """Sorted lengths i*a + j*b <= length, None if the deadline is reached"""
+    values = set()
+    for i in range(_fit(length, a) + 1):
+        if time.perf_counter() > deadline:
+            return None
+        for j in range(_fit(length - i * a, b) + 1):
+            values.add(round(i * a + j * b, 6))
+    return sorted(values)
+
+
+def _peeling_layout(width, height, sizes, deadline):
+    """
+    Best stage-2 layout: (count, strips), None if the deadline is reached
+
+    best[i][j] is the panel count of the rectangle raster_x[i] x raster_y[j];
+    a cut leaves the largest raster rectangle fitting in the rest. The
+    tables are built row by row, so their setup counts against the deadline.
+    """
+    raster_x = _raster(width, *sizes[0], deadline)
+    raster_y = _raster(height, *sizes[0], deadline) if raster_x is not None else None
+    if raster_y is None or time.perf_counter() > deadline:
+        return None
+    nx, ny = len(raster_x), len(raster_y)
+
+    def peel(raster, pitch):
+        return [bisect_right(raster, value - pitch + EPS) - 1 if value >= pitch - EPS else -1
+                for value in raster]
+
+    peel_x = [peel(raster_x, sizes[o][0]) for o in (0, 1)]
+    peel_y = [peel(raster_y, sizes[o][1]) for o in (0, 1)]
+    fit_x = [[_fit(value, sizes[o][0]) for value in raster_x] for o in (0, 1)]
+    fit_y = [[_fit(value, sizes[o][1]) for value in raster_y] for o in (0, 1)]
+
+    best = []
+    choice = []  # o: column of o, 2 + o: row of o
+    for i in range(nx):
+        if time.perf_counter() > deadline:
+            return None
+        row, row_choice = [0] * ny, [-1] * ny
+        best.append(row)
+        choice.append(row_choice)
+        for j in range(ny):
+            value, cut = 0, -1
+            for o in (0, 1):
+                pi = peel_x[o][i]
+                if pi >= 0 and best[pi][j] + fit_y[o][j] > value:
+                    value, cut = best[pi][j] + fit_y[o][j], o
+                pj = peel_y[o][j]
+                if pj >= 0 and row[pj] + fit_x[o][i] > value:
+                    value, cut = row[pj] + fit_x[o][i], 2 + o
+            row[j] = value
+            row_choice[j] = cut
+
+    # Follow the cuts from the whole surface
+    strips = []
+    x = y = 0.0
+    i, j = nx - 1, ny - 1
+    while choice[i][j] >= 0:
+        cut = choice[i][j]
+        o = cut % 2
+        if cut < 2:
+            strips.append((x, y, o, 1, fit_y[o][j]))
+            x += sizes[o][0]
+            i = peel_x[o][i]
+        else:
+            strips.append((x, y, o, fit_x[o][i], 1))
+            y += sizes[o][1]
+            j = peel_y[o][j]
+    return best[nx - 1][ny - 1], _merge_strips(strips, sizes)
+
+
+def _merge_strips(strips, sizes):
+    """Join a strip into the previous block if it extends it to a bigger block"""
+    blocks = []
+    for x, y, o, cols, rows in strips:
+        if not cols or not rows:
+            continue
+        if blocks:
+            bx, by, bo, bcols, brows = blocks[-1]
+            pitch_x, pitch_y = sizes[o]
+            if bo == o and abs(by - y) < EPS and brows == rows and abs(bx + bcols * pitch_x - x) < EPS:
+                blocks[-1] = (bx, by, bo, bcols + cols, brows)
+                continue
+            if bo == o and abs(bx - x) < EPS and bcols == cols and abs(by + brows * pitch_y - y) < EPS:
+                blocks[-1] = (bx, by, bo, bcols, brows + rows)
+                continue
+        blocks.append((x, y, o, cols, rows))
+    return blocks
+
+
+def _cache_complete(maxsize):
+    """
+    lru_cache for pack_panels that only keeps finished searches
+
+    A search stopped by the time budget depends on the machine load at that
+    moment, so it is not returned again: the next call searches anew.
+    """
+    def decorate(function):
+        cache = OrderedDict()
+
+        @wraps(function)
+        def cached(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                return result
+            result = function(*args, **kwargs)
+            if result.complete:
+                cache[key] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        cached.cache_clear = cache.clear
+        return cached
+    return decorate
+
+
+@_cache_complete(maxsize=PACKING_CACHE_SIZE)
+def pack_panels(surface_width, surface_height, panel_width, panel_height, spacing,
+                time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Fill a surface with panels in both orientations to maximize their number
+
+    Memoized like fit_grid: the blocks are shared, don't modify them.
+    Results of a search stopped by the time budget are not memoized.
+
+    Args:
+        surface_width, surface_height (float): Available surface (mm)
+        panel_width, panel_height (float):      Panel size as in the grid (mm)
+        spacing (float):                        Gap between panels (mm)
+        time_budget (float):                    Seconds for the exact search, None
+                                                for no limit (reproducible result)
+
+    Returns:
+        PackingResult: Blocks and gain over fit_grid with the same arguments
+
+    Raises:
+        ValueError: If a panel size plus spacing is not positive
+    """
+    if panel_width + spacing <= 0 or panel_height + spacing <= 0:
+        raise ValueError("panel size plus spacing must be > 0")
+
+    start = time.perf_counter()
+    grid = fit_grid(surface_width, surface_height, panel_width, panel_height, spacing)
+
+    width, height = surface_width + spacing, surface_height + spacing
+    sizes = ((panel_width + spacing, panel_height + spacing),
+             (panel_height + spacing, panel_width + spacing))
+
+    count, strips = _two_block_layouts(width, height, sizes)
+    deadline = start + time_budget if time_budget is not None else math.inf
+    exact = _peeling_layout(width, height, sizes, deadline)
+    if exact is not None and exact[0] > count:
+        count, strips = exact
+
+    elapsed = time.perf_counter() - start
+    if count <= grid.panel_count:
+        blocks = [PanelBlock(0.0, 0.0, False, panel_width, panel_height, grid)]
+        return PackingResult(blocks, grid.panel_count, exact is not None, elapsed)
+
+    panel_sizes = ((panel_width, panel_height), (panel_height, panel_width))
+    blocks = []
+    for x, y, o, cols, rows in strips:
+        block_width, block_height = panel_sizes[o]
+        blocks.append(PanelBlock(x, y, o == 1, block_width, block_height,
+                                 block_grid(rows, cols, block_width, block_height, spacing)))
+    return PackingResult(blocks, grid.panel_count, exact is not None, elapsed)
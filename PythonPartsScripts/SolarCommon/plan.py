@@ -0,0 +1,93 @@
+"""
+Plan Symbols - Lightweight 2D representation of module arrays
+============================================================================
+Plan views of PythonParts built with add_pythonpart_view_2d3d render every
+3D solid. With plan symbols the creators add their solids as a 3D-only view
+and a separate 2D view holding:
+
+    - the module rectangles, one closed polyline per row (per run of
+      adjacent modules when a row has holes, see SolarCommon.lod.row_runs)
+    - the outline of the surface or support plate
+
+so a plan with 20,000 modules draws a few hundred polylines.
+
+The outlines are computed here as (K, 2) point arrays in plan coordinates
+(rotated roof sides are projected onto XY); polyline_2d turns them into
+Allplan geometry.
+============================================================================
+"""
+
+import NemAll_Python_Geometry as AllplanGeo
+
+import numpy as np
+
+from .layout import transform_points
+from .lod import row_runs, run_outline
+
+
+def module_outlines(origins, width, height, gap, transform=None):
+    """
+    Plan outlines of the modules, one closed polyline per row run
+
+    Args:
+        origins (ndarray):     (N, 3) lower-left corners of the modules, in
+                               the plane that is drawn (e.g. the module top)
+        width, height (float): Module size (mm)
+        gap (float):           Gap between two adjacent modules of a row (mm)
+        transform (ndarray):   (4, 4) matrix placing the modules, None for none
+
+    Returns:
+        list: (4 K + 1, 2) point arrays, one per row run
+    """
+    outlines = []
+    for run in row_runs(origins, width, gap):
+        points = run_outline(run, width, height)
+        if transform is not None:
+            points = transform_points(transform, points)
+        outlines.append(points[:, :2])
+    return outlines
+
+
+def box_outline(box, transform=None):
+    """
+    Plan outline of the top face of a [[x1, y1, z1], [x2, y2, z2]] box
+
+    Args:
+        box (ndarray):        (2, 3) min and max corner
+        transform (ndarray):  (4, 4) matrix placing the box, None for none
+
+    Returns:
+        ndarray: (5, 2) closed polyline points
+    """
+    (x1, y1, _), (x2, y2, z2) = np.asarray(box, dtype=float).tolist()
+    points = np.array([[x1, y1, z2], [x2, y1, z2], [x2, y2, z2], [x1, y2, z2], [x1, y1, z2]])
+    if transform is not None:
+        points = transform_points(transform, points)
+    return points[:, :2]
+
+
+def polygon_outline(polygon):
+    """
+    Closed plan outline of a polygon
+
+    Args:
+        polygon (tuple): ((x, y), ...) points (mm)
+
+    Returns:
+        ndarray: (n + 1, 2) closed polyline points
+    """
+    points = np.asarray(polygon, dtype=float)
+    return np.vstack([points, points[:1]])
+
+
+def polyline_2d(points):
+    """
+    Polyline2D through plan points
+
+    Args:
+        points (ndarray): (K, 2) points (mm)
+
+    Returns:
+        Polyline2D: Polyline through the points
+    """
+    return AllplanGeo.Polyline2D([AllplanGeo.Point2D(x, y) for x, y in points.tolist()])
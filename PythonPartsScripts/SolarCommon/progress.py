@@ -0,0 +1,239 @@
+"""
+Progress - Row-chunked generation with progress and cancellation
+============================================================================
+Big projects are generated as a stream of row chunks: a generator builds
+the elements of a few module rows, the caller inserts them and drops them
+before the next chunk is built. Peak memory is then bounded by the chunk
+size instead of the project size.
+
+    RowChunk          elements of one chunk and the number of rows they cover
+    ProgressReporter  rows done, elements/s and ETA, reported at most once
+                      per interval
+    CancelToken       set by Ctrl+C or a stop file, checked between chunks
+    consume_chunks    drives the pipeline: chunk -> sink -> progress, and
+                      stops cleanly between two chunks when cancelled
+
+A chunk is never cut: cancellation only takes effect before the next chunk
+is built, so everything passed to the sink is complete.
+============================================================================
+"""
+
+import os
+import signal
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+PROGRESS_INTERVAL = 1.0  # seconds between two progress reports
+
+# elements: list of model elements, rows: module rows covered (0 for e.g. a plate alone)
+RowChunk = namedtuple('RowChunk', ['elements', 'rows'])
+
+
+class GenerationCancelled(Exception):
+    """Raised when a generation is stopped between two chunks"""
+
+
+class CancelToken:
+    """
+    Cancellation request, checked between chunks
+
+    A token is cancelled by cancel(), by Ctrl+C while on_interrupt() is
+    active, or when its stop file exists (for macros inside Allplan, where
+    there is no console to interrupt).
+    """
+
+    def __init__(self, stop_file=None):
+        """
+        Initialisation of class CancelToken
+
+        Args:
+            stop_file (str): Creating this file cancels the run, None for none
+        """
+        self.stop_file = stop_file
+        self.reason = None
+
+    @property
+    def cancelled(self):
+        """True once cancellation was requested"""
+        if self.reason is None and self.stop_file and os.path.exists(self.stop_file):
+            self.reason = f"stop file {self.stop_file}"
+        return self.reason is not None
+
+    def cancel(self, reason="cancelled"):
+        """Request cancellation, the first reason is kept"""
+        if self.reason is None:
+            self.reason = reason
+
+    def check(self):
+        """
+        Raise if cancellation was requested
+
+        Raises:
+            GenerationCancelled: With the reason
+        """
+        if self.cancelled:
+            raise GenerationCancelled(self.reason)
+
+    def clear_stop_file(self):
+        """
+        Remove a stop file left by an earlier run
+
+        Returns:
+            bool: True if a stop file was removed
+        """
+        if self.stop_file and os.path.exists(self.stop_file):
+            os.remove(self.stop_file)
+            return True
+        return False
+
+    @contextmanager
+    def on_interrupt(self):
+        """
+        Turn the first Ctrl+C into a cancellation between chunks
+
+        A second Ctrl+C interrupts immediately (KeyboardInterrupt). Outside
+        the main thread the handler cannot be installed and this does nothing.
+        """
+        def handler(signum, frame):
+            if self.reason is not None:
+                raise KeyboardInterrupt
+            self.cancel("interrupted (Ctrl+C)")
+
+        try:
+            previous = signal.signal(signal.SIGINT, handler)
+        except ValueError:
+            yield self
+            return
+        try:
+            yield self
+        finally:
+            signal.signal(signal.SIGINT, previous)
+
+
+def ignore_interrupts():
+    """Process pool initializer: workers leave Ctrl+C to the main process"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class ProgressReporter:
+    """
+    Progress of a row-chunked generation
+
+    Rates are computed from the start of the generation: rows/s gives the
+    ETA, elements/s is reported for comparison between runs.
+    """
+
+    def __init__(self, total_rows, report, interval=PROGRESS_INTERVAL, clock=time.perf_counter):
+        """
+        Initialisation of class ProgressReporter
+
+        Args:
+            total_rows (int):  Rows of the whole generation, None if unknown
+            report (callable): Called with the progress message
+            interval (float):  Minimum seconds between two reports
+            clock (callable):  Time source in seconds
+        """
+        self.total_rows = total_rows
+        self.report = report
+        self.interval = interval
+        self.clock = clock
+        self.rows = 0
+        self.elements = 0
+        self.start = clock()
+        self.last_report = self.start
+        self.reported = None  # (rows, elements) of the last report
+
+    @property
+    def elapsed(self):
+        """Seconds since the start"""
+        return self.clock() - self.start
+
+    def update(self, rows, elements):
+        """
+        Count a finished chunk, report if the interval has passed
+
+        Args:
+            rows (int):     Rows of the chunk
+            elements (int): Elements of the chunk
+        """
+        self.rows += rows
+        self.elements += elements
+        now = self.clock()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.reported = (self.rows, self.elements)
+            self.report(self.message())
+
+    def finish(self):
+        """Report the final totals, unless the last report already showed them"""
+        if self.reported != (self.rows, self.elements):
+            self.report(self.message())
+
+    def eta(self):
+        """
+        Estimated seconds until all rows are done
+
+        Returns:
+            float: Seconds, None without total or before the first row
+        """
+        elapsed = self.elapsed
+        if not self.total_rows or not self.rows or elapsed <= 0:
+            return None
+        return max(self.total_rows - self.rows, 0) * elapsed / self.rows
+
+    def message(self):
+        """Rows done, elements, elements/s and ETA as one line"""
+        elapsed = self.elapsed
+        rate = self.elements / elapsed if elapsed > 0 else 0.0
+        if self.total_rows:
+            rows = f"{self.rows}/{self.total_rows} rows ({self.rows / self.total_rows:.0%})"
+        else:
+            rows = f"{self.rows} rows"
+        eta = self.eta()
+        eta = "" if eta is None or self.rows >= (self.total_rows or 0) else f", ETA {eta:.1f} s"
+        return f"{rows}, {self.elements:,} elements in {elapsed:.1f} s ({rate:,.0f} elements/s){eta}"
+
+
+def consume_chunks(chunks, sink, progress=None, cancel=None):
+    """
+    Pass row chunks to a sink one at a time
+
+    The next chunk is only built (the generator resumed) after the sink
+    returned, so a single chunk of elements is alive at a time. Cancellation
+    is checked before every chunk.
+
+    Args:
+        chunks (iterable):           RowChunk generator
+        sink (callable):             Called with the elements of each chunk,
+                                     a false result stops the pipeline
+        progress (ProgressReporter): Progress to update, None for none
+        cancel (CancelToken):        Cancellation to check, None for none
+
+    Returns:
+        bool: True if every chunk was consumed and accepted
+
+    Raises:
+        GenerationCancelled: When cancelled between two chunks; the chunks
+        passed to the sink so far are complete
+    """
+    chunks = iter(chunks)
+    try:
+        while True:
+            if cancel is not None:
+                cancel.check()
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            if not sink(chunk.elements):
+                return False
+            if progress is not None:
+                progress.update(chunk.rows, len(chunk.elements))
+            chunk = None  # released before the next chunk is built
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+    if progress is not None:
+        progress.finish()
+    return True
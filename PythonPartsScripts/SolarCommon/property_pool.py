@@ -0,0 +1,54 @@
+"""
+Property Pool - Shared CommonProperties per (color, line style, layer)
+============================================================================
+The creators used to build a new CommonProperties object for every element
+just to set the same color. get_common_properties() hands back one shared
+instance per key instead, so an array allocates a handful of property
+objects regardless of its size.
+
+The returned objects are shared: never modify them, ask the pool for a
+different key instead.
+============================================================================
+"""
+
+import NemAll_Python_BaseElements as AllplanBaseElements
+
+# (color, line style, layer) -> CommonProperties
+_pool = {}
+
+
+def get_common_properties(color, line_style=None, layer=None):
+    """
+    Return the shared CommonProperties for a color, line style and layer
+
+    Args:
+        color (int):       Allplan color ID
+        line_style (int):  Allplan line style ID, Allplan default if None
+        layer (int):       Allplan layer ID, Allplan default if None
+
+    Returns:
+        CommonProperties: Shared instance, must not be modified
+    """
+    key = (color, line_style, layer)
+    props = _pool.get(key)
+
+    if props is None:
+        props = AllplanBaseElements.CommonProperties()
+        props.Color = color
+        if line_style is not None:
+            props.LineStyle = line_style
+        if layer is not None:
+            props.Layer = layer
+        _pool[key] = props
+
+    return props
+
+
+def pool_size():
+    """Number of property objects created so far"""
+    return len(_pool)
+
+
+def clear_pool():
+    """Drop all pooled objects (e.g. after the Allplan defaults changed)"""
+    _pool.clear()
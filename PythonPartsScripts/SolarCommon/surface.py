@@ -0,0 +1,316 @@
+"""
+Panel Surface - Polygonal surfaces with obstacles
+============================================================================
+Real roofs are not rectangles: the outline can be any polygon and columns,
+skylights or drains cut holes into it. fit_surface fits the panel grid into
+the bounding box of the boundary and keeps the cells whose panel lies inside
+the boundary and clear of every obstacle.
+
+A cell is rejected when an edge of the boundary or of an obstacle passes
+through its panel, or when the panel center lies outside the boundary or
+inside an obstacle. The cells are put into a uniform grid index (RectIndex),
+so each edge and obstacle is only tested against the cells near it instead
+of all of them.
+
+Polygons are given as text, as typed into a palette:
+
+    boundary     "0,0; 20000,0; 20000,8000; 6000,14000; 0,14000"
+    obstacles    "5000,5000; 5400,5000; 5400,5400; 5000,5400 | ..."
+============================================================================
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .layout import GridFit, fit_grid
+from .lod import row_runs
+
+SURFACE_FIT_CACHE_SIZE = 64  # fitted surfaces kept by fit_surface
+EPS = 1e-6                   # mm, panels touching an edge are not rejected
+
+# ============================================================================
+# POLYGONS
+# ============================================================================
+
+def parse_polygon(text):
+    """
+    Parse a polygon "x,y; x,y; ..."
+
+    Args:
+        text (str): Points in mm, the closing point may be repeated
+
+    Returns:
+        tuple: ((x, y), ...) float points, None if the text is empty
+
+    Raises:
+        ValueError: If a point is not a pair of numbers or there are fewer
+            than 3 points
+    """
+    if not text or not text.strip():
+        return None
+    points = []
+    for item in text.split(';'):
+        if not item.strip():
+            continue
+        try:
+            x, y = (float(value) for value in item.split(','))
+        except ValueError:
+            raise ValueError(f"Invalid polygon point '{item.strip()}', expected 'x,y'") from None
+        if not (np.isfinite(x) and np.isfinite(y)):
+            raise ValueError(f"Invalid polygon point '{item.strip()}'")
+        points.append((x, y))
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    if len(points) < 3:
+        raise ValueError(f"A polygon needs at least 3 points: '{text.strip()}'")
+    return tuple(points)
+
+
+def parse_polygons(text):
+    """
+    Parse polygons separated by '|'
+
+    Args:
+        text (str): Polygons as for parse_polygon
+
+    Returns:
+        tuple: Parsed polygons, empty if the text is empty
+    """
+    if not text:
+        return ()
+    return tuple(polygon for polygon in map(parse_polygon, text.split('|')) if polygon)
+
+
+def rectangle_polygon(width, height):
+    """Polygon of the rectangle (0, 0) - (width, height)"""
+    return ((0.0, 0.0), (float(width), 0.0), (float(width), float(height)), (0.0, float(height)))
+
+
+def polygon_edges(polygon):
+    """(N, 4) array of the closed polygon edges [x0, y0, x1, y1]"""
+    points = np.asarray(polygon, dtype=float)
+    return np.hstack([points, np.roll(points, -1, axis=0)])
+
+
+def points_in_polygon(polygon, points):
+    """
+    Even-odd test of many points against one polygon
+
+    Args:
+        polygon (tuple): ((x, y), ...) points
+        points (ndarray): (N, 2) points to test
+
+    Returns:
+        ndarray: (N,) bool, True for the points inside
+    """
+    x, y = points[:, 0], points[:, 1]
+    inside = np.zeros(len(points), dtype=bool)
+    for x0, y0, x1, y1 in polygon_edges(polygon).tolist():
+        if y0 == y1:
+            continue
+        crosses = (y0 > y) != (y1 > y)
+        inside ^= crosses & (x < x0 + (y - y0) * (x1 - x0) / (y1 - y0))
+    return inside
+
+
+def segment_hits(x0, y0, x1, y1, mins, maxs):
+    """
+    Liang-Barsky test of one segment against many rectangles
+
+    Args:
+        x0, y0, x1, y1 (float): Segment (mm)
+        mins, maxs (ndarray):   (N, 2) rectangle corners
+
+    Returns:
+        ndarray: (N,) bool, True for the rectangles the segment passes through
+    """
+    dx, dy = x1 - x0, y1 - y0
+    t0 = np.zeros(len(mins))
+    t1 = np.ones(len(mins))
+    hits = np.ones(len(mins), dtype=bool)
+    for p, q in ((-dx, x0 - mins[:, 0]), (dx, maxs[:, 0] - x0),
+                 (-dy, y0 - mins[:, 1]), (dy, maxs[:, 1] - y0)):
+        if p == 0:
+            hits &= q >= 0
+        elif p < 0:
+            t0 = np.maximum(t0, q / p)
+        else:
+            t1 = np.minimum(t1, q / p)
+    return hits & (t0 <= t1)
+
+# ============================================================================
+# SPATIAL INDEX
+# ============================================================================
+
+class RectIndex:
+    """
+    Uniform grid index of axis-aligned rectangles
+
+    Every rectangle is listed in the buckets it overlaps; the bucket lists
+    are stored sorted in one array, so a query only gathers slices.
+    """
+
+    def __init__(self, mins, maxs, bucket_size):
+        """
+        Initialisation of class RectIndex
+
+        Args:
+            mins, maxs (ndarray): (N, 2) rectangle corners
+            bucket_size (float):  Bucket edge length (mm), about the rectangle size
+        """
+        self.mins = mins
+        self.maxs = maxs
+        self.bucket_size = float(bucket_size)
+        self.origin = mins.min(axis=0) if len(mins) else np.zeros(2)
+
+        low = self._bucket(mins)
+        high = self._bucket(maxs)
+        self.shape = (high.max(axis=0) + 1) if len(mins) else np.ones(2, dtype=int)
+        nx = self.shape[0]
+
+        # One (bucket, rectangle) pair per bucket a rectangle overlaps
+        span = high - low + 1
+        counts = span[:, 0] * span[:, 1]
+        items = np.repeat(np.arange(len(mins)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        keys = ((low[items, 1] + offsets // span[items, 0]) * nx +
+                low[items, 0] + offsets % span[items, 0])
+
+        order = np.argsort(keys, kind='stable')
+        self.items = items[order]
+        self.starts = np.searchsorted(keys[order], np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def _bucket(self, points):
+        return np.floor((points - self.origin) / self.bucket_size).astype(int)
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """
+        Rectangles overlapping a box
+
+        Args:
+            xmin, ymin, xmax, ymax (float): Box (mm)
+
+        Returns:
+            ndarray: Sorted rectangle indices
+        """
+        nx, ny = self.shape
+        (bx0, by0), (bx1, by1) = self._bucket(np.array([[xmin, ymin], [xmax, ymax]]))
+        bx0, by0 = max(bx0, 0), max(by0, 0)
+        bx1, by1 = min(bx1, nx - 1), min(by1, ny - 1)
+        if bx0 > bx1 or by0 > by1:
+            return np.empty(0, dtype=int)
+
+        # Buckets of one bucket row are contiguous
+        found = np.unique(np.concatenate([
+            self.items[self.starts[by * nx + bx0]:self.starts[by * nx + bx1 + 1]]
+            for by in range(by0, by1 + 1)]))
+        overlap = ((self.mins[found, 0] <= xmax) & (self.maxs[found, 0] >= xmin) &
+                   (self.mins[found, 1] <= ymax) & (self.maxs[found, 1] >= ymin))
+        return found[overlap]
+
+# ============================================================================
+# SURFACE FIT
+# ============================================================================
+
+class SurfaceFit:
+    """
+    Panel grid fitted into a polygonal surface (see fit_surface)
+
+    Attributes:
+        x, y (float):    Lower-left corner of the grid, the boundary bounding box (mm)
+        grid (GridFit):  Grid of the bounding box, cells relative to (x, y);
+                         origins are the free cells (shared, read-only arrays)
+        rejected (int):  Cells dropped by the boundary or an obstacle
+    """
+
+    def __init__(self, x, y, grid, rejected):
+        self.x = x
+        self.y = y
+        self.grid = grid
+        self.rejected = rejected
+
+    @property
+    def panel_count(self):
+        """Number of panels on the surface"""
+        return self.grid.panel_count
+
+    def row_spans(self, panel_width, spacing):
+        """
+        X extent of every run of adjacent panels, per row holding panels
+
+        A row is cut where panels are left out by an obstacle or a notch of
+        the boundary (see SolarCommon.lod.row_runs).
+
+        Args:
+            panel_width (float): Panel size in X (mm)
+            spacing (float):     Gap between two adjacent panels (mm)
+
+        Returns:
+            dict: row -> [(x_start, x_end), ...] relative to x, sorted by x (mm)
+        """
+        spans = {}
+        for run in row_runs(self.grid.origins, panel_width, spacing):
+            row = int(np.rint(run[0, 1] / self.grid.pitch_y))
+            spans.setdefault(row, []).append((float(run[0, 0]), float(run[-1, 0]) + panel_width))
+        return spans
+
+
+@lru_cache(maxsize=SURFACE_FIT_CACHE_SIZE)
+def fit_surface(boundary, obstacles, panel_width, panel_height, spacing, clearance=0.0):
+    """
+    Fit the panel grid into a polygon, leaving out the obstacles
+
+    Memoized like fit_grid: pass the polygons as tuples (see parse_polygon).
+
+    Args:
+        boundary (tuple):                   Surface outline ((x, y), ...) (mm)
+        obstacles (tuple):                  Obstacle polygons
+        panel_width, panel_height (float):  Panel size (mm)
+        spacing (float):                    Gap between panels (mm)
+        clearance (float):                  Minimum distance of a panel to the
+                                            obstacles (mm)
+
+    Returns:
+        SurfaceFit: Free cells of the grid
+    """
+    points = np.asarray(boundary, dtype=float)
+    x, y = points.min(axis=0).tolist()
+    width, height = (points.max(axis=0) - points.min(axis=0)).tolist()
+    grid = fit_grid(width, height, panel_width, panel_height, spacing)
+
+    # Panel rectangles in surface coordinates, shrunk by EPS so that touching
+    # is allowed, and grown by the clearance for the obstacles
+    cells = grid.origins[:, :2] + (x, y)
+    panel_mins = cells + EPS
+    panel_maxs = cells + (panel_width, panel_height) - EPS
+    mins = panel_mins - clearance
+    maxs = panel_maxs + clearance
+    centers = cells + (panel_width / 2.0, panel_height / 2.0)
+
+    free = points_in_polygon(boundary, centers)
+    if len(cells):
+        index = RectIndex(mins, maxs, max(panel_width, panel_height) + spacing + 2 * clearance)
+
+        def reject_crossed(edges, mins, maxs):
+            for x0, y0, x1, y1 in edges.tolist():
+                near = index.query(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+                near = near[free[near]]
+                if len(near):
+                    free[near[segment_hits(x0, y0, x1, y1, mins[near], maxs[near])]] = False
+
+        reject_crossed(polygon_edges(boundary), panel_mins, panel_maxs)
+        for obstacle in obstacles:
+            corners = np.asarray(obstacle, dtype=float)
+            (oxmin, oymin), (oxmax, oymax) = corners.min(axis=0), corners.max(axis=0)
+            near = index.query(oxmin, oymin, oxmax, oymax)
+            near = near[free[near]]
+            if len(near):
+                free[near[points_in_polygon(obstacle, centers[near])]] = False
+                reject_crossed(polygon_edges(obstacle), mins, maxs)
+
+    origins = grid.origins if free.all() else grid.origins[free]
+    origins.flags.writeable = False
+    fitted = GridFit(grid.rows, grid.cols, grid.used_width, grid.used_height,
+                     grid.pitch_x, grid.pitch_y, grid.cells, origins)
+    return SurfaceFit(x, y, fitted, int((~free).sum()))
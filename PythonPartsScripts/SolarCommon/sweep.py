@@ -0,0 +1,212 @@
+"""
+Design Sweep - Carport configurations evaluated without Allplan
+============================================================================
+A sweep spec lists the options to compare on one site; every combination
+of panel model, spacing, orientation and roof angle is one configuration,
+evaluated with the layout engine of SystemCreator (fit_grid / pack_panels
+through the analytical bill of materials). Nothing here touches Allplan or
+builds geometry, so configurations can be evaluated in any process.
+
+Spec (JSON):
+
+    {
+      "site": {"width": 40000, "depth": 25000},
+      "panels": [{"name": "M400", "width": 1134, "height": 1722,
+                  "thickness": 35, "power": 400}],
+      "spacing": [20, 50],
+      "orientation": ["portrait", "landscape", "mixed"],
+      "roofAngle": {"from": 0, "to": 20, "step": 5},
+      "structure": {"gutterWidth": 100, "gutterHeight": 80,
+                    "profileThickness": 40, "rungThickness": 30},
+      "packingTimeBudget": null
+    }
+
+Lengths in mm, power in W per panel, angles in degrees. spacing and
+roofAngle take a value, a list or a {"from", "to", "step"} range. The site
+depth is measured horizontally: the roof surface along the slope is
+depth / cos(angle).
+
+packingTimeBudget (ms) limits the exact search of the "mixed" orientation.
+By default (null) there is no limit: the search always finishes, so a
+configuration gives the same modules on every machine and run, and results
+stored in a checkpoint rank consistently with new ones. With a budget the
+mixed layouts of big sites depend on the machine load.
+
+Each configuration has a key (hash of its parameters), so results can be
+stored and a sweep resumed or extended without evaluating them again.
+============================================================================
+"""
+
+import hashlib
+import itertools
+import json
+import math
+
+from .bom import system_bom
+
+PORTRAIT = "portrait"
+LANDSCAPE = "landscape"
+MIXED = "mixed"
+ORIENTATIONS = (PORTRAIT, LANDSCAPE, MIXED)
+
+DEFAULT_STRUCTURE = {'gutterWidth': 100, 'gutterHeight': 80,
+                     'profileThickness': 40, 'rungThickness': 30}
+MAX_ROOF_ANGLE = 60  # degrees
+
+RESULT_FIELDS = ['rank', 'key', 'panel', 'orientation', 'spacing', 'roof_angle',
+                 'modules', 'kwp', 'rungs', 'profile_m', 'gutter_m', 'module_area_m2',
+                 'weight_kg', 'kg_per_kwp']
+
+# ============================================================================
+# SPEC
+# ============================================================================
+
+def expand_range(value, name):
+    """
+    Values of a sweep parameter
+
+    Args:
+        value: A number, a list of numbers or {"from", "to", "step"}
+        name (str): Parameter name for error messages
+
+    Returns:
+        list: Values in the given order
+
+    Raises:
+        ValueError: If the range is empty or malformed
+    """
+    if isinstance(value, dict):
+        try:
+            start, stop, step = float(value['from']), float(value['to']), float(value['step'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{name}: a range needs numeric 'from', 'to' and 'step'") from None
+        if step <= 0 or stop < start:
+            raise ValueError(f"{name}: range needs step > 0 and to >= from")
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 9) for i in range(count)]
+    values = value if isinstance(value, list) else [value]
+    if not values:
+        raise ValueError(f"{name}: no values")
+    return values
+
+
+def expand_configs(spec):
+    """
+    Configurations of a sweep spec, in a fixed order
+
+    Args:
+        spec (dict): Sweep spec (see module docstring)
+
+    Yields:
+        dict: One configuration
+
+    Raises:
+        ValueError: If the spec is invalid
+    """
+    try:
+        site_width = float(spec['site']['width'])
+        site_depth = float(spec['site']['depth'])
+        panels = spec['panels']
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("spec needs site.width, site.depth and panels") from None
+    if site_width <= 0 or site_depth <= 0:
+        raise ValueError("site width and depth must be > 0")
+    if not isinstance(panels, list) or not panels:
+        raise ValueError("panels: at least one panel model is needed")
+    for panel in panels:
+        missing = [k for k in ('name', 'width', 'height', 'thickness', 'power') if k not in panel]
+        if missing:
+            raise ValueError(f"panel {panel.get('name', '?')}: missing {', '.join(missing)}")
+
+    spacings = expand_range(spec.get('spacing', 20), 'spacing')
+    orientations = expand_range(spec.get('orientation', PORTRAIT), 'orientation')
+    angles = expand_range(spec.get('roofAngle', 0), 'roofAngle')
+    for orientation in orientations:
+        if orientation not in ORIENTATIONS:
+            raise ValueError(f"orientation '{orientation}': expected one of {', '.join(ORIENTATIONS)}")
+    for angle in angles:
+        if not 0 <= angle <= MAX_ROOF_ANGLE:
+            raise ValueError(f"roofAngle {angle}: expected 0 to {MAX_ROOF_ANGLE} degrees")
+
+    structure = dict(DEFAULT_STRUCTURE, **spec.get('structure', {}))
+    time_budget = spec.get('packingTimeBudget')
+    if time_budget is not None:
+        time_budget = time_budget / 1000
+
+    for panel, spacing, orientation, angle in itertools.product(panels, spacings, orientations, angles):
+        yield {
+            'site_width': site_width, 'site_depth': site_depth,
+            'panel': panel['name'], 'panel_width': panel['width'], 'panel_height': panel['height'],
+            'panel_thickness': panel['thickness'], 'power': panel['power'],
+            'spacing': spacing, 'orientation': orientation, 'roof_angle': angle,
+            'structure': structure, 'time_budget': time_budget,
+        }
+
+
+def config_key(config):
+    """Stable key of a configuration (hash of all its parameters)"""
+    text = json.dumps(config, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+# ============================================================================
+# EVALUATION
+# ============================================================================
+
+def evaluate_config(config):
+    """
+    Lay out one configuration and return its figures
+
+    Args:
+        config (dict): Configuration from expand_configs
+
+    Returns:
+        dict: key, parameters, module count, kWp and material quantities
+    """
+    surface_height = config['site_depth'] / math.cos(math.radians(config['roof_angle']))
+    panel_width, panel_height = config['panel_width'], config['panel_height']
+    if config['orientation'] == LANDSCAPE:
+        panel_width, panel_height = panel_height, panel_width
+
+    structure = config['structure']
+    bom = system_bom(config['site_width'], surface_height, panel_width, panel_height,
+                     config['spacing'], config['panel_thickness'],
+                     structure['gutterWidth'], structure['gutterHeight'],
+                     structure['profileThickness'], structure['rungThickness'],
+                     mixed_orientation=(config['orientation'] == MIXED),
+                     time_budget=config['time_budget'])
+
+    kwp = bom.module_count * config['power'] / 1000
+    weight = bom.total_weight
+    return {
+        'key': config_key(config), 'panel': config['panel'],
+        'orientation': config['orientation'], 'spacing': config['spacing'],
+        'roof_angle': config['roof_angle'],
+        'modules': bom.module_count, 'kwp': round(kwp, 3),
+        'rungs': bom.get('rung').count,
+        'profile_m': round(bom.get('profile').length, 2),
+        'gutter_m': round(bom.get('gutter').length, 2),
+        'module_area_m2': round(bom.get('module').area, 2),
+        'weight_kg': round(weight, 1),
+        'kg_per_kwp': round(weight / kwp, 2) if kwp else None,
+    }
+
+
+def evaluate_configs(configs):
+    """Evaluate a chunk of configurations (one process pool task)"""
+    return [evaluate_config(config) for config in configs]
+
+
+def rank_results(results):
+    """
+    Sort results best first and number them
+
+    Most kWp first; at equal power the lighter structure wins.
+
+    Args:
+        results (iterable): Results of evaluate_config
+
+    Returns:
+        list: Results with a 'rank' field, 1 = best
+    """
+    ranked = sorted(results, key=lambda r: (-r['kwp'], r['weight_kg'], r['key']))
+    return [dict(result, rank=rank) for rank, result in enumerate(ranked, 1)]
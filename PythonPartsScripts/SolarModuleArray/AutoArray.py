@@ -25,15 +25,33 @@ Parameters:
     - Spacing: Gap between panels (mm)
     - PanelThickness: Thickness of panel (mm)
     - FrameBarHeight: Height of structural frame bars (mm)
+    - SurfaceBoundary: Optional polygon "x,y; x,y; ..." replacing the rectangle (mm)
+    - Obstacles: Optional obstacle polygons separated by "|" (mm)
+    - ObstacleClearance: Minimum distance of panels to the obstacles (mm)
+    - LevelOfDetail: 0 (full) and 1 (box) = one box per panel, 2 (slab) = one slab
+      and panel outline per row
+    - PlanSymbols: Solids in a 3D-only view, plan drawn from the surface outline
+      and one panel polyline per row (see SolarCommon.plan)
 
 Returns:
-    List of ModelElement3D objects representing the complete solar array
+    List of ModelElement3D objects representing the complete solar array, or a
+    PythonPart with separate 3D and 2D views when PlanSymbols is set
 """
 
 import NemAll_Python_Geometry as AllplanGeo
 import NemAll_Python_BaseElements as AllplanBaseElements  
 import NemAll_Python_BasisElements as AllplanBasisElements
 
+from CreateElementResult import CreateElementResult
+from PythonPartUtil import PythonPartUtil
+
+from SolarCommon.property_pool import get_common_properties
+from SolarCommon.instancing import CuboidPrototype
+from SolarCommon.layout import fit_grid, merge_runs
+from SolarCommon.surface import fit_surface, parse_polygon, parse_polygons, rectangle_polygon
+from SolarCommon.lod import parse_lod, row_runs, run_slabs, run_outline, FULL, SLAB
+from SolarCommon.plan import module_outlines, polygon_outline, polyline_2d
+
 
 
 def check_allplan_version(build_ele, version):
@@ -87,6 +105,10 @@ class AutoArrayCreator:
         self.model_ele_list = []
         self.handle_list = []
         self.document = doc
+        self.prototypes = {}  # (width, height, thickness) -> CuboidPrototype
+        self.lod = FULL       # level of detail of the panels (see SolarCommon.lod)
+        self.plan_symbols = False  # separate 2D view for the plan (see SolarCommon.plan)
+        self.plan_ele_list = []
 
 
     def create(self, build_ele):
@@ -108,27 +130,30 @@ class AutoArrayCreator:
         spacing = build_ele.Spacing.value
         panel_thickness = build_ele.PanelThickness.value
         frame_bar_height = build_ele.FrameBarHeight.value
-
-        # Calculate number of panels that fit automatically
-        nb_col = int((surface_width + spacing) // (panel_width + spacing))
-        nb_row = int((surface_height + spacing) // (panel_height + spacing))
-
-        # Calculate actual used dimensions (excluding trailing spacing)
-        actual_width = nb_col * panel_width + (nb_col - 1) * spacing
-        actual_height = nb_row * panel_height + (nb_row - 1) * spacing
-
-        # Generate panel grid
-        for row in range(nb_row):
-            for col in range(nb_col):
-                x = col * (panel_width + spacing)
-                y = row * (panel_height + spacing)
-                z = frame_bar_height  # Panels positioned above frame bars
-
-                # Verify panel remains within surface boundaries
-                if (x + panel_width <= surface_width and 
-                    y + panel_height <= surface_height):
-                    
-                    self.create_solar_panel(x, y, z, panel_width, panel_height, panel_thickness)
+        boundary = parse_polygon(build_ele.SurfaceBoundary.value) if hasattr(build_ele, 'SurfaceBoundary') else None
+        obstacles = parse_polygons(build_ele.Obstacles.value) if hasattr(build_ele, 'Obstacles') else ()
+        clearance = build_ele.ObstacleClearance.value if hasattr(build_ele, 'ObstacleClearance') else 0.0
+        self.lod = parse_lod(build_ele.LevelOfDetail.value) if hasattr(build_ele, 'LevelOfDetail') else FULL
+        self.plan_symbols = bool(build_ele.PlanSymbols.value) if hasattr(build_ele, 'PlanSymbols') else False
+
+        # Irregular roof outline and/or cut-outs: only the free cells get panels
+        if boundary is not None or obstacles:
+            self.create_on_polygon(boundary or rectangle_polygon(surface_width, surface_height),
+                                   obstacles, clearance, panel_width, panel_height, spacing,
+                                   panel_thickness, frame_bar_height)
+            return self.create_result(build_ele)
+
+        # Calculate number of panels that fit automatically (memoized, shared
+        # with the other array PythonParts)
+        grid = fit_grid(surface_width, surface_height, panel_width, panel_height, spacing)
+        nb_row = grid.rows
+
+        # Actual used dimensions (excluding trailing spacing)
+        actual_width = grid.used_width
+
+        # Generate panel grid, only panels within the surface boundaries
+        z = frame_bar_height  # Panels positioned above frame bars
+        self.create_solar_panels(grid.origins + (0, 0, z), panel_width, panel_height, spacing, panel_thickness)
 
         # Generate structural support frame bars between panel rows (horizontal)
         for row in range(nb_row - 1):
@@ -145,7 +170,127 @@ class AutoArrayCreator:
         # Create boundary outline of the surface area
         self.create_surface_outline(surface_width, surface_height)
 
-        return self.model_ele_list, self.handle_list
+        return self.create_result(build_ele)
+
+
+    def create_result(self, build_ele):
+        """
+        Return the created elements, as a PythonPart with separate 3D and 2D
+        views when plan symbols are on
+
+        Args:
+            build_ele:  the building element.
+
+        Returns:
+            created element result (tuple of model_ele_list, handle_list, or
+            CreateElementResult of the PythonPart)
+        """
+
+        if not self.plan_symbols:
+            return self.model_ele_list, self.handle_list
+
+        python_part_util = PythonPartUtil()
+        python_part_util.add_pythonpart_view_3d(self.model_ele_list)
+        python_part_util.add_pythonpart_view_2d(self.plan_ele_list)
+
+        return CreateElementResult(python_part_util.create_pythonpart(build_ele), self.handle_list)
+
+
+    def create_on_polygon(self, boundary, obstacles, clearance, panel_width, panel_height, spacing,
+                          panel_thickness, frame_bar_height):
+        """
+        Create the array on a polygonal surface, leaving out the obstacles
+
+        Args:
+            boundary (tuple):   Surface outline ((x, y), ...) (mm)
+            obstacles (tuple):  Obstacle polygons
+            clearance (float):  Minimum distance of panels to the obstacles (mm)
+            panel_width, panel_height, spacing, panel_thickness, frame_bar_height:
+                                As in create (mm)
+
+        """
+
+        # Grid of the boundary bounding box, cells tested through a spatial index
+        fit = fit_surface(boundary, obstacles, panel_width, panel_height, spacing, clearance)
+
+        # Generate panels on the free cells
+        z = frame_bar_height
+        self.create_solar_panels(fit.grid.origins + (fit.x, fit.y, z), panel_width, panel_height, spacing,
+                                 panel_thickness)
+
+        # Frame bars below and above every row, one per run of panels of the rows they
+        # touch: cut where obstacles or notches of the boundary leave panels out
+        spans = fit.row_spans(panel_width, spacing)
+        for row in range(fit.grid.rows + 1):
+            segments = [(row, x_start, x_end) for r in (row - 1, row) for x_start, x_end in spans.get(r, ())]
+            if not segments:
+                continue
+            y_pos = row * (panel_height + spacing) - spacing / 2.0
+            for _, x_start, x_end in merge_runs(segments, spacing).tolist():
+                self.create_frame_bar(fit.x + x_start, fit.y + y_pos, 0, x_end - x_start, spacing,
+                                      frame_bar_height)
+
+        # Outline of the surface and of the obstacles
+        self.create_polygon_outline(boundary)
+        for obstacle in obstacles:
+            self.create_polygon_outline(obstacle)
+
+
+    def get_prototype(self, width, height, thickness):
+        """
+        Return the cuboid prototype for a size, created on first use
+
+        Args:
+            width (float):     Size in X (mm)
+            height (float):    Size in Y (mm)
+            thickness (float): Size in Z (mm)
+
+        Returns:
+            CuboidPrototype: Shared prototype of this array
+        """
+        key = (width, height, thickness)
+        if key not in self.prototypes:
+            self.prototypes[key] = CuboidPrototype(width, height, thickness)
+        return self.prototypes[key]
+
+
+    def create_solar_panels(self, origins, width, height, spacing, thickness):
+        """
+        Create the panels at the given origins, as set by the level of detail
+
+        Full and box detail create one panel per origin. Slab detail creates
+        one slab per run of adjacent panels of a row, with the panel outlines
+        drawn on top of it as one polyline per run.
+
+        Args:
+            origins (ndarray):  (N, 3) lower-left corners of the panels (mm)
+            width (float):      Width of panel (mm)
+            height (float):     Height of panel (mm)
+            spacing (float):    Gap between panels (mm)
+            thickness (float):  Thickness/depth of panel (mm)
+        """
+
+        # Plan: one polyline per row run instead of the panel solids
+        if self.plan_symbols:
+            plan_prop = get_common_properties(2)  # Blue like the panels
+            for points in module_outlines(origins, width, height, spacing):
+                self.plan_ele_list.append(AllplanBasisElements.ModelElement2D(plan_prop, polyline_2d(points)))
+
+        if self.lod != SLAB:
+            for x, y, z in origins.tolist():
+                self.create_solar_panel(x, y, z, width, height, thickness)
+            return
+
+        runs = row_runs(origins, width, spacing)
+        for (x1, y1, z1), (x2, y2, _) in run_slabs(runs, width, height, thickness).tolist():
+            self.create_solar_panel(x1, y1, z1, x2 - x1, y2 - y1, thickness)
+
+        # Panel outlines on the top face of the slabs
+        outline_prop = get_common_properties(2)  # Blue like the panels
+        for run in runs:
+            points = run_outline(run, width, height, run[0, 2] + thickness)
+            outline_line = AllplanGeo.Polyline3D([AllplanGeo.Point3D(*point) for point in points.tolist()])
+            self.model_ele_list.append(AllplanBasisElements.ModelElement3D(outline_prop, outline_line))
 
 
     def create_solar_panel(self, x, y, z, width, height, thickness):
@@ -161,13 +306,11 @@ class AutoArrayCreator:
             thickness (float): Thickness/depth of panel (mm)
         """
         
-        # Create 3D solid representing the solar panel
-        panel_placement = AllplanGeo.AxisPlacement3D(AllplanGeo.Point3D(x, y, z))
-        panel_solid = AllplanGeo.Polyhedron3D.CreateCuboid(panel_placement, width, height, thickness)
+        # Create 3D solid representing the solar panel (copy of the shared panel cuboid)
+        panel_solid = self.get_prototype(width, height, thickness).place(x, y, z)
         
         # Set panel properties (color: blue)
-        panel_prop = AllplanBaseElements.CommonProperties()
-        panel_prop.Color = 2  # Blue for solar panels
+        panel_prop = get_common_properties(2)  # Blue for solar panels
         
         self.model_ele_list.append(AllplanBasisElements.ModelElement3D(panel_prop, panel_solid))
 
@@ -185,13 +328,11 @@ class AutoArrayCreator:
             bar_height (float): Height/thickness of bar (mm)
         """
         
-        # Create 3D solid representing the structural frame bar
-        bar_placement = AllplanGeo.AxisPlacement3D(AllplanGeo.Point3D(x, y - bar_width / 2.0, z))
-        bar_solid = AllplanGeo.Polyhedron3D.CreateCuboid(bar_placement, width, bar_width, bar_height)
+        # Create 3D solid representing the structural frame bar (all bars share one cuboid)
+        bar_solid = self.get_prototype(width, bar_width, bar_height).place(x, y - bar_width / 2.0, z)
         
         # Set bar properties (color: yellow)
-        bar_prop = AllplanBaseElements.CommonProperties()
-        bar_prop.Color = 3  # Yellow for structural bars
+        bar_prop = get_common_properties(3)  # Yellow for structural bars
         
         self.model_ele_list.append(AllplanBasisElements.ModelElement3D(bar_prop, bar_solid))
 
@@ -218,8 +359,43 @@ class AutoArrayCreator:
         outline_line = AllplanGeo.Polyline3D(outline_points)
         
         # Set outline properties (color: black, style: dashed)
-        outline_prop = AllplanBaseElements.CommonProperties()
-        outline_prop.Color = 7  # Black for boundary
-        outline_prop.LineStyle = 2  # Dashed line style
+        outline_prop = get_common_properties(7, line_style=2)  # Black, dashed line style
         
         self.model_ele_list.append(AllplanBasisElements.ModelElement3D(outline_prop, outline_line))
+
+        if self.plan_symbols:
+            self.create_plan_outline(((0, 0), (width, 0), (width, height), (0, height)))
+
+
+    def create_polygon_outline(self, polygon):
+        """
+        Create a closed polygon outline in dashed lines
+
+        Args:
+            polygon (tuple): ((x, y), ...) points (mm)
+        """
+
+        outline_points = [AllplanGeo.Point3D(x, y, 0) for x, y in polygon + polygon[:1]]
+        outline_line = AllplanGeo.Polyline3D(outline_points)
+
+        # Same style as the rectangular surface outline
+        outline_prop = get_common_properties(7, line_style=2)  # Black, dashed line style
+
+        self.model_ele_list.append(AllplanBasisElements.ModelElement3D(outline_prop, outline_line))
+
+        if self.plan_symbols:
+            self.create_plan_outline(polygon)
+
+
+    def create_plan_outline(self, polygon):
+        """
+        Add a closed polygon outline in dashed lines to the plan view
+
+        Args:
+            polygon (tuple): ((x, y), ...) points (mm)
+        """
+
+        outline_prop = get_common_properties(7, line_style=2)  # Black, dashed line style
+
+        self.plan_ele_list.append(AllplanBasisElements.ModelElement2D(outline_prop,
+                                                                      polyline_2d(polygon_outline(polygon))))
@@ -16,6 +16,22 @@ import NemAll_Python_BaseElements as AllplanBaseElements
 import NemAll_Python_BasisElements as AllplanBasisElements
 import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
 
+import numpy as np
+
+from CreateElementResult import CreateElementResult
+from PythonPartUtil import PythonPartUtil
+
+from SolarCommon.property_pool import get_common_properties
+from SolarCommon.instancing import CuboidPrototype
+from SolarCommon.layout import fit_grid, merge_runs
+from SolarCommon.packing import pack_panels, PanelBlock, DEFAULT_TIME_BUDGET
+from SolarCommon.lod import parse_lod, row_runs, run_slabs, run_outline, FULL, SLAB
+from SolarCommon.plan import module_outlines, polygon_outline, polyline_2d
+from SolarCommon.bom import system_bom, blocks_bom, write_bom, ITEM_40X40_WEIGHT
+
+# Champs en lecture seule de la palette remplis par set_bom_outputs
+BOM_OUTPUTS = ('RungCount', 'ProfileLength', 'GutterLength', 'ModuleArea', 'TotalWeight')
+
 def check_allplan_version(build_ele, version):
     return True
 
@@ -29,6 +45,9 @@ class SystemCreator:
         self.handle_list = []
         self.document = doc
         self.module_count = 0
+        self.prototypes = {}  # (dx, dy, dz) -> CuboidPrototype, one per distinct part size
+        self.plan_symbols = False  # vue 2D séparée pour le plan (voir SolarCommon.plan)
+        self.plan_ele_list = []
 
     def create(self, build_ele):
         # Paramètres utilisateurs
@@ -43,65 +62,203 @@ class SystemCreator:
         gutter_height = build_ele.GutterHeight.value
         profile_thickness = build_ele.ProfileThickness.value
         rung_thickness = build_ele.RungThickness.value
+        mixed_orientation = bool(build_ele.MixedOrientation.value) if hasattr(build_ele, 'MixedOrientation') else False
+        time_budget_ms = build_ele.PackingTimeBudget.value if hasattr(build_ele, 'PackingTimeBudget') else DEFAULT_TIME_BUDGET * 1000
+        merge_members = bool(build_ele.MergeMembers.value) if hasattr(build_ele, 'MergeMembers') else False
+        bom_only = bool(build_ele.BomOnly.value) if hasattr(build_ele, 'BomOnly') else False
+        bom_file = build_ele.BomFile.value if hasattr(build_ele, 'BomFile') else ""
+        lod = parse_lod(build_ele.LevelOfDetail.value) if hasattr(build_ele, 'LevelOfDetail') else FULL
+        self.plan_symbols = bool(build_ele.PlanSymbols.value) if hasattr(build_ele, 'PlanSymbols') else False
 
         # Orientation des panneaux
         if is_horizontal:
             panel_width, panel_height = panel_height, panel_width
 
-        nb_col = int((surface_width + spacing) // (panel_width + spacing))
-        nb_row = int((surface_height + spacing) // (panel_height + spacing))
+        # Quantités seules: liste de matériel calculée depuis les paramètres, sans géométrie
+        if bom_only:
+            bom = system_bom(surface_width, surface_height, panel_width, panel_height, spacing,
+                             panel_thickness, gutter_width, gutter_height, profile_thickness,
+                             rung_thickness, mixed_orientation, time_budget_ms / 1000,
+                             profile_weight=ITEM_40X40_WEIGHT)
+            self.set_bom_outputs(build_ele, bom, bom_file)
+            self.create_surface_outline(surface_width, surface_height)
+            build_ele.ModuleCount.value = bom.module_count
+            return self.create_result(build_ele)
+
+        if mixed_orientation:
+            # Blocs portrait/paysage pour un maximum de modules (mémorisé, budget de temps)
+            packing = pack_panels(surface_width, surface_height, panel_width, panel_height, spacing,
+                                  time_budget_ms / 1000)
+            blocks = packing.blocks
+            grid_count = packing.grid_count
+            actual_width, actual_height = packing.used_width, packing.used_height
+        else:
+            # Grille (mémorisée, partagée avec AutoArray): un seul bloc
+            grid = fit_grid(surface_width, surface_height, panel_width, panel_height, spacing)
+            blocks = [PanelBlock(0.0, 0.0, False, panel_width, panel_height, grid)]
+            grid_count = grid.panel_count
+            actual_width, actual_height = grid.used_width, grid.used_height
 
-        actual_width = nb_col * panel_width + (nb_col - 1) * spacing
-        actual_height = nb_row * panel_height + (nb_row - 1) * spacing
+        # Liste de matériel des blocs calculés ci-dessus (sans seconde recherche), si demandée
+        if bom_file or any(hasattr(build_ele, name) for name in BOM_OUTPUTS):
+            bom = blocks_bom(blocks, spacing, panel_thickness, gutter_width, gutter_height,
+                             profile_thickness, rung_thickness,
+                             profile_weight=ITEM_40X40_WEIGHT)
+            self.set_bom_outputs(build_ele, bom, bom_file)
+
+        # Gouttières, profils, rungs et modules bloc par bloc
+        # (fusion: profils et rungs collectés puis créés en barres continues;
+        # niveaux de détail box/slab: ni profils ni rungs, voir SolarCommon.lod)
+        runs = {'profiles': [], 'rungs': []} if merge_members and lod == FULL else None
+        self.module_count = 0
+        for block in blocks:
+            self.module_count += self.create_block(block, spacing, gutter_width, gutter_height,
+                                                   profile_thickness, rung_thickness, panel_thickness,
+                                                   runs, lod)
+        if runs is not None:
+            self.create_merged_members(runs, spacing, gutter_height, profile_thickness,
+                                       rung_thickness, panel_thickness)
+
+        # Contour global
+        self.create_surface_outline(actual_width, actual_height)
+        build_ele.ModuleCount.value = self.module_count
+        if hasattr(build_ele, 'GridModuleCount'):
+            build_ele.GridModuleCount.value = grid_count
+        if hasattr(build_ele, 'YieldGain'):
+            build_ele.YieldGain.value = packing.describe_gain() if mixed_orientation else ""
+
+        return self.create_result(build_ele)
+
+    def create_result(self, build_ele):
+        """Éléments créés, en PythonPart avec une vue 3D et une vue 2D (plan) si symboles de plan"""
+        if not self.plan_symbols:
+            return self.model_ele_list, self.handle_list
+
+        python_part_util = PythonPartUtil()
+        python_part_util.add_pythonpart_view_3d(self.model_ele_list)
+        python_part_util.add_pythonpart_view_2d(self.plan_ele_list)
+        return CreateElementResult(python_part_util.create_pythonpart(build_ele), self.handle_list)
+
+    def create_block(self, block, spacing, gutter_width, gutter_height,
+                     profile_thickness, rung_thickness, panel_thickness, runs=None, lod=FULL):
+        """Bloc de panneaux de même orientation avec sa structure, retourne le nombre de modules
+
+        Avec runs, les profils et rungs ne sont pas créés mais collectés ([ligne, début, fin]).
+        Hors niveau de détail full, seules les gouttières restent de la structure
+        (slab: une dalle et un contour par rangée au lieu des modules)
+        """
+        grid = block.grid
+        x0, y0 = block.x, block.y
+        panel_width, panel_height = block.panel_width, block.panel_height
 
         z_base = 0
 
-        # Gutters: à gauche et à droite de tout l'ensemble
+        # Gutters: à gauche et à droite du bloc
         gutter_z = z_base
-        self.create_gutter(-gutter_width/2, 0, gutter_z, actual_height, gutter_width, gutter_height)
-        self.create_gutter(actual_width - gutter_width/2, 0, gutter_z, actual_height, gutter_width, gutter_height)
+        self.create_gutter(x0 - gutter_width/2, y0, gutter_z, grid.used_height, gutter_width, gutter_height)
+        self.create_gutter(x0 + grid.used_width - gutter_width/2, y0, gutter_z, grid.used_height, gutter_width, gutter_height)
 
-        # Profiles: vrais profils alu horizontaux sous chaque rangée
+        # Hauteurs: profils sur les gouttières, rungs sur les profils, modules sur les rungs
         profile_z = gutter_z + gutter_height
-        for row in range(nb_row + 1):
-            y = row * (panel_height + spacing) - spacing / 2
-            self.create_profile_alu(0, y, profile_z, actual_width)
+        rung_z = profile_z + profile_thickness
+        module_z = rung_z + panel_thickness
+        if lod != FULL:
+            # Box/slab: structure réduite aux gouttières
+            self.create_block_modules(block, spacing, module_z, panel_thickness, lod)
+            return grid.panel_count
+
+        # Profiles: vrais profils alu horizontaux sous chaque rangée
+        for row in range(grid.rows + 1):
+            y = y0 + row * (panel_height + spacing) - spacing / 2
+            if runs is None:
+                self.create_profile_alu(x0, y, profile_z, grid.used_width)
+            else:
+                runs['profiles'].append((y, x0, x0 + grid.used_width))
 
         # Rungs: barres verticales SOUS bords gauche/droite de chaque panneau
-        rung_z = profile_z + profile_thickness
-        for row in range(nb_row):
-            for col in range(nb_col):
-                x_left = col * (panel_width + spacing)
+        if runs is None:
+            for x_left, y, _ in grid.cells.tolist():
+                x_left += x0
+                y += y0
                 x_right = x_left + panel_width - rung_thickness
-                y = row * (panel_height + spacing)
                 # sous bord gauche
                 self.create_rung(x_left, y, rung_z, rung_thickness, panel_height, panel_thickness)
                 # sous bord droit
                 self.create_rung(x_right, y, rung_z, rung_thickness, panel_height, panel_thickness)
+        else:
+            cells = grid.cells[:, :2] + (x0, y0)
+            for x in (cells[:, 0], cells[:, 0] + panel_width - rung_thickness):
+                runs['rungs'].append(np.column_stack([x, cells[:, 1], cells[:, 1] + panel_height]))
 
         # Modules: panneaux bleus
-        module_z = rung_z + panel_thickness
-        self.module_count = 0
-        for row in range(nb_row):
-            for col in range(nb_col):
-                x = col * (panel_width + spacing)
-                y = row * (panel_height + spacing)
-                if (x + panel_width <= surface_width and y + panel_height <= surface_height):
-                    self.create_module(x, y, module_z, panel_width, panel_height, panel_thickness)
-                    self.module_count += 1
+        self.create_block_modules(block, spacing, module_z, panel_thickness, lod)
+        return grid.panel_count
 
-        # Contour global
-        self.create_surface_outline(actual_width, actual_height)
-        build_ele.ModuleCount.value = self.module_count
+    def create_block_modules(self, block, spacing, module_z, panel_thickness, lod):
+        """Modules d'un bloc: un cuboïde par module, ou une dalle et un contour par rangée (slab)"""
+        grid = block.grid
+        x0, y0 = block.x, block.y
+        panel_width, panel_height = block.panel_width, block.panel_height
+
+        # Plan: une polyligne par rangée au lieu des cuboïdes
+        if self.plan_symbols:
+            prop = get_common_properties(7) # Bleu
+            for points in module_outlines(grid.origins + (x0, y0, module_z), panel_width, panel_height, spacing):
+                self.plan_ele_list.append(AllplanBasisElements.ModelElement2D(prop, polyline_2d(points)))
 
-        return self.model_ele_list, self.handle_list
+        if lod != SLAB:
+            for x, y, _ in grid.origins.tolist():
+                self.create_module(x0 + x, y0 + y, module_z, panel_width, panel_height, panel_thickness)
+            return
+
+        origins = grid.origins + (x0, y0, module_z)
+        rows = row_runs(origins, panel_width, spacing)
+        for (x1, y1, z1), (x2, y2, _) in run_slabs(rows, panel_width, panel_height, panel_thickness).tolist():
+            self.create_module(x1, y1, z1, x2 - x1, y2 - y1, panel_thickness)
+        for row in rows:
+            self.create_module_outline(run_outline(row, panel_width, panel_height, module_z + panel_thickness))
+
+    def set_bom_outputs(self, build_ele, bom, bom_file):
+        """Quantités dans les champs en lecture seule de la palette, export CSV/JSON si demandé"""
+        outputs = {
+            'RungCount': bom.get('rung').count,
+            'ProfileLength': round(bom.get('profile').length, 2),
+            'GutterLength': round(bom.get('gutter').length, 2),
+            'ModuleArea': round(bom.get('module').area, 2),
+            'TotalWeight': round(bom.total_weight, 1),
+        }
+        if bom_file:
+            try:
+                write_bom([bom], bom_file)
+                outputs['BomExport'] = f"Exporté: {bom_file}"
+            except (OSError, ValueError) as e:
+                outputs['BomExport'] = f"Erreur: {e}"
+        for name, value in outputs.items():
+            if hasattr(build_ele, name):
+                getattr(build_ele, name).value = value
+
+    def create_merged_members(self, runs, spacing, gutter_height, profile_thickness,
+                              rung_thickness, panel_thickness):
+        """Profils et rungs colinéaires fusionnés: une barre par ligne continue (écarts <= spacing)"""
+        profile_z = gutter_height
+        for y, x_start, x_end in merge_runs(runs['profiles'], spacing).tolist():
+            self.create_profile_alu(x_start, y, profile_z, x_end - x_start)
+
+        rung_z = profile_z + profile_thickness
+        for x, y_start, y_end in merge_runs(runs['rungs'], spacing).tolist():
+            self.create_rung(x, y_start, rung_z, rung_thickness, y_end - y_start, panel_thickness)
+
+    def get_prototype(self, dx, dy, dz):
+        """Cuboide partagé par toutes les pièces de cette taille (créé une seule fois)"""
+        key = (dx, dy, dz)
+        if key not in self.prototypes:
+            self.prototypes[key] = CuboidPrototype(dx, dy, dz)
+        return self.prototypes[key]
 
     def create_gutter(self, x, y, z, length, width, height):
         """Gutter: barre verticale simple (cuboïde)"""
-        placement = AllplanGeo.AxisPlacement3D(AllplanGeo.Point3D(x, y, z))
-        solid = AllplanGeo.Polyhedron3D.CreateCuboid(placement, width, length, height)
-        prop = AllplanBaseElements.CommonProperties()
-        prop.Color = 8 # Jaune/orange
+        solid = self.get_prototype(width, length, height).place(x, y, z)
+        prop = get_common_properties(8) # Jaune/orange
         self.model_ele_list.append(AllplanBasisElements.ModelElement3D(prop, solid))
 
     def create_profile_alu(self, x, y, z, length):
@@ -113,16 +270,15 @@ class SystemCreator:
             # Nom du profil alu standard (à adapter selon ton catalogue Allplan)
             # Exemples: "ITEM 40x40", "Bosch 45x45", "DIN 10305", etc.
             profile_name = "ITEM_40x40"
+            prop = get_common_properties(3) # Cyan
             
             # Essaie de créer un profil alu
             profile_elem = AllplanBasisElements.ProfileElement(
-                AllplanBaseElements.CommonProperties(),
+                prop,
                 profile_name,
                 placement,
                 int(length)
             )
-            prop = AllplanBaseElements.CommonProperties()
-            prop.Color = 3 # Cyan
             
             self.model_ele_list.append(profile_elem)
             
@@ -130,26 +286,27 @@ class SystemCreator:
             # Fallback: si le profil n'existe pas, utilise un cuboïde
             placement = AllplanGeo.AxisPlacement3D(AllplanGeo.Point3D(x, y, z))
             solid = AllplanGeo.Polyhedron3D.CreateCuboid(placement, 40, length, 40)
-            prop = AllplanBaseElements.CommonProperties()
-            prop.Color = 3 # Cyan
+            prop = get_common_properties(3) # Cyan
             self.model_ele_list.append(AllplanBasisElements.ModelElement3D(prop, solid))
 
     def create_rung(self, x, y, z, width, height, thickness):
         """Rung: barre verticale sous bord de panneau"""
-        placement = AllplanGeo.AxisPlacement3D(AllplanGeo.Point3D(x, y, z))
-        solid = AllplanGeo.Polyhedron3D.CreateCuboid(placement, width, height, thickness)
-        prop = AllplanBaseElements.CommonProperties()
-        prop.Color = 4 # Vert
+        solid = self.get_prototype(width, height, thickness).place(x, y, z)
+        prop = get_common_properties(4) # Vert
         self.model_ele_list.append(AllplanBasisElements.ModelElement3D(prop, solid))
 
     def create_module(self, x, y, z, width, height, thickness):
         """Module: panneau solaire bleu"""
-        placement = AllplanGeo.AxisPlacement3D(AllplanGeo.Point3D(x, y, z))
-        solid = AllplanGeo.Polyhedron3D.CreateCuboid(placement, width, height, thickness)
-        prop = AllplanBaseElements.CommonProperties()
-        prop.Color = 7 # Bleu
+        solid = self.get_prototype(width, height, thickness).place(x, y, z)
+        prop = get_common_properties(7) # Bleu
         self.model_ele_list.append(AllplanBasisElements.ModelElement3D(prop, solid))
 
+    def create_module_outline(self, points):
+        """Contour des modules d'une rangée (polyligne, niveau de détail slab)"""
+        outline_line = AllplanGeo.Polyline3D([AllplanGeo.Point3D(*point) for point in points.tolist()])
+        prop = get_common_properties(7) # Bleu
+        self.model_ele_list.append(AllplanBasisElements.ModelElement3D(prop, outline_line))
+
     def create_surface_outline(self, width, height):
         """Contour de la zone"""
         points = [
@@ -160,7 +317,9 @@ class SystemCreator:
             AllplanGeo.Point3D(0, 0, 0)
         ]
         outline_line = AllplanGeo.Polyline3D(points)
-        prop = AllplanBaseElements.CommonProperties()
-        prop.Color = 1
-        prop.LineStyle = 2
+        prop = get_common_properties(1, line_style=2)
         self.model_ele_list.append(AllplanBasisElements.ModelElement3D(prop, outline_line))
+
+        if self.plan_symbols:
+            outline = polygon_outline(((0, 0), (width, 0), (width, height), (0, height)))
+            self.plan_ele_list.append(AllplanBasisElements.ModelElement2D(prop, polyline_2d(outline)))
@@ -2,6 +2,7 @@ import NemAll_Python_Geometry as AllplanGeo
 import NemAll_Python_BaseElements as AllplanBaseElements
 import NemAll_Python_BasisElements as AllplanBasisElements
 import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
+import logging
 import os
 import traceback
 
@@ -9,6 +10,8 @@ from CreateElementResult import CreateElementResult
 from PythonPartUtil import PythonPartUtil
 from TypeCollections.ModelEleList import ModelEleList
 
+from SolarCommon.logger import get_logger, flush_logs, TRACE, MESSAGE_FORMAT
+
 try:
     from __BuildingElementStubFiles.SolarModuleArrayBuildingElement import SolarModuleArrayBuildingElement as BuildingElement
 except ImportError:
@@ -16,9 +19,10 @@ except ImportError:
 
 DEBUG_FILE = os.path.expanduser("~/Desktop/SolarArray_Debug.txt")
 
+logger = get_logger(__name__, DEBUG_FILE, level=logging.DEBUG, fmt=MESSAGE_FORMAT)
+
 def log_debug(msg):
-    with open(DEBUG_FILE, "a") as f:
-        f.write(msg + "\n")
+    logger.debug(msg)
 
 def check_allplan_version(build_ele, version):
     log_debug("check_allplan_version called")
@@ -92,7 +96,7 @@ def create_element(build_ele: BuildingElement,
                 module = AllplanGeo.Polyhedron3D.CreateCuboid(module_p1, module_p2)
                 model_ele_list.append_geometry_3d(module)
                 
-                log_debug(f"Module [{row},{col}] created at ({x}, {y}, {z})")
+                logger.log(TRACE, "Module [%d,%d] created at (%s, %s, %s)", row, col, x, y, z)
         
         log_debug(f"Total modules created: {num_rows * num_cols}")
         
@@ -110,3 +114,5 @@ def create_element(build_ele: BuildingElement,
         log_debug(traceback.format_exc())
         log_debug("=== create_element END ERROR ===")
         return CreateElementResult()
+    finally:
+        flush_logs()
@@ -2,6 +2,7 @@ import NemAll_Python_Geometry as AllplanGeo
 import NemAll_Python_BaseElements as AllplanBaseElements
 import NemAll_Python_BasisElements as AllplanBasisElements
 import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
+import logging
 import os
 import traceback
 
@@ -9,6 +10,9 @@ from CreateElementResult import CreateElementResult
 from PythonPartUtil import PythonPartUtil
 from TypeCollections.ModelEleList import ModelEleList
 
+from SolarCommon.logger import get_logger, flush_logs, TRACE, MESSAGE_FORMAT
+from SolarCommon.property_pool import get_common_properties
+
 try:
     from __BuildingElementStubFiles.SolarModuleArrayBuildingElement import SolarModuleArrayBuildingElement as BuildingElement
 except ImportError:
@@ -16,9 +20,10 @@ except ImportError:
 
 DEBUG_FILE = os.path.expanduser("~/Desktop/SolarArray_Debug.txt")
 
+logger = get_logger(__name__, DEBUG_FILE, level=logging.DEBUG, fmt=MESSAGE_FORMAT)
+
 def log_debug(msg):
-    with open(DEBUG_FILE, "a") as f:
-        f.write(msg + "\n")
+    logger.debug(msg)
 
 def check_allplan_version(build_ele, version):
     log_debug("check_allplan_version called")
@@ -59,8 +64,7 @@ def create_element(build_ele: BuildingElement,
         
         # === 1. CREATE SUPPORT PLATE (GREY) ===
         log_debug("Creating grey support plate...")
-        plate_props = AllplanBaseElements.CommonProperties()
-        plate_props.Color = 7  # Grey color (Allplan color ID)
+        plate_props = get_common_properties(7)  # Grey color (Allplan color ID)
         
         plate_list = ModelEleList(plate_props)
         
@@ -81,11 +85,10 @@ def create_element(build_ele: BuildingElement,
                 y = row * (module_height + row_gap)
                 z = module_z
                 
-                log_debug(f"Creating module [{row},{col}]...")
+                logger.log(TRACE, "Creating module [%d,%d]...", row, col)
                 
                 # --- BLUE FRAME (around module) ---
-                frame_props = AllplanBaseElements.CommonProperties()
-                frame_props.Color = 4  # Blue color for frame
+                frame_props = get_common_properties(4)  # Blue color for frame
                 frame_list = ModelEleList(frame_props)
                 
                 # Frame outer dimensions
@@ -100,8 +103,7 @@ def create_element(build_ele: BuildingElement,
                 python_part_util.add_pythonpart_view_2d3d(frame_list)
                 
                 # --- BLUE PV LAYER (solar cells) ---
-                pv_props = AllplanBaseElements.CommonProperties()
-                pv_props.Color = 21  # Dark blue for PV cells
+                pv_props = get_common_properties(21)  # Dark blue for PV cells
                 pv_list = ModelEleList(pv_props)
                 
                 # PV layer sits above frame, slightly inset
@@ -120,7 +122,7 @@ def create_element(build_ele: BuildingElement,
                 pv_list.append_geometry_3d(pv_layer)
                 python_part_util.add_pythonpart_view_2d3d(pv_list)
                 
-                log_debug(f"Module [{row},{col}] created with frame and PV layer")
+                logger.log(TRACE, "Module [%d,%d] created with frame and PV layer", row, col)
         
         log_debug(f"Total modules: {num_rows * num_cols}")
         
@@ -134,3 +136,5 @@ def create_element(build_ele: BuildingElement,
         log_debug(traceback.format_exc())
         log_debug("=== create_element END ERROR ===")
         return CreateElementResult()
+    finally:
+        flush_logs()
@@ -2,14 +2,24 @@ import NemAll_Python_Geometry as AllplanGeo
 import NemAll_Python_BaseElements as AllplanBaseElements
 import NemAll_Python_BasisElements as AllplanBasisElements
 import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
-import math
+import logging
 import os
 import traceback
 
+import numpy as np
+
 from CreateElementResult import CreateElementResult
 from PythonPartUtil import PythonPartUtil
 from TypeCollections.ModelEleList import ModelEleList
 
+from SolarCommon.logger import get_logger, flush_logs, MESSAGE_FORMAT
+from SolarCommon.property_pool import get_common_properties
+from SolarCommon.bays import bay_types, parse_bay_overrides
+from SolarCommon.instancing import CuboidPrototype, rotation_matrix
+from SolarCommon.layout import roof_second_side_matrix, transform_points
+from SolarCommon.lod import parse_lod, row_runs, run_slabs, run_outline, FULL, BOX, SLAB
+from SolarCommon.plan import module_outlines, box_outline, polyline_2d
+
 try:
     from __BuildingElementStubFiles.SolarCarportRoofBuildingElement import SolarCarportRoofBuildingElement as BuildingElement
 except ImportError:
@@ -17,9 +27,10 @@ except ImportError:
 
 DEBUG_FILE = os.path.expanduser("~/Desktop/SolarCarport_Debug.txt")
 
+logger = get_logger(__name__, DEBUG_FILE, level=logging.DEBUG, fmt=MESSAGE_FORMAT)
+
 def log_debug(msg):
-    with open(DEBUG_FILE, "a") as f:
-        f.write(msg + "\n")
+    logger.debug(msg)
 
 def check_allplan_version(build_ele, version):
     log_debug("check_allplan_version called")
@@ -47,72 +58,79 @@ def create_element(build_ele: BuildingElement,
         roof_angle_degrees = build_ele.RoofAngle.value
         ridge_height = build_ele.RidgeHeight.value
         
+        # One view per component class instead of one per module (default on)
+        group_components = bool(build_ele.GroupComponents.value) if hasattr(build_ele, 'GroupComponents') else True
+        
+        # Frame + PV layer, one box or one slab per row (see SolarCommon.lod)
+        lod = parse_lod(build_ele.LevelOfDetail.value) if hasattr(build_ele, 'LevelOfDetail') else FULL
+        
+        # Solids in a 3D-only view, plan drawn from 2D symbols (see SolarCommon.plan)
+        plan_symbols = bool(build_ele.PlanSymbols.value) if hasattr(build_ele, 'PlanSymbols') else False
+        
+        # Bays repeated along X (one bay by default)
+        bay_count = int(build_ele.BayCount.value) if hasattr(build_ele, 'BayCount') else 1
+        bay_pitch = build_ele.BayPitch.value if hasattr(build_ele, 'BayPitch') else 0
+        bay_overrides = parse_bay_overrides(build_ele.BayOverrides.value) if hasattr(build_ele, 'BayOverrides') else []
+        
         log_debug(f"Rows: {num_rows}, Cols: {num_cols}")
         log_debug(f"CreateSecondSide: {create_second_side}")
         log_debug(f"RoofAngle: {roof_angle_degrees}°")
+        log_debug(f"Bays: {bay_count}, pitch {bay_pitch} mm, {len(bay_overrides)} override(s)")
+        log_debug(f"Level of detail: {lod}, plan symbols: {plan_symbols}")
         
-        # Calculate dimensions
-        plate_width = num_cols * module_width + (num_cols - 1) * col_gap
-        plate_height = num_rows * module_height + (num_rows - 1) * row_gap
+        # Same parameters as a project of auto_generate_solar.py
+        params = {
+            'modules': {'rows': num_rows, 'cols': num_cols, 'width': module_width,
+                        'height': module_height, 'thickness': module_thickness},
+            'gaps': {'row': row_gap, 'col': col_gap},
+            'plate': {'thickness': plate_thickness, 'offset': plate_offset},
+            'roof': {'createSecondSide': bool(create_second_side), 'angle': roof_angle_degrees,
+                     'ridgeHeight': ridge_height},
+        }
+        if bay_count > 1 or bay_overrides:
+            params['bays'] = {'count': bay_count, 'pitch': bay_pitch, 'overrides': bay_overrides}
+            
+            # Bays never overlap: the pitch is at least the widest plate
+            types = bay_types(params)
+            widest = max(bay_plate_size(bay_type.params)[0] for bay_type in types)
+            if bay_pitch < widest:
+                log_debug(f"Bay pitch {bay_pitch} mm < plate width, using {widest} mm")
+                params['bays']['pitch'] = widest
         
         # PythonPartUtil
         common_props = AllplanBaseElements.CommonProperties()
         python_part_util = PythonPartUtil(common_props)
         
-        # --- FIRST SIDE (NO ROTATION) ---
-        log_debug("Creating first roof side...")
-        create_roof_side(
-            python_part_util,
-            num_rows, num_cols,
-            module_width, module_height, module_thickness,
-            row_gap, col_gap,
-            plate_thickness, plate_offset,
-            origin=AllplanGeo.Point3D(0, 0, 0),
-            rotation_matrix=None  # No rotation
-        )
-        log_debug("First roof side created OK")
-        
-        # --- SECOND SIDE (WITH ROTATION) ---
-        if create_second_side:
-            log_debug("Creating second roof side...")
-            
-            # Convert angle to radians
-            angle_rad = math.radians(roof_angle_degrees)
-            
-            # Calculate offset for second side
-            # The second side is translated at the ridge
-            offset_y = plate_height + ridge_height * math.tan(angle_rad)
-            
-            # Create rotation matrix [226]
-            rotation_matrix = AllplanGeo.Matrix3D()
+        # Each bay type is built once per roof side and stamped at its bays
+        for bay_type in bay_types(params):
+            bay = bay_type.params
+            modules, gaps, plate, roof = bay['modules'], bay['gaps'], bay['plate'], bay['roof']
+            log_debug(f"Bay type {bay_type.bays[0]}: {bay_type.count} bay(s)")
             
-            # Rotate around Y-axis at the ridge line [226]
-            rotation_matrix.SetRotation(AllplanGeo.AxisPlacement3D(
-                AllplanGeo.Point3D(0, plate_height, plate_offset + plate_thickness),
-                AllplanGeo.Vector3D(0, 1, 0),  # Y-axis
-                AllplanGeo.Vector3D(1, 0, 0)
-            ))
+            sides = [None]  # First side: no rotation
+            if roof['createSecondSide']:
+                # Rotation at the ridge (double angle for symmetric roof) and
+                # translation to the ridge, composed in one matrix [226]
+                sides.append(roof_second_side_matrix(bay_plate_size(bay)[1],
+                                                     plate['offset'] + plate['thickness'],
+                                                     roof['angle'], roof['ridgeHeight']))
             
-            # Apply rotation
-            rotation_matrix.RotateX(angle_rad * 2)  # Double angle for symmetric roof
-            
-            # Set translation to position at ridge
-            rotation_matrix.SetTranslation(AllplanGeo.Vector3D(
-                0, 
-                plate_height, 
-                plate_offset + plate_thickness + ridge_height
-            ))
-            
-            create_roof_side(
-                python_part_util,
-                num_rows, num_cols,
-                module_width, module_height, module_thickness,
-                row_gap, col_gap,
-                plate_thickness, plate_offset,
-                origin=AllplanGeo.Point3D(0, 0, 0),
-                rotation_matrix=rotation_matrix
-            )
-            log_debug("Second roof side created OK")
+            for side, transform in enumerate(sides, 1):
+                log_debug(f"Creating roof side {side}...")
+                create_roof_side(
+                    python_part_util,
+                    modules['rows'], modules['cols'],
+                    modules['width'], modules['height'], modules['thickness'],
+                    gaps['row'], gaps['col'],
+                    plate['thickness'], plate['offset'],
+                    origin=AllplanGeo.Point3D(0, 0, 0),
+                    transform=transform,
+                    group_components=group_components,
+                    bay_offsets=bay_type.offsets,
+                    lod=lod,
+                    plan_symbols=plan_symbols
+                )
+                log_debug(f"Roof side {side} created OK")
         
         # Return result
         result = CreateElementResult(python_part_util.create_pythonpart(build_ele))
@@ -123,76 +141,203 @@ def create_element(build_ele: BuildingElement,
         log_debug(f"ERROR: {str(e)}")
         log_debug(traceback.format_exc())
         return CreateElementResult()
+    finally:
+        flush_logs()
+
+def bay_plate_size(params):
+    """(width, height) of the support plate of one roof side of a bay"""
+    modules, gaps = params['modules'], params['gaps']
+    return (modules['cols'] * modules['width'] + (modules['cols'] - 1) * gaps['col'],
+            modules['rows'] * modules['height'] + (modules['rows'] - 1) * gaps['row'])
 
 def create_roof_side(python_part_util, num_rows, num_cols,
                      module_width, module_height, module_thickness,
                      row_gap, col_gap,
                      plate_thickness, plate_offset,
-                     origin, rotation_matrix):
-    """Helper function to create one roof side (with optional rotation)"""
+                     origin, transform=None, group_components=True, bay_offsets=(0,), lod=FULL,
+                     plan_symbols=False):
+    """
+    Helper function to create one roof side (with optional rotation)
+
+    The side matrix (transform, a (4, 4) array) is applied once to the plate,
+    frame and PV prototypes; the module origins are transformed together
+    with one array operation instead of transforming every solid. The side
+    is then stamped at every bay by translating those origins along X.
+
+    With group_components all frames go into one ModelEleList and all PV
+    layers into another, added as two views for the whole side. Otherwise
+    each frame and PV layer gets its own view (2 x rows x cols views).
+
+    The level of detail replaces frame and PV layer by one box per module
+    (box) or by one slab per row with the module outlines as polylines on
+    top of it (slab, always grouped).
+
+    With plan_symbols the solids are added as 3D-only views and the plan
+    gets one 2D view per side: the plate outline and one polyline per
+    module row, projected onto XY.
+    """
     
     frame_thickness = 30  # mm
     
+    # 3D views are also drawn in plan, unless the plan has its own 2D symbols
+    add_view = (python_part_util.add_pythonpart_view_3d if plan_symbols
+                else python_part_util.add_pythonpart_view_2d3d)
+    
+    # Rotation of the prototypes, None for an unrotated side
+    rotation = rotation_matrix(transform[:3, :3]) if transform is not None else None
+    
     # === SUPPORT PLATE ===
-    plate_props = AllplanBaseElements.CommonProperties()
-    plate_props.Color = 7  # Grey
+    plate_props = get_common_properties(7)  # Grey
     plate_list = ModelEleList(plate_props)
     
     plate_width = num_cols * module_width + (num_cols - 1) * col_gap
     plate_height = num_rows * module_height + (num_rows - 1) * row_gap
+    plate_box = np.array([[origin.X, origin.Y, origin.Z + plate_offset],
+                          [origin.X + plate_width, origin.Y + plate_height,
+                           origin.Z + plate_offset + plate_thickness]])
     
-    plate_p1 = origin + AllplanGeo.Point3D(0, 0, plate_offset)
-    plate_p2 = origin + AllplanGeo.Point3D(plate_width, plate_height, 
-                                          plate_offset + plate_thickness)
-    plate = AllplanGeo.Polyhedron3D.CreateCuboid(plate_p1, plate_p2)
+    if transform is not None:
+        plate_origin = transform_points(transform, np.array([[origin.X, origin.Y,
+                                                              origin.Z + plate_offset]]))
+        plate = CuboidPrototype(plate_width, plate_height, plate_thickness,
+                                rotation).place(*plate_origin[0].tolist())
+    else:
+        plate_p1 = origin + AllplanGeo.Point3D(0, 0, plate_offset)
+        plate_p2 = origin + AllplanGeo.Point3D(plate_width, plate_height, 
+                                              plate_offset + plate_thickness)
+        plate = AllplanGeo.Polyhedron3D.CreateCuboid(plate_p1, plate_p2)
     
-    if rotation_matrix:
-        plate = plate.Transform(rotation_matrix)
-    
-    plate_list.append_geometry_3d(plate)
-    python_part_util.add_pythonpart_view_2d3d(plate_list)
+    for dx in bay_offsets:
+        bay_plate = AllplanGeo.Move(plate, AllplanGeo.Vector3D(dx, 0, 0)) if dx else plate
+        plate_list.append_geometry_3d(bay_plate)
+    add_view(plate_list)
     
     # === SOLAR MODULES ===
     module_z = plate_offset + plate_thickness
     
-    for row in range(num_rows):
-        for col in range(num_cols):
-            x = col * (module_width + col_gap)
-            y = row * (module_height + row_gap)
-            z = module_z
-            
+    frame_props = get_common_properties(4)  # Blue
+    pv_props = get_common_properties(21)  # Dark blue
+    frame_list = ModelEleList(frame_props)
+    pv_list = ModelEleList(pv_props)
+    
+    # Frame and PV layer are built once and placed per module
+    # (box: the frame prototype is the whole module and there is no PV layer)
+    inset = frame_thickness / 2
+    frame_height = module_thickness if lod == BOX else frame_thickness
+    frame_proto = CuboidPrototype(module_width, module_height, frame_height, rotation)
+    pv_proto = CuboidPrototype(module_width - 2 * inset, module_height - 2 * inset,
+                               module_thickness - frame_thickness, rotation)
+    
+    def module_origins(dx=0):
+        """Frame origins of one bay, row by row"""
+        for row in range(num_rows):
+            for col in range(num_cols):
+                x = origin.X + col * (module_width + col_gap)
+                yield (x + dx if dx else x, origin.Y + row * (module_height + row_gap),
+                       origin.Z + module_z)
+    
+    if plan_symbols:
+        # Module tops and plate top as seen from above
+        module_tops = np.array(list(module_origins()), dtype=float) + [0.0, 0.0, module_thickness]
+        create_roof_side_plan(python_part_util, module_tops, plate_box,
+                              module_width, module_height, col_gap,
+                              transform, bay_offsets, plate_props, frame_props)
+    
+    if lod == SLAB:
+        create_roof_side_slabs(add_view, np.array(list(module_origins()), dtype=float),
+                               module_width, module_height, module_thickness, col_gap,
+                               transform, rotation, bay_offsets, pv_props, frame_props)
+        return
+    
+    if transform is not None:
+        # All origins of the side transformed in one array operation, once for all bays
+        origins = np.array(list(module_origins()), dtype=float)
+        frame_origins = transform_points(transform, origins)
+        pv_origins = transform_points(transform, origins + [inset, inset, frame_thickness])
+    
+    for dx in bay_offsets:
+        if transform is None:
+            placements = ((o, (o[0] + inset, o[1] + inset, o[2] + frame_thickness))
+                          for o in module_origins(dx))
+        else:
+            shift = [dx, 0.0, 0.0]
+            placements = zip((frame_origins + shift).tolist(), (pv_origins + shift).tolist())
+        
+        for frame_origin, pv_origin in placements:
             # BLUE FRAME
-            frame_props = AllplanBaseElements.CommonProperties()
-            frame_props.Color = 4  # Blue
-            frame_list = ModelEleList(frame_props)
-            
-            frame_p1 = origin + AllplanGeo.Point3D(x, y, z)
-            frame_p2 = origin + AllplanGeo.Point3D(x + module_width, y + module_height,
-                                                   z + frame_thickness)
-            frame = AllplanGeo.Polyhedron3D.CreateCuboid(frame_p1, frame_p2)
-            
-            if rotation_matrix:
-                frame = frame.Transform(rotation_matrix)
+            frame = frame_proto.place(*frame_origin)
             
             frame_list.append_geometry_3d(frame)
-            python_part_util.add_pythonpart_view_2d3d(frame_list)
-            
-            # DARK BLUE PV LAYER
-            pv_props = AllplanBaseElements.CommonProperties()
-            pv_props.Color = 21  # Dark blue
-            pv_list = ModelEleList(pv_props)
+            if not group_components:
+                add_view(frame_list)
+                frame_list = ModelEleList(frame_props)
             
-            inset = frame_thickness / 2
-            pv_p1 = origin + AllplanGeo.Point3D(x + inset, y + inset, 
-                                               z + frame_thickness)
-            pv_p2 = origin + AllplanGeo.Point3D(x + module_width - inset, 
-                                               y + module_height - inset,
-                                               z + frame_thickness + 
-                                               (module_thickness - frame_thickness))
-            pv_layer = AllplanGeo.Polyhedron3D.CreateCuboid(pv_p1, pv_p2)
+            if lod == BOX:
+                continue
             
-            if rotation_matrix:
-                pv_layer = pv_layer.Transform(rotation_matrix)
+            # DARK BLUE PV LAYER
+            pv_layer = pv_proto.place(*pv_origin)
             
             pv_list.append_geometry_3d(pv_layer)
-            python_part_util.add_pythonpart_view_2d3d(pv_list)
+            if not group_components:
+                add_view(pv_list)
+                pv_list = ModelEleList(pv_props)
+    
+    if group_components:
+        add_view(frame_list)
+        if lod == FULL:
+            add_view(pv_list)
+
+def create_roof_side_slabs(add_view, origins, module_width, module_height, module_thickness,
+                           col_gap, transform, rotation, bay_offsets, slab_props, outline_props):
+    """
+    Slab detail of one roof side: one slab per module row and one outline
+    polyline per row on the top face, added with add_view as two views for
+    all bays
+
+    origins are the module origins of the first bay in side coordinates;
+    slabs and outlines are placed like the modules (side matrix, then the
+    bay offsets along X).
+    """
+    runs = row_runs(origins, module_width, col_gap)
+    slabs = run_slabs(runs, module_width, module_height, module_thickness)
+    outlines = [run_outline(run, module_width, module_height, run[0, 2] + module_thickness) for run in runs]
+    
+    slab_origins = slabs[:, 0]
+    if transform is not None:
+        slab_origins = transform_points(transform, slab_origins)
+        outlines = [transform_points(transform, outline) for outline in outlines]
+    
+    # Every row of a roof side spans all columns: one prototype for all slabs
+    slab_proto = CuboidPrototype.from_box(slabs[0].tolist(), rotation)
+    
+    slab_list = ModelEleList(slab_props)
+    outline_list = ModelEleList(outline_props)
+    for dx in bay_offsets:
+        shift = [dx, 0.0, 0.0]
+        for slab_origin in (slab_origins + shift).tolist():
+            slab_list.append_geometry_3d(slab_proto.place(*slab_origin))
+        for outline in outlines:
+            outline_list.append_geometry_3d(AllplanGeo.Polyline3D(
+                [AllplanGeo.Point3D(*point) for point in (outline + shift).tolist()]))
+    
+    add_view(slab_list)
+    add_view(outline_list)
+
+def create_roof_side_plan(python_part_util, module_tops, plate_box, module_width, module_height,
+                          col_gap, transform, bay_offsets, plate_props, module_props):
+    """
+    Plan symbols of one roof side: the plate outline and one closed polyline
+    per module row, projected onto XY and added as one 2D view for all bays
+    """
+    plate_outline = box_outline(plate_box, transform)
+    outlines = module_outlines(module_tops, module_width, module_height, col_gap, transform)
+    
+    plan_list = ModelEleList(plate_props)
+    for dx in bay_offsets:
+        shift = [dx, 0.0]
+        plan_list.append_geometry_2d(polyline_2d(plate_outline + shift))
+        for outline in outlines:
+            plan_list.append_geometry_2d(polyline_2d(outline + shift), module_props)
+    
+    python_part_util.add_pythonpart_view_2d(plan_list)
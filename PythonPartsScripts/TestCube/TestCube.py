@@ -2,6 +2,7 @@ import NemAll_Python_Geometry as AllplanGeo
 import NemAll_Python_BaseElements as AllplanBaseElements
 import NemAll_Python_BasisElements as AllplanBasisElements
 import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
+import logging
 import os
 import traceback
 
@@ -9,6 +10,8 @@ from CreateElementResult import CreateElementResult
 from PythonPartUtil import PythonPartUtil
 from TypeCollections.ModelEleList import ModelEleList
 
+from SolarCommon.logger import get_logger, flush_logs, TRACE, MESSAGE_FORMAT
+
 try:
     from __BuildingElementStubFiles.TestCubeBuildingElement import TestCubeBuildingElement as BuildingElement
 except ImportError:
@@ -16,9 +19,10 @@ except ImportError:
 
 DEBUG_FILE = os.path.expanduser("~/Desktop/PythonPart_Debug.txt")
 
+logger = get_logger(__name__, DEBUG_FILE, level=logging.DEBUG, fmt=MESSAGE_FORMAT)
+
 def log_debug(msg):
-    with open(DEBUG_FILE, "a") as f:
-        f.write(msg + "\n")
+    logger.debug(msg)
 
 def check_allplan_version(build_ele, version):
     log_debug("check_allplan_version called")
@@ -48,7 +52,7 @@ def create_element(build_ele: BuildingElement,
         
         # Crée un array de cubes
         for i in range(repeat_count):
-            log_debug(f"Creating cube {i+1}/{repeat_count}")
+            logger.log(TRACE, "Creating cube %d/%d", i + 1, repeat_count)
             
             # Positionne chaque cube selon l'index
             offset_x = i * (cube_size + distance)
@@ -63,7 +67,7 @@ def create_element(build_ele: BuildingElement,
             p2 = p1 + AllplanGeo.Point3D(cube_size, cube_size, cube_size)
             
             cuboid_geo = AllplanGeo.Polyhedron3D.CreateCuboid(p1, p2)
-            log_debug(f"Cuboid {i+1} created OK")
+            logger.log(TRACE, "Cuboid %d created OK", i + 1)
             
             # Ajoute à la liste
             model_ele_list.append_geometry_3d(cuboid_geo)
@@ -84,3 +88,5 @@ def create_element(build_ele: BuildingElement,
         log_debug(traceback.format_exc())
         log_debug("=== create_element END ERROR ===")
         return CreateElementResult()
+    finally:
+        flush_logs()
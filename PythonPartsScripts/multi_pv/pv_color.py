@@ -2,6 +2,7 @@ import NemAll_Python_Geometry as AllplanGeo
 import NemAll_Python_BaseElements as AllplanBaseElements
 import NemAll_Python_BasisElements as AllplanBasisElements
 import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
+import logging
 import os
 import traceback
 
@@ -9,6 +10,13 @@ from CreateElementResult import CreateElementResult
 from PythonPartUtil import PythonPartUtil
 from TypeCollections.ModelEleList import ModelEleList
 
+from SolarCommon.logger import get_logger, flush_logs, TRACE, MESSAGE_FORMAT
+from SolarCommon.property_pool import get_common_properties
+from SolarCommon.instancing import CuboidPrototype
+from SolarCommon.layout import module_origins
+from SolarCommon.lod import parse_lod, row_runs, run_slabs, run_outline, FULL, BOX, SLAB
+from SolarCommon.plan import module_outlines, box_outline, polyline_2d
+
 try:
     from __BuildingElementStubFiles.SolarModuleArrayBuildingElement import SolarModuleArrayBuildingElement as BuildingElement
 except ImportError:
@@ -16,9 +24,10 @@ except ImportError:
 
 DEBUG_FILE = os.path.expanduser("~/Desktop/SolarArray_Debug.txt")
 
+logger = get_logger(__name__, DEBUG_FILE, level=logging.DEBUG, fmt=MESSAGE_FORMAT)
+
 def log_debug(msg):
-    with open(DEBUG_FILE, "a") as f:
-        f.write(msg + "\n")
+    logger.debug(msg)
 
 def check_allplan_version(build_ele, version):
     log_debug("check_allplan_version called")
@@ -44,7 +53,16 @@ def create_element(build_ele: BuildingElement,
         plate_thickness = build_ele.PlateThickness.value
         plate_offset = build_ele.PlateOffset.value
         
-        log_debug(f"Rows: {num_rows}, Cols: {num_cols}")
+        # One view per component class instead of one per module (default on)
+        group_components = bool(build_ele.GroupComponents.value) if hasattr(build_ele, 'GroupComponents') else True
+        
+        # Frame + PV layer, one box or one slab per row (see SolarCommon.lod)
+        lod = parse_lod(build_ele.LevelOfDetail.value) if hasattr(build_ele, 'LevelOfDetail') else FULL
+        
+        # Solids in a 3D-only view, plan drawn from 2D symbols (see SolarCommon.plan)
+        plan_symbols = bool(build_ele.PlanSymbols.value) if hasattr(build_ele, 'PlanSymbols') else False
+        
+        log_debug(f"Rows: {num_rows}, Cols: {num_cols}, level of detail: {lod}, plan symbols: {plan_symbols}")
         
         # Calculate dimensions
         plate_width = num_cols * module_width + (num_cols - 1) * col_gap
@@ -56,11 +74,12 @@ def create_element(build_ele: BuildingElement,
         # PythonPartUtil
         common_props = AllplanBaseElements.CommonProperties()
         python_part_util = PythonPartUtil(common_props)
+        add_view = (python_part_util.add_pythonpart_view_3d if plan_symbols
+                    else python_part_util.add_pythonpart_view_2d3d)
         
         # === 1. CREATE SUPPORT PLATE (GREY) ===
         log_debug("Creating grey support plate...")
-        plate_props = AllplanBaseElements.CommonProperties()
-        plate_props.Color = 7  # Grey color (Allplan color ID)
+        plate_props = get_common_properties(7)  # Grey color (Allplan color ID)
         
         plate_list = ModelEleList(plate_props)
         
@@ -69,58 +88,87 @@ def create_element(build_ele: BuildingElement,
         plate = AllplanGeo.Polyhedron3D.CreateCuboid(plate_p1, plate_p2)
         plate_list.append_geometry_3d(plate)
         
-        python_part_util.add_pythonpart_view_2d3d(plate_list)
+        add_view(plate_list)
         log_debug("Support plate created OK")
         
         # === 2. CREATE SOLAR MODULES WITH FRAMES ===
+        # Grouped: all frames in one list and all PV layers in another,
+        # added as two views instead of two views per module
         module_z = plate_offset + plate_thickness
         
-        for row in range(num_rows):
+        frame_props = get_common_properties(4)  # Blue color for frame
+        pv_props = get_common_properties(21)  # Dark blue for PV cells
+        frame_list = ModelEleList(frame_props)
+        pv_list = ModelEleList(pv_props)
+        
+        # Frame and PV layer are built once and placed per module
+        # (box: the frame prototype is the whole module and there is no PV layer)
+        inset = frame_thickness / 2
+        frame_proto = CuboidPrototype(module_width, module_height,
+                                      module_thickness if lod == BOX else frame_thickness)
+        pv_proto = CuboidPrototype(module_width - 2 * inset, module_height - 2 * inset,
+                                   module_thickness - frame_thickness)
+        
+        # Slab: one slab per row, module outlines as one polyline per row on top
+        if lod == SLAB:
+            runs = row_runs(module_origins(num_rows, num_cols, module_width + col_gap,
+                                           module_height + row_gap, module_z),
+                            module_width, col_gap)
+            for (x1, y1, z1), (x2, y2, z2) in run_slabs(runs, module_width, module_height,
+                                                        module_thickness).tolist():
+                pv_list.append_geometry_3d(AllplanGeo.Polyhedron3D.CreateCuboid(
+                    AllplanGeo.Point3D(x1, y1, z1), AllplanGeo.Point3D(x2, y2, z2)))
+            for run in runs:
+                points = run_outline(run, module_width, module_height, module_z + module_thickness)
+                frame_list.append_geometry_3d(AllplanGeo.Polyline3D(
+                    [AllplanGeo.Point3D(*point) for point in points.tolist()]))
+        
+        # One frame (and PV layer) per module, none with slab detail
+        module_rows = 0 if lod == SLAB else num_rows
+        for row in range(module_rows):
             for col in range(num_cols):
                 x = col * (module_width + col_gap)
                 y = row * (module_height + row_gap)
                 z = module_z
                 
-                log_debug(f"Creating module [{row},{col}]...")
+                logger.log(TRACE, "Creating module [%d,%d]...", row, col)
                 
                 # --- BLUE FRAME (around module) ---
-                frame_props = AllplanBaseElements.CommonProperties()
-                frame_props.Color = 4  # Blue color for frame
-                frame_list = ModelEleList(frame_props)
-                
-                # Frame outer dimensions
-                frame_p1 = AllplanGeo.Point3D(x, y, z)
-                frame_p2 = AllplanGeo.Point3D(
-                    x + module_width,
-                    y + module_height,
-                    z + frame_thickness
-                )
-                frame = AllplanGeo.Polyhedron3D.CreateCuboid(frame_p1, frame_p2)
+                frame = frame_proto.place(x, y, z)
                 frame_list.append_geometry_3d(frame)
-                python_part_util.add_pythonpart_view_2d3d(frame_list)
+                if not group_components:
+                    add_view(frame_list)
+                    frame_list = ModelEleList(frame_props)
                 
-                # --- BLUE PV LAYER (solar cells) ---
-                pv_props = AllplanBaseElements.CommonProperties()
-                pv_props.Color = 21  # Dark blue for PV cells
-                pv_list = ModelEleList(pv_props)
+                if lod == BOX:
+                    continue
                 
+                # --- BLUE PV LAYER (solar cells) ---
                 # PV layer sits above frame, slightly inset
-                inset = frame_thickness / 2
-                pv_p1 = AllplanGeo.Point3D(
-                    x + inset,
-                    y + inset,
-                    z + frame_thickness
-                )
-                pv_p2 = AllplanGeo.Point3D(
-                    x + module_width - inset,
-                    y + module_height - inset,
-                    z + frame_thickness + (module_thickness - frame_thickness)
-                )
-                pv_layer = AllplanGeo.Polyhedron3D.CreateCuboid(pv_p1, pv_p2)
+                pv_layer = pv_proto.place(x + inset, y + inset, z + frame_thickness)
                 pv_list.append_geometry_3d(pv_layer)
-                python_part_util.add_pythonpart_view_2d3d(pv_list)
+                if not group_components:
+                    add_view(pv_list)
+                    pv_list = ModelEleList(pv_props)
                 
-                log_debug(f"Module [{row},{col}] created with frame and PV layer")
+                logger.log(TRACE, "Module [%d,%d] created with frame and PV layer", row, col)
+        
+        if group_components or lod == SLAB:
+            add_view(frame_list)
+            if lod != BOX:
+                add_view(pv_list)
+        
+        # === 3. PLAN SYMBOLS: plate outline and one polyline per module row ===
+        if plan_symbols:
+            plan_list = ModelEleList(plate_props)
+            plan_list.append_geometry_2d(polyline_2d(box_outline([[0, 0, plate_offset],
+                                                                  [plate_width, plate_height,
+                                                                   plate_offset + plate_thickness]])))
+            for outline in module_outlines(module_origins(num_rows, num_cols, module_width + col_gap,
+                                                          module_height + row_gap, module_z),
+                                           module_width, module_height, col_gap):
+                plan_list.append_geometry_2d(polyline_2d(outline), frame_props)
+            python_part_util.add_pythonpart_view_2d(plan_list)
         
         log_debug(f"Total modules: {num_rows * num_cols}")
         
@@ -134,3 +182,5 @@ def create_element(build_ele: BuildingElement,
         log_debug(traceback.format_exc())
         log_debug("=== create_element END ERROR ===")
         return CreateElementResult()
+    finally:
+        flush_logs()
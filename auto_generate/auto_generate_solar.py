@@ -10,26 +10,64 @@ Requirements: Allplan must be running with an active document
 """
 
 import sys
-import json
 import os
-from datetime import datetime
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
 
 # Add Allplan Python API to path
 ALLPLAN_API_PATH = "C:/Program Files/Allplan/Allplan 2026/Etc/PythonPartsFramework"
 if ALLPLAN_API_PATH not in sys.path:
     sys.path.append(ALLPLAN_API_PATH)
 
+# Shared solar helpers (SolarCommon package next to the PythonParts scripts)
+PYTHONPARTS_SCRIPTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        "..", "PythonPartsScripts")
+if PYTHONPARTS_SCRIPTS_PATH not in sys.path:
+    sys.path.append(PYTHONPARTS_SCRIPTS_PATH)
+
+from SolarCommon.layout import (compute_project_layout, roof_side_transforms, transform_points,
+                                translation_matrix)
+from SolarCommon.bays import bay_types, bay_module_count, bay_row_count
+from SolarCommon.bom import project_bom, write_bom
+from SolarCommon.lod import parse_lod, row_runs, run_slabs, run_outline, FULL, BOX, SLAB
+from SolarCommon.layout_cache import LayoutCache
+from SolarCommon.manifest import RunManifest, ManifestDiff, UNCHANGED, INVALID
+from SolarCommon.config_schema import check_config, check_project, unique_projects, ConfigError
+from SolarCommon.config_stream import iter_projects, load_projects
+from SolarCommon.logger import get_logger, flush_logs
+from SolarCommon.progress import (RowChunk, ProgressReporter, CancelToken, GenerationCancelled,
+                                  consume_chunks, ignore_interrupts)
+from SolarCommon.backend import install_backend, BACKEND_ENV_VAR, BACKENDS, ALLPLAN, HEADLESS
+
 try:
+    # Real Allplan API unless SOLAR_BACKEND=headless (or auto) is set
+    BACKEND = install_backend(default=ALLPLAN)
+
     import NemAll_Python_Geometry as AllplanGeo
     import NemAll_Python_BaseElements as AllplanBaseElements
     import NemAll_Python_BasisElements as AllplanBasisElements
     import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
+
+    # SolarCommon modules built on the Allplan API
+    from SolarCommon.property_pool import get_common_properties
+    from SolarCommon.instancing import CuboidPrototype, rotation_matrix
 except ImportError as e:
     print(f"ERROR: Cannot import Allplan Python API")
     print(f"Details: {e}")
     print(f"Make sure:")
     print(f"  1. Allplan is installed")
     print(f"  2. API path is correct: {ALLPLAN_API_PATH}")
+    print(f"  Or set {BACKEND_ENV_VAR}=headless to run without Allplan")
+    sys.exit(1)
+except ValueError as e:
+    print(f"ERROR: Invalid {BACKEND_ENV_VAR} value")
+    print(f"Details: {e}")
+    print(f"Set {BACKEND_ENV_VAR} to one of {', '.join(BACKENDS)}, or unset it to use Allplan")
     sys.exit(1)
 
 # ============================================================================
@@ -39,18 +77,30 @@ except ImportError as e:
 LOG_FILE = "generation_log.txt"
 DEFAULT_CONFIG = "solar_config.json"
 
+LARGE_ARRAY_BATCH_MODULES = 2000  # modules built and inserted per batch in large-array mode
+                                  # (whole rows, see large_array_chunk_rows)
+LAYOUT_WINDOW_PER_WORKER = 4      # layouts computed ahead per worker process
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".solar_layout_cache")
+DEFAULT_CACHE_SIZE_MB = 256
+
+MANIFEST_SUFFIX = ".manifest.json"
+STOP_FILE_SUFFIX = ".stop"
+
 # ============================================================================
 # LOGGING UTILITIES
 # ============================================================================
 
+logger = get_logger("auto_generate_solar", LOG_FILE, console=True)
+
 def log(msg, level="INFO"):
-    """Write message to console and log file"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_msg = f"[{timestamp}] [{level}] {msg}"
-    print(log_msg)
-    
-    with open(LOG_FILE, "a") as f:
-        f.write(log_msg + "\n")
+    """
+    Print message and buffer it for the log file
+
+    The buffer is written synchronously, by the logging call that fills it,
+    by an ERROR record or by flush_logs() (see SolarCommon.logger).
+    """
+    logger.log(logging.getLevelName(level), msg)
 
 def log_section(title):
     """Log a section header"""
@@ -65,10 +115,10 @@ def log_section(title):
 
 def load_config(config_file):
     """
-    Load configuration from JSON file
+    Load configuration from JSON file (or a JSON Lines file of projects)
     
     Args:
-        config_file (str): Path to JSON configuration file
+        config_file (str): Path to JSON / JSON Lines configuration file
     
     Returns:
         dict: Configuration dictionary
@@ -82,8 +132,7 @@ def load_config(config_file):
     if not os.path.exists(config_file):
         raise FileNotFoundError(f"Config file not found: {config_file}")
     
-    with open(config_file, 'r') as f:
-        config = json.load(f)
+    config = load_projects(config_file)
     
     log(f"Configuration loaded successfully")
     log(f"Version: {config.get('version', 'unknown')}")
@@ -95,125 +144,373 @@ def validate_config(config):
     """
     Validate configuration structure and values
     
+    All projects are checked against the config schema in one pass before
+    anything is generated (see SolarCommon.config_schema).
+    
     Args:
         config (dict): Configuration dictionary
     
     Returns:
-        bool: True if valid, raises exception otherwise
+        bool: True if valid
+    
+    Raises:
+        ConfigError: With every error and its JSON path
     """
     log("Validating configuration...")
     
-    if 'projects' not in config:
-        raise ValueError("Config must contain 'projects' key")
+    errors = check_config(config)
+    if errors:
+        raise ConfigError(errors)
     
-    for idx, project in enumerate(config['projects']):
-        log(f"Validating project {idx + 1}: {project.get('name', 'unnamed')}")
-        
-        # Check required keys
-        required = ['name', 'modules', 'gaps', 'plate', 'roof', 'placement']
-        for key in required:
-            if key not in project:
-                raise ValueError(f"Project '{project.get('name')}' missing required key: {key}")
-        
-        # Validate ranges
-        modules = project['modules']
-        if not (1 <= modules['rows'] <= 20):
-            raise ValueError(f"Project '{project['name']}': rows must be 1-20")
-        if not (1 <= modules['cols'] <= 20):
-            raise ValueError(f"Project '{project['name']}': cols must be 1-20")
-    
-    log("Configuration validation passed")
+    log(f"Configuration validation passed ({len(config['projects'])} projects)")
     return True
 
+def enabled_projects(projects):
+    """
+    Number the projects of a config and drop the disabled ones
+    
+    Args:
+        projects (iterable): Project configurations in config order (list or stream)
+    
+    Yields:
+        tuple: (position in the config, project) of every enabled project
+    """
+    for index, project in enumerate(projects):
+        if project.get('enabled', True):
+            yield index, project
+
+def validate_project(project, index=None):
+    """
+    Validate the structure and values of one project
+    
+    Args:
+        project (dict): Project configuration
+        index (int):    Position in the config, for the error paths
+    
+    Raises:
+        ConfigError: With every error and its JSON path
+    """
+    errors = check_project(project, index)
+    if errors:
+        raise ConfigError(errors)
+
 # ============================================================================
 # GEOMETRY GENERATION
 # ============================================================================
 
-def generate_solar_array(params):
+def generate_solar_array(params, layout=None, transform=None):
     """
     Generate solar array geometry from parameters
-    
+
+    The layout of all modules is computed first as coordinate arrays
+    (see SolarCommon.layout), Allplan objects are only built from it at the end.
+    Every roof side of every bay is built from the layout of its bay type
+    with one matrix (see placed_sides). The optional "lod" of the project
+    selects the level of detail of the modules (see build_elements).
+
     Args:
-        params (dict): Project parameters
-    
+        params (dict):         Project parameters
+        layout (ArrayLayout):  Precomputed layout, computed here if None
+        transform (ndarray):   (4, 4) matrix applied to the whole project
+                               (e.g. its placement), None for project coordinates
+
     Returns:
         list: List of ModelElement3D objects
     """
     log(f"Generating solar array: {params['name']}")
-    
-    elements = []
-    
-    # Extract parameters
+
     rows = params['modules']['rows']
     cols = params['modules']['cols']
-    module_w = params['modules']['width']
-    module_h = params['modules']['height']
-    module_t = params['modules']['thickness']
-    row_gap = params['gaps']['row']
-    col_gap = params['gaps']['col']
-    plate_t = params['plate']['thickness']
-    plate_off = params['plate']['offset']
-    
-    colors = params.get('colors', {'plate': 7, 'frame': 4, 'pv': 21})
-    
-    FRAME_THICKNESS = 30  # mm
-    
-    log(f"  Modules: {rows}x{cols} ({module_w}x{module_h}x{module_t} mm)")
-    log(f"  Gaps: row={row_gap} mm, col={col_gap} mm")
-    
+
+    log(f"  Modules: {rows}x{cols} ({params['modules']['width']}x{params['modules']['height']}"
+        f"x{params['modules']['thickness']} mm)")
+    log(f"  Gaps: row={params['gaps']['row']} mm, col={params['gaps']['col']} mm")
+
+    if layout is None:
+        layout = compute_project_layout(params)
+
+    plate_width, plate_height, plate_t = layout.plate_size
+    log(f"  Computed layout: support plate {plate_width}x{plate_height}x{plate_t} mm, "
+        f"{layout.module_count} solar modules")
+
+    log_bays(params, layout)
+
+    elements = []
+    for chunk in iter_row_chunks(params, None, layout, transform):
+        elements.extend(chunk.elements)
+
+    log(f"  Total elements: {len(elements)}")
+
+    return elements
+
+def iter_row_chunks(params, chunk_rows=None, layout=None, transform=None):
+    """
+    Generate solar array geometry as a stream of row chunks
+
+    Every roof side of every bay (see placed_sides) is built chunk_rows
+    module rows at a time. The generator only builds the next chunk when it
+    is resumed, so a caller that inserts and drops each chunk keeps one
+    chunk of elements in memory (see SolarCommon.progress.consume_chunks).
+
+    Args:
+        params (dict):         Project parameters
+        chunk_rows (int):      Module rows per chunk, None for one chunk per roof side
+        layout (ArrayLayout):  Precomputed layout, computed here if None
+        transform (ndarray):   (4, 4) matrix applied to the whole project
+                               (e.g. its placement), None for project coordinates
+
+    Yields:
+        RowChunk: Elements of up to chunk_rows rows of one side, the plate
+        of the side in its first chunk
+    """
+    if layout is None:
+        layout = compute_project_layout(params)
+
+    lod = parse_lod(params.get('lod'))
+    for side_layout, side in placed_sides(params, layout, transform):
+        rows, cols = side_layout.rows, side_layout.cols
+        step = chunk_rows or max(rows, 1)
+        for row in range(0, max(rows, 1), step):
+            stop = min(row + step, rows)
+            yield RowChunk(build_elements(side_layout, row * cols, stop * cols,
+                                          include_plate=(row == 0), transform=side, lod=lod),
+                           stop - row)
+
+def large_array_chunk_rows(layout, batch_modules=LARGE_ARRAY_BATCH_MODULES):
+    """Whole rows per chunk for about batch_modules modules (at least one row)"""
+    return max(1, batch_modules // max(layout.cols, 1))
+
+def generate_solar_array_batches(params, batch_modules=LARGE_ARRAY_BATCH_MODULES, layout=None,
+                                 transform=None):
+    """
+    Generate solar array geometry in batches of modules (large-array mode)
+
+    Only the compact coordinate layout is kept for the whole project, Allplan
+    elements exist for one batch at a time. Time and memory grow linearly
+    with the module count, element memory is bounded by the batch size.
+    Batches are row chunks (see iter_row_chunks) of about batch_modules.
+
+    A caller inserting batch by batch owns the partial project: when a
+    batch fails it must delete the batches already inserted, as
+    insert_row_chunks (main) and BatchInserter (--batch) do.
+
+    Args:
+        params (dict):         Project parameters
+        batch_modules (int):   Number of modules per batch, rounded down to
+                               whole rows
+        layout (ArrayLayout):  Precomputed layout, computed here if None
+        transform (ndarray):   (4, 4) matrix applied to the whole project
+                               (e.g. its placement), None for project coordinates
+
+    Yields:
+        list: ModelElement3D objects of one batch (plate of each roof side
+        and bay in the first batch of that side)
+    """
+    log(f"Generating solar array (large-array mode): {params['name']}")
+
+    if layout is None:
+        layout = compute_project_layout(params)
+    batch_rows = large_array_chunk_rows(layout, batch_modules)
+
+    log(f"  Computed layout: {layout.rows}x{layout.cols} = {layout.module_count} modules, "
+        f"batches of up to {batch_rows} rows")
+    log_bays(params, layout)
+
+    # Counted as emitted: every bay and roof side has its own batches
+    batch_count = row_count = 0
+    for chunk in iter_row_chunks(params, batch_rows, layout, transform):
+        batch_count += 1
+        row_count += chunk.rows
+        yield chunk.elements
+
+    log(f"  {batch_count} batches, {row_count} rows of modules")
+
+def placed_sides(params, layout, transform=None):
+    """
+    Every roof side of every bay, with its layout and one composed matrix
+
+    Bays with the same parameters (a bay type) share one layout, the
+    project layout for bays without override; each bay is that layout moved
+    by its offset. The matrix of a side is project transform x bay offset x
+    side placement.
+
+    Args:
+        params (dict):         Project parameters
+        layout (ArrayLayout):  Layout of the project parameters
+        transform (ndarray):   (4, 4) project transform, None for identity
+
+    Yields:
+        tuple: (ArrayLayout, (4, 4) matrix) per bay and roof side
+    """
+    for bay_type in bay_types(params):
+        if bay_type.params is params:
+            bay_layout = layout
+        else:
+            bay_layout = compute_project_layout(bay_type.params)
+        sides = roof_side_transforms(bay_type.params)
+        for offset in bay_type.offsets:
+            bay = transform
+            if offset:
+                bay = translation_matrix(offset, 0, 0)
+                if transform is not None:
+                    bay = transform @ bay
+            for side in sides:
+                yield bay_layout, side if bay is None else bay @ side
+
+def log_bays(params, layout):
+    """Log the bays and the total module count when there is more than one roof side"""
+    bays = params.get('bays')
+    if bays:
+        log(f"  Bays: {bays['count']} at {bays['pitch']} mm pitch, "
+            f"{len(bay_types(params))} bay type(s)")
+    module_count = bay_module_count(params)
+    if bays or module_count != layout.module_count:
+        log(f"  Roof sides and bays: {module_count} solar modules")
+
+def create_cuboid(box):
+    """
+    Create a cuboid from a [[x1, y1, z1], [x2, y2, z2]] corner pair
+
+    Args:
+        box (list): Min and max corner
+
+    Returns:
+        Polyhedron3D: Cuboid geometry
+    """
+    p1, p2 = box
+    return AllplanGeo.Polyhedron3D.CreateCuboid(AllplanGeo.Point3D(*p1),
+                                                AllplanGeo.Point3D(*p2))
+
+def build_elements(layout, start=0, stop=None, include_plate=True, transform=None, lod=FULL):
+    """
+    Build Allplan elements from a computed layout
+
+    A transform with a rotation (second roof side) is applied once to the
+    plate, frame and PV prototypes and to all their origins in one array
+    operation, never to the solids one by one. A pure translation only moves
+    the boxes of the range, the layout itself is never copied (a chunk costs
+    its own modules, not the whole layout).
+
+    Levels of detail (SolarCommon.lod): 'full' builds frame and PV layer per
+    module, 'box' one box per module (frame color), 'slab' one slab per row
+    of the range (PV color) plus one outline polyline per row (frame color).
+
+    Args:
+        layout (ArrayLayout):  Plate, frame and PV boxes
+        start, stop (int):     Range of modules to build (all by default)
+        include_plate (bool):  Also build the support plate
+        transform (ndarray):   (4, 4) matrix placing the layout, None for none
+        lod (str):             Level of detail of the modules
+
+    Returns:
+        list: List of ModelElement3D objects (plate, then the modules)
+    """
+    rotation = None
+    offset = None
+    if transform is not None:
+        if not np.array_equal(transform[:3, :3], np.eye(3)):
+            rotation = rotation_matrix(transform[:3, :3])
+        elif transform[:3, 3].any():
+            offset = transform[:3, 3]
+
+    def origins(boxes):
+        """Placed min corners of the boxes"""
+        if rotation is not None:
+            return transform_points(transform, boxes[:, 0])
+        if offset is not None:
+            return boxes[:, 0] + offset
+        return boxes[:, 0]
+
+    colors = layout.colors
+    elements = []
+
     # === SUPPORT PLATE (GREY) ===
-    plate_width = cols * module_w + (cols - 1) * col_gap
-    plate_height = rows * module_h + (rows - 1) * row_gap
-    
-    plate_props = AllplanBaseElements.CommonProperties()
-    plate_props.Color = colors['plate']
-    
-    plate_p1 = AllplanGeo.Point3D(0, 0, plate_off)
-    plate_p2 = AllplanGeo.Point3D(plate_width, plate_height, plate_off + plate_t)
-    plate = AllplanGeo.Polyhedron3D.CreateCuboid(plate_p1, plate_p2)
-    
-    elements.append(AllplanBasisElements.ModelElement3D(plate_props, plate))
-    log(f"  Created support plate: {plate_width}x{plate_height}x{plate_t} mm")
-    
+    if include_plate:
+        plate_props = get_common_properties(colors['plate'])
+        if rotation is None:
+            plate = create_cuboid((layout.plate if offset is None else layout.plate + offset).tolist())
+        else:
+            plate = CuboidPrototype.from_box(layout.plate.tolist(), rotation).place(
+                *origins(layout.plate[np.newaxis])[0].tolist())
+        elements.append(AllplanBasisElements.ModelElement3D(plate_props, plate))
+
     # === SOLAR MODULES ===
-    module_z = plate_off + plate_t
-    module_count = 0
-    
-    for row in range(rows):
-        for col in range(cols):
-            x = col * (module_w + col_gap)
-            y = row * (module_h + row_gap)
-            z = module_z
-            
-            # FRAME
-            frame_props = AllplanBaseElements.CommonProperties()
-            frame_props.Color = colors['frame']
-            
-            frame_p1 = AllplanGeo.Point3D(x, y, z)
-            frame_p2 = AllplanGeo.Point3D(x + module_w, y + module_h, z + FRAME_THICKNESS)
-            frame = AllplanGeo.Polyhedron3D.CreateCuboid(frame_p1, frame_p2)
-            
-            elements.append(AllplanBasisElements.ModelElement3D(frame_props, frame))
-            
-            # PV LAYER
-            pv_props = AllplanBaseElements.CommonProperties()
-            pv_props.Color = colors['pv']
-            
-            inset = FRAME_THICKNESS / 2
-            pv_p1 = AllplanGeo.Point3D(x + inset, y + inset, z + FRAME_THICKNESS)
-            pv_p2 = AllplanGeo.Point3D(
-                x + module_w - inset,
-                y + module_h - inset,
-                z + FRAME_THICKNESS + (module_t - FRAME_THICKNESS)
-            )
-            pv_layer = AllplanGeo.Polyhedron3D.CreateCuboid(pv_p1, pv_p2)
-            
-            elements.append(AllplanBasisElements.ModelElement3D(pv_props, pv_layer))
-            module_count += 1
-    
-    log(f"  Created {module_count} solar modules")
-    log(f"  Total elements: {len(elements)}")
-    
+    if layout.module_count == 0:
+        return elements
+
+    frame_props = get_common_properties(colors['frame'])
+    pv_props = get_common_properties(colors['pv'])
+
+    if lod == SLAB:
+        elements.extend(build_slabs(layout, start, stop, transform, rotation, pv_props, frame_props))
+        return elements
+
+    if lod == BOX:
+        # One box from the bottom of the frame to the top of the PV layer
+        module_proto = CuboidPrototype.from_box(module_box(layout).tolist(), rotation)
+        for frame_origin in origins(layout.frames[start:stop]).tolist():
+            elements.append(AllplanBasisElements.ModelElement3D(frame_props,
+                                                                module_proto.place(*frame_origin)))
+        return elements
+
+    # All modules share one frame and one PV box, placed by translation
+    frame_proto = CuboidPrototype.from_box(layout.frames[0].tolist(), rotation)
+    pv_proto = CuboidPrototype.from_box(layout.pvs[0].tolist(), rotation)
+
+    for frame_origin, pv_origin in zip(origins(layout.frames[start:stop]).tolist(),
+                                       origins(layout.pvs[start:stop]).tolist()):
+        # FRAME
+        elements.append(AllplanBasisElements.ModelElement3D(frame_props,
+                                                            frame_proto.place(*frame_origin)))
+
+        # PV LAYER
+        elements.append(AllplanBasisElements.ModelElement3D(pv_props,
+                                                            pv_proto.place(*pv_origin)))
+
+    return elements
+
+def module_box(layout):
+    """(2, 3) box of the first module, frame and PV layer together"""
+    box = layout.frames[0].copy()
+    box[1, 2] = layout.pvs[0, 1, 2]
+    return box
+
+def build_slabs(layout, start, stop, transform, rotation, slab_props, outline_props):
+    """
+    Slab detail of a module range: one slab per row and one outline per row
+
+    Args:
+        layout (ArrayLayout):   Layout, in its own coordinates
+        start, stop (int):      Range of modules
+        transform (ndarray):    (4, 4) side matrix, None for none
+        rotation (Matrix3D):    Rotation of the side, None for none (translation only)
+        slab_props, outline_props (CommonProperties): Formats of slabs and outlines
+
+    Returns:
+        list: ModelElement3D, slabs first
+    """
+    box = module_box(layout)
+    width, height, thickness = (box[1] - box[0]).tolist()
+    col_gap = layout.frames[1, 0, 0] - layout.frames[0, 1, 0] if layout.cols > 1 else 0.0
+
+    runs = row_runs(layout.frames[start:stop, 0], width, col_gap)
+    slabs = run_slabs(runs, width, height, thickness)
+    outlines = [run_outline(run, width, height, run[0, 2] + thickness) for run in runs]
+    slab_origins = slabs[:, 0]
+    if rotation is not None:
+        slab_origins = transform_points(transform, slab_origins)
+        outlines = [transform_points(transform, outline) for outline in outlines]
+    elif transform is not None:
+        slab_origins = slab_origins + transform[:3, 3]
+        outlines = [outline + transform[:3, 3] for outline in outlines]
+
+    elements = []
+    for slab, slab_origin in zip(slabs.tolist(), slab_origins.tolist()):
+        slab_solid = CuboidPrototype.from_box(slab, rotation).place(*slab_origin)
+        elements.append(AllplanBasisElements.ModelElement3D(slab_props, slab_solid))
+    for outline in outlines:
+        outline_line = AllplanGeo.Polyline3D([AllplanGeo.Point3D(*point) for point in outline.tolist()])
+        elements.append(AllplanBasisElements.ModelElement3D(outline_props, outline_line))
     return elements
 
 # ============================================================================
@@ -228,6 +525,8 @@ def connect_to_allplan():
         DocumentAdapter: Active document or None if connection fails
     """
     log("Connecting to Allplan...")
+    if BACKEND == HEADLESS:
+        log("Headless backend: elements are kept in memory, nothing is written to Allplan", "WARNING")
     
     try:
         doc = AllplanElementAdapter.DocumentAdapter.GetActiveDocument()
@@ -244,7 +543,7 @@ def connect_to_allplan():
         log(f"ERROR connecting to Allplan: {str(e)}", "ERROR")
         return None
 
-def insert_into_allplan(doc, elements, placement):
+def insert_into_allplan(doc, elements, placement, created=None):
     """
     Insert elements into Allplan document
     
@@ -252,6 +551,7 @@ def insert_into_allplan(doc, elements, placement):
         doc: DocumentAdapter instance
         elements (list): List of ModelElement3D
         placement (dict): Placement coordinates {'x', 'y', 'z'}
+        created (list): If given, the adapters of the new elements are appended
     
     Returns:
         bool: True if successful, False otherwise
@@ -268,7 +568,9 @@ def insert_into_allplan(doc, elements, placement):
         ))
         
         # Insert elements
-        AllplanBaseElements.CreateElements(doc, transform, elements, [], None)
+        adapters = AllplanBaseElements.CreateElements(doc, transform, elements, [], None)
+        if created is not None:
+            created.extend(adapters)
         
         log("Elements inserted successfully")
         return True
@@ -277,62 +579,726 @@ def insert_into_allplan(doc, elements, placement):
         log(f"ERROR inserting elements: {str(e)}", "ERROR")
         return False
 
+def element_ids(adapters):
+    """
+    Persistent ids of inserted elements, as stored in the run manifest
+
+    Args:
+        adapters (list): BaseElementAdapters returned by CreateElements
+
+    Returns:
+        list: Element GUID strings
+    """
+    return [str(adapter.GetElementUUID()) for adapter in adapters]
+
+def delete_from_allplan(doc, ids):
+    """
+    Delete elements inserted by an earlier run
+    
+    Elements that no longer exist (e.g. deleted by hand) are skipped.
+    
+    Args:
+        doc: DocumentAdapter instance
+        ids (list): Element GUID strings (see element_ids)
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        adapters = AllplanElementAdapter.BaseElementAdapterList()
+        for element_id in ids:
+            guid = AllplanElementAdapter.GUID.FromString(element_id)
+            adapter = AllplanElementAdapter.BaseElementAdapter.FromGUID(guid, doc)
+            if not adapter.IsNull():
+                adapters.append(adapter)
+        
+        log(f"Deleting {len(adapters)} elements ({len(ids) - len(adapters)} already gone)")
+        if adapters:
+            AllplanBaseElements.DeleteElements(doc, adapters)
+        return True
+        
+    except Exception as e:
+        log(f"ERROR deleting elements: {str(e)}", "ERROR")
+        return False
+
+def insert_row_chunks(doc, project, layout, chunk_rows, created=None, cancel=None):
+    """
+    Generate and insert a project row chunk by row chunk
+
+    Each chunk is inserted with its own CreateElements call and dropped
+    before the next one is built. Progress (rows, elements/s, ETA) is logged
+    at most once per second. A cancellation is honoured between two chunks.
+    When the project is cancelled or a chunk fails, the elements of the
+    project inserted so far are deleted again, so the document never holds
+    a partial project.
+
+    Args:
+        doc:                  DocumentAdapter instance
+        project (dict):       Project parameters
+        layout (ArrayLayout): Layout of the project
+        chunk_rows (int):     Module rows per chunk
+        created (list):       If given, the adapters of the new elements are appended
+        cancel (CancelToken): Checked before every chunk, None for none
+
+    Returns:
+        bool: True if every chunk was inserted, False if one failed (project
+        rolled back)
+
+    Raises:
+        GenerationCancelled: Cancelled between two chunks (project rolled back)
+    """
+    log(f"Generating solar array (row chunks of {chunk_rows} rows): {project['name']}")
+    log(f"  Computed layout: {layout.rows}x{layout.cols} = {layout.module_count} modules")
+    log_bays(project, layout)
+
+    adapters = []
+    progress = ProgressReporter(bay_row_count(project), lambda message: log(f"  Progress: {message}"))
+    inserted = False
+    try:
+        inserted = consume_chunks(
+            iter_row_chunks(project, chunk_rows, layout),
+            lambda elements: insert_into_allplan(doc, elements, project['placement'], adapters),
+            progress, cancel)
+    finally:
+        if not inserted and adapters:
+            rollback_project(doc, project, adapters)
+
+    if created is not None:
+        created.extend(adapters)
+    return inserted
+
+def rollback_project(doc, project, adapters):
+    """
+    Delete the elements of a project that could not be inserted completely
+
+    Args:
+        doc:             DocumentAdapter instance
+        project (dict):  Project parameters
+        adapters (list): Adapters of its elements inserted so far, emptied
+    """
+    log(f"Removing the {len(adapters)} elements of {project['name']} inserted so far", "WARNING")
+    delete_from_allplan(doc, element_ids(adapters))
+    del adapters[:]
+
+class BatchInserter:
+    """
+    Insert the elements of several projects with as few CreateElements calls
+    as possible
+
+    Elements must already contain their project placement (see
+    queue_project), they are committed with an identity matrix either all
+    in one call on flush() or in chunks of chunk_size elements.
+
+    A project is only kept as a whole: when a call with some of its elements
+    fails, its elements committed by earlier calls are deleted again and
+    its later elements are dropped.
+    """
+
+    def __init__(self, doc, chunk_size=None, base_elements=None):
+        """
+        Initialisation of class BatchInserter
+
+        Args:
+            doc:                 DocumentAdapter instance
+            chunk_size (int):    Elements per CreateElements call, None for a single call
+            base_elements:       Module providing CreateElements and DeleteElements,
+                                 AllplanBaseElements by default (a fake can be
+                                 passed for testing)
+        """
+        self.document = doc
+        self.chunk_size = chunk_size
+        self.base_elements = base_elements or AllplanBaseElements
+        self.pending = []
+        self.pending_owners = []  # [project_name, element_count] runs in pending order
+        self.failed_projects = set()
+        self.created = {}         # project_name -> adapters of its inserted elements
+        self.call_count = 0
+        self.inserted_count = 0
+
+    def add(self, project_name, elements):
+        """
+        Queue elements of a project, committing full chunks immediately
+
+        Args:
+            project_name (str): Project the elements belong to
+            elements (list):    ModelElement3D with placement applied
+        """
+        if not elements or project_name in self.failed_projects:
+            return
+
+        self.pending.extend(elements)
+        if self.pending_owners and self.pending_owners[-1][0] == project_name:
+            self.pending_owners[-1][1] += len(elements)
+        else:
+            self.pending_owners.append([project_name, len(elements)])
+
+        while self.chunk_size and len(self.pending) >= self.chunk_size:
+            self._commit_front(self.chunk_size)
+
+    def flush(self):
+        """Commit all queued elements"""
+        if self.pending:
+            self._commit_front(len(self.pending))
+
+    def _commit_front(self, count):
+        """Commit the first count pending elements"""
+        chunk = self.pending[:count]
+        del self.pending[:count]
+
+        owners = []  # (project_name, element_count) runs of this chunk
+        remaining = count
+        while remaining:
+            owner = self.pending_owners[0]
+            taken = min(owner[1], remaining)
+            owners.append((owner[0], taken))
+            owner[1] -= taken
+            remaining -= taken
+            if owner[1] == 0:
+                self.pending_owners.pop(0)
+
+        self._commit(chunk, owners)
+
+    def _commit(self, elements, owners):
+        project_names = {name for name, _ in owners}
+        log(f"Inserting {len(elements)} elements of {len(project_names)} project(s) in one call")
+        self.call_count += 1
+
+        try:
+            adapters = self.base_elements.CreateElements(self.document, AllplanGeo.Matrix3D(),
+                                                         elements, [], None)
+            self.inserted_count += len(elements)
+        except Exception as e:
+            log(f"ERROR inserting elements: {str(e)}", "ERROR")
+            self._fail(project_names)
+            return
+
+        # One adapter per element, in element order
+        start = 0
+        for name, element_count in owners:
+            self.created.setdefault(name, []).extend(adapters[start:start + element_count])
+            start += element_count
+
+    def _fail(self, project_names):
+        """Mark projects failed, delete their committed and drop their pending elements"""
+        self.failed_projects.update(project_names)
+
+        adapters = AllplanElementAdapter.BaseElementAdapterList()
+        for name in project_names:
+            for adapter in self.created.pop(name, []):
+                adapters.append(adapter)
+        if adapters:
+            log(f"Removing {len(adapters)} elements of failed project(s) committed by earlier calls",
+                "WARNING")
+            try:
+                self.base_elements.DeleteElements(self.document, adapters)
+            except Exception as e:
+                log(f"ERROR deleting elements: {str(e)}", "ERROR")
+
+        kept, kept_owners = [], []
+        start = 0
+        for owner in self.pending_owners:
+            name, element_count = owner
+            if name not in self.failed_projects:
+                kept.extend(self.pending[start:start + element_count])
+                kept_owners.append(owner)
+            start += element_count
+        self.pending, self.pending_owners = kept, kept_owners
+
+def queue_project(inserter, project, layout=None, chunk_rows=None):
+    """
+    Generate a project with its placement applied to the coordinates and
+    queue it for batch insertion
+
+    Args:
+        inserter (BatchInserter): Target inserter
+        project (dict):           Project parameters
+        layout (ArrayLayout):     Precomputed layout, computed here if None
+        chunk_rows (int):         Queue row chunks of this many rows (see
+                                  iter_row_chunks), None for the default
+    """
+    if layout is None:
+        layout = compute_project_layout(project)
+
+    # Placement composed with each roof side matrix, applied to the coordinates
+    placement = project['placement']
+    transform = translation_matrix(placement['x'], placement['y'], placement['z'])
+
+    if chunk_rows:
+        for chunk in iter_row_chunks(project, chunk_rows, layout, transform):
+            inserter.add(project['name'], chunk.elements)
+    elif project.get('largeArray', False):
+        for batch in generate_solar_array_batches(project, layout=layout, transform=transform):
+            inserter.add(project['name'], batch)
+    else:
+        inserter.add(project['name'], generate_solar_array(project, layout, transform))
+
+def iter_project_layouts(projects, pool=None, window=1, cache=None):
+    """
+    Pair each project with the future of its layout, in config order
+
+    With a pool, up to `window` layouts are computed ahead while the caller
+    builds and inserts the current project, so a stream of projects is never
+    read much further than it is generated. Layouts found in the cache are
+    returned as completed futures and never reach the pool.
+
+    Args:
+        projects (iterable): (config position, project) pairs (list or stream)
+        pool (Executor):     Process pool, None to compute layouts on demand
+        window (int):        Maximum number of layouts submitted ahead
+        cache (LayoutCache): Layout cache to look up first, None for no cache
+
+    Yields:
+        tuple: (config position, project, Future or None)
+    """
+    pending = deque()
+    for index, project in projects:
+        layout = load_cached_layout(cache, project)
+        if layout is not None:
+            future = Future()
+            future.set_result(layout)
+        elif pool is not None:
+            future = pool.submit(compute_project_layout, project)
+        else:
+            future = None
+        pending.append((index, project, future))
+        if len(pending) >= window:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+def load_cached_layout(cache, project):
+    """
+    Look up the layout of a project in the cache
+
+    Args:
+        cache (LayoutCache): Layout cache, None for no cache
+        project (dict):      Project parameters
+
+    Returns:
+        ArrayLayout: Cached layout, None on a miss, without cache or for an
+        invalid project (reported when it is generated)
+    """
+    if cache is None:
+        return None
+    try:
+        return cache.load(project)
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+# ============================================================================
+# INCREMENTAL RUNS
+# ============================================================================
+
+def default_manifest_path(config_file):
+    """Manifest next to the config: solar_config.json -> solar_config.manifest.json"""
+    return os.path.splitext(config_file)[0] + MANIFEST_SUFFIX
+
+def default_stop_path(config_file):
+    """Stop file next to the config: solar_config.json -> solar_config.stop"""
+    return os.path.splitext(config_file)[0] + STOP_FILE_SUFFIX
+
+def load_manifest(manifest_file, doc):
+    """
+    Load the manifest of the last run into this document
+    
+    A manifest written for another document is not used: its elements are
+    not in this one, so every project counts as added.
+    
+    Args:
+        manifest_file (str): Path to the manifest
+        doc: DocumentAdapter instance
+    
+    Returns:
+        RunManifest: Manifest of the last run, empty for a first run
+    """
+    manifest = RunManifest.load(manifest_file)
+    document = doc.GetDocumentName()
+    if manifest.document not in (None, document):
+        log(f"Manifest {manifest_file} belongs to document '{manifest.document}', "
+            f"regenerating all projects into '{document}'", "WARNING")
+        manifest = RunManifest()
+    manifest.document = document
+    return manifest
+
+def select_changed_projects(projects, manifest, diff):
+    """
+    Yield the added and changed projects, skipping unchanged ones
+    
+    Args:
+        projects (iterable):    (config position, project) of the enabled projects
+        manifest (RunManifest): Last run
+        diff (ManifestDiff):    Receives the status of every project
+    
+    Yields:
+        tuple: (config position, project) of the projects to generate
+    """
+    for index, project in projects:
+        try:
+            status = manifest.status(project)
+        except (KeyError, TypeError, ValueError):
+            # Invalid project (streamed): generated, so validation reports it;
+            # still in the config, so its elements are not removed
+            name = project.get('name')
+            if isinstance(name, str):
+                diff.add(INVALID, name)
+            yield index, project
+            continue
+        diff.add(status, project['name'])
+        if status == UNCHANGED:
+            log(f"Unchanged, skipped: {project['name']}")
+        else:
+            yield index, project
+
+def record_project(doc, manifest, project, adapters):
+    """
+    Record a generated project and delete the elements of its last run
+    
+    Args:
+        doc: DocumentAdapter instance
+        manifest (RunManifest): Manifest to update
+        project (dict): Project parameters
+        adapters (list): Adapters of the new elements, None if unknown
+    """
+    ids = element_ids(adapters) if adapters is not None else None
+    previous = manifest.record(project, ids)
+    if previous is None:
+        return
+    if previous['elements'] is None:
+        log(f"Elements of the last run of {project['name']} are unknown, "
+            f"they stay in the document", "WARNING")
+    else:
+        delete_from_allplan(doc, previous['elements'])
+
+def delete_removed_projects(doc, manifest, diff):
+    """
+    Delete the elements of projects no longer in the config
+    
+    Args:
+        doc: DocumentAdapter instance
+        manifest (RunManifest): Manifest to update
+        diff (ManifestDiff): Statuses of the config projects, receives the removed ones
+    
+    Returns:
+        int: Number of projects whose elements could not be deleted
+    """
+    seen = diff.config_names
+    diff.removed = [name for name in manifest.projects if name not in seen]
+    
+    failed = 0
+    for name in diff.removed:
+        log(f"Removing project: {name}")
+        entry = manifest.projects[name]
+        if entry['elements'] is None:
+            log(f"Elements of {name} are unknown, they stay in the document", "WARNING")
+        elif not delete_from_allplan(doc, entry['elements']):
+            failed += 1
+            continue
+        manifest.forget(name)
+    return failed
+
+# ============================================================================
+# BILL OF MATERIALS
+# ============================================================================
+
+def export_bom(projects, bom_file, stream=False):
+    """
+    Write the bill of materials of the projects, without geometry or Allplan
+
+    Args:
+        projects (iterable):  (config position, project) of the enabled projects
+        bom_file (str):       .csv or .json output file
+        stream (bool):        Validate each project as it is read
+
+    Returns:
+        int: Exit code, 0 on success
+    """
+    log_section("BILL OF MATERIALS")
+
+    totals = {'modules': 0, 'weight': 0.0}
+
+    def project_boms():
+        for index, project in projects:
+            if stream:
+                validate_project(project, index)
+            bom = project_bom(project)
+            totals['modules'] += bom.module_count
+            totals['weight'] += bom.total_weight
+            yield bom
+
+    try:
+        count = write_bom(project_boms(), bom_file)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        log(f"BOM export failed: {str(e)}", "ERROR")
+        return 1
+
+    log(f"{count} projects, {totals['modules']} modules, {totals['weight']:.0f} kg "
+        f"written to {bom_file}", "SUCCESS")
+    return 0
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+
+    Args:
+        argv (list): Arguments without program name, sys.argv[1:] if None
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate solar PV arrays in Allplan from a JSON configuration")
+    parser.add_argument("config_file", nargs="?", default=DEFAULT_CONFIG,
+                        help=f"JSON configuration file (default: {DEFAULT_CONFIG})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes computing project layouts in parallel "
+                             "(default: 1, no pool)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Insert all projects together in one CreateElements call, "
+                             "with each placement applied to the geometry")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="With --batch: maximum number of elements per CreateElements call")
+    parser.add_argument("--chunk-rows", type=int, default=None,
+                        help="Build and insert every project this many module rows at a time, "
+                             "with progress and cancellation between chunks (default: "
+                             f"about {LARGE_ARRAY_BATCH_MODULES} modules for largeArray projects, "
+                             "whole projects otherwise)")
+    parser.add_argument("--stop-file", default=None,
+                        help="Creating this file stops the run after the current chunk, like "
+                             f"Ctrl+C (default: config file name with {STOP_FILE_SUFFIX})")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read, validate and generate projects one at a time instead of "
+                             "loading the whole config first (.json or .jsonl)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Compute every layout, without reading or writing the layout cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Layout cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE_MB,
+                        help="Layout cache size limit in MB, least recently used layouts are "
+                             f"deleted above it (default: {DEFAULT_CACHE_SIZE_MB})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only generate projects added or changed since the last run, "
+                             "replace changed ones and delete removed ones (see --manifest)")
+    parser.add_argument("--manifest", default=None,
+                        help="Run manifest of --incremental "
+                             f"(default: config file name with {MANIFEST_SUFFIX})")
+    parser.add_argument("--bom", default=None, metavar="FILE",
+                        help="Only write the bill of materials of the enabled projects "
+                             "to FILE (.csv or .json), without connecting to Allplan")
+
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.chunk_size is not None and args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+    if args.chunk_rows is not None and args.chunk_rows < 1:
+        parser.error("--chunk-rows must be >= 1")
+    if args.cache_size < 1:
+        parser.error("--cache-size must be >= 1")
+
+    return args
+
+def main(argv=None):
     """Main execution function"""
     
     log_section("SOLAR CARPORT ARRAY - EXTERNAL AUTOMATION")
     
-    # Load configuration
-    config_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CONFIG
+    args = parse_args(argv)
+    config_file = args.config_file
     
     try:
-        config = load_config(config_file)
-        validate_config(config)
+        if args.stream:
+            # Projects are validated one by one as they are read, a name used
+            # twice stops the run (see unique_projects)
+            log(f"Streaming configuration from: {config_file}")
+            projects = enabled_projects(unique_projects(iter_projects(config_file)))
+            total = None
+        else:
+            config = load_config(config_file)
+            validate_config(config)
+            projects = list(enabled_projects(config['projects']))
+            total = len(projects)
     except Exception as e:
         log(f"Configuration error: {str(e)}", "ERROR")
         return 1
     
+    # Quantities only: computed from the parameters, no geometry, no document
+    if args.bom:
+        return export_bom(projects, args.bom, args.stream)
+    
     # Connect to Allplan
     doc = connect_to_allplan()
     if not doc:
         return 1
     
+    # Incremental run: only projects added or changed since the last run
+    manifest = None
+    diff = ManifestDiff()
+    if args.incremental:
+        manifest_file = args.manifest or default_manifest_path(config_file)
+        try:
+            manifest = load_manifest(manifest_file, doc)
+        except (OSError, ValueError) as e:
+            log(f"Manifest error: {str(e)}", "ERROR")
+            return 1
+        log(f"Incremental run, manifest: {manifest_file}")
+        projects = select_changed_projects(projects, manifest, diff)
+        if total is not None:
+            projects = list(projects)
+            total = len(projects)
+    
     # Process each project
-    projects = [p for p in config['projects'] if p.get('enabled', True)]
-    log(f"Processing {len(projects)} enabled projects")
+    if total is not None:
+        log(f"Processing {total} {'added or changed' if manifest else 'enabled'} projects")
     
+    processed = 0
     success_count = 0
     fail_count = 0
+    config_complete = True
+    cancelled = False
     
-    for idx, project in enumerate(projects, 1):
-        log_section(f"PROJECT {idx}/{len(projects)}: {project['name']}")
-        
+    # Ctrl+C or the stop file end the run between two chunks (between two
+    # projects with --batch), a stop file left by an earlier run is removed
+    cancel = CancelToken(args.stop_file or default_stop_path(config_file))
+    if cancel.clear_stop_file():
+        log(f"Removed stop file of an earlier run: {cancel.stop_file}", "WARNING")
+    log(f"Ctrl+C or creating {cancel.stop_file} stops the run after the current chunk")
+    
+    # In batch mode projects are only queued here and committed after the loop
+    inserter = BatchInserter(doc, args.chunk_size) if args.batch else None
+    queued = []
+    
+    # Unchanged projects load their layout from the cache instead of computing it
+    cache = None if args.no_cache else LayoutCache(args.cache_dir, args.cache_size * 2 ** 20)
+    
+    # Layouts are pure computations: with --workers they run in a process
+    # pool while the main process builds and inserts the elements (the only
+    # part that touches the document) one project at a time, in config order.
+    if args.workers > 1:
+        log(f"Computing layouts with {args.workers} worker processes")
+        pool = ProcessPoolExecutor(max_workers=args.workers, initializer=ignore_interrupts)
+        window = args.workers * LAYOUT_WINDOW_PER_WORKER
+    else:
+        pool = nullcontext()
+        window = 1
+
+    with pool as executor, cancel.on_interrupt():
+        project_layouts = iter_project_layouts(projects, executor, window, cache)
         try:
-            # Generate geometry
-            elements = generate_solar_array(project)
-            
-            # Insert into Allplan
-            if insert_into_allplan(doc, elements, project['placement']):
-                log(f"PROJECT COMPLETED: {project['name']}", "SUCCESS")
-                success_count += 1
-            else:
-                log(f"PROJECT FAILED: {project['name']} insertion failed", "ERROR")
-                fail_count += 1
+            for idx, (index, project, layout_future) in enumerate(project_layouts, 1):
+                if cancel.cancelled:
+                    cancelled = True
+                    break
+                processed = idx
+                name = project.get('name', f"#{idx}")
+                log_section(f"PROJECT {idx}/{total}: {name}" if total else f"PROJECT {idx}: {name}")
                 
-        except Exception as e:
-            log(f"PROJECT FAILED: {project['name']} - {str(e)}", "ERROR")
+                try:
+                    if args.stream:
+                        validate_project(project, index)
+                    
+                    if layout_future is not None:
+                        layout = layout_future.result()
+                    else:
+                        layout = compute_project_layout(project)
+                    if cache is not None:
+                        cache.store(project, layout)
+                    
+                    if inserter is not None:
+                        queue_project(inserter, project, layout, args.chunk_rows)
+                        queued.append(project)
+                        continue
+                    
+                    # Adapters of the new elements, kept for the manifest
+                    created = [] if manifest is not None else None
+                    
+                    chunk_rows = args.chunk_rows
+                    if chunk_rows is None and project.get('largeArray', False):
+                        chunk_rows = large_array_chunk_rows(layout)
+                    if chunk_rows:
+                        # Generate and insert row chunk by row chunk
+                        inserted = insert_row_chunks(doc, project, layout, chunk_rows, created, cancel)
+                    else:
+                        # Generate geometry
+                        elements = generate_solar_array(project, layout)
+                        
+                        # Insert into Allplan
+                        inserted = insert_into_allplan(doc, elements, project['placement'], created)
+                    
+                    if inserted:
+                        if manifest is not None:
+                            record_project(doc, manifest, project, created)
+                        log(f"PROJECT COMPLETED: {project['name']}", "SUCCESS")
+                        success_count += 1
+                    else:
+                        log(f"PROJECT FAILED: {project['name']} insertion failed", "ERROR")
+                        fail_count += 1
+                        
+                except GenerationCancelled as e:
+                    log(f"PROJECT CANCELLED: {name} - {str(e)}", "WARNING")
+                    processed -= 1
+                    cancelled = True
+                    break
+                except Exception as e:
+                    log(f"PROJECT FAILED: {name} - {str(e)}", "ERROR")
+                    fail_count += 1
+        except ValueError as e:
+            # Only a streamed config can turn out invalid halfway through
+            log(f"Configuration error after {processed} projects: {str(e)}", "ERROR")
+            fail_count += 1
+            config_complete = False
+    
+    # Cancelled: projects not reached are neither generated nor deleted
+    if cancelled:
+        log(f"Run cancelled ({cancel.reason}) after {processed} project(s)", "WARNING")
+        config_complete = False
+    
+    if inserter is not None:
+        log_section("BATCH INSERTION")
+        inserter.flush()
+        log(f"{inserter.inserted_count} elements inserted in {inserter.call_count} call(s)")
+        
+        for project in queued:
+            name = project['name']
+            if name in inserter.failed_projects:
+                log(f"PROJECT FAILED: {name} insertion failed", "ERROR")
+                fail_count += 1
+            else:
+                if manifest is not None:
+                    record_project(doc, manifest, project, inserter.created.get(name, []))
+                log(f"PROJECT COMPLETED: {name}", "SUCCESS")
+                success_count += 1
+    
+    if manifest is not None:
+        if config_complete:
+            log_section("REMOVED PROJECTS")
+            fail_count += delete_removed_projects(doc, manifest, diff)
+        else:
+            log("Config not read to the end, projects missing from it are kept", "WARNING")
+        try:
+            manifest.save(manifest_file)
+            log(f"Manifest saved: {manifest_file}")
+        except OSError as e:
+            log(f"ERROR saving manifest: {str(e)}", "ERROR")
             fail_count += 1
     
     # Summary
     log_section("GENERATION SUMMARY")
-    log(f"Total projects: {len(projects)}")
+    log(f"Total projects: {processed}")
     log(f"Successful: {success_count}")
     log(f"Failed: {fail_count}")
+    if manifest is not None:
+        log(f"Changes since last run: {diff}")
+    if cache is not None:
+        log(f"Layout cache: {cache.hits} loaded, {cache.stored} stored, "
+            f"{cache.evicted} evicted ({cache.cache_dir})")
     
+    if cancelled:
+        log("Run cancelled before all projects were generated", "WARNING")
+        return 130
     if fail_count == 0:
         log("All projects completed successfully!", "SUCCESS")
         return 0
@@ -343,10 +1309,12 @@ def main():
 if __name__ == "__main__":
     try:
         exit_code = main()
-        sys.exit(exit_code)
     except KeyboardInterrupt:
         log("Execution interrupted by user", "WARNING")
-        sys.exit(130)
+        exit_code = 130
     except Exception as e:
         log(f"Unexpected error: {str(e)}", "ERROR")
-        sys.exit(1)
+        exit_code = 1
+    finally:
+        flush_logs()
+    sys.exit(exit_code)
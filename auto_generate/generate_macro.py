@@ -1,31 +1,132 @@
 """
 Solar Carport Array - Allplan Macro Generator
 Read JSON config and generate solar arrays in Allplan
+
+Usage: generate_macro.py [config_file] [chunk_rows]
+
+Each project is built and inserted chunk_rows module rows at a time (default
+CHUNK_ROWS) with progress output. Creating <config>.stop next to the config
+file (or Ctrl+C) stops the run after the current chunk; the elements of the
+unfinished project are deleted again.
 """
 
-import json
+import os
 import sys
 from datetime import datetime
 
-# Allplan Python API - available when running as macro
+# Shared solar helpers (SolarCommon package next to the PythonParts scripts)
+PYTHONPARTS_SCRIPTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        "..", "PythonPartsScripts")
+if PYTHONPARTS_SCRIPTS_PATH not in sys.path:
+    sys.path.append(PYTHONPARTS_SCRIPTS_PATH)
+
+from SolarCommon.backend import install_backend, ALLPLAN
+
+# Allplan Python API - available when running as macro (SOLAR_BACKEND=headless for the stand-ins)
+install_backend(default=ALLPLAN)
+
 import NemAll_Python_Geometry as AllplanGeo
 import NemAll_Python_BaseElements as AllplanBaseElements
 import NemAll_Python_BasisElements as AllplanBasisElements
 import NemAll_Python_IFW_ElementAdapter as AllplanElementAdapter
 
-# Get config file from command line argument
+from SolarCommon.property_pool import get_common_properties
+from SolarCommon.config_stream import iter_projects
+from SolarCommon.progress import (RowChunk, ProgressReporter, CancelToken, GenerationCancelled,
+                                  consume_chunks)
+
+FRAME_THICKNESS = 30  # mm
+CHUNK_ROWS = 20       # module rows built and inserted per CreateElements call
+
+
+def iter_row_chunks(project, chunk_rows):
+    """Support plate, then frames and PV layers of chunk_rows module rows per chunk"""
+    rows = project['modules']['rows']
+    cols = project['modules']['cols']
+    module_w = project['modules']['width']
+    module_h = project['modules']['height']
+    module_t = project['modules']['thickness']
+    row_gap = project['gaps']['row']
+    col_gap = project['gaps']['col']
+    plate_t = project['plate']['thickness']
+    plate_off = project['plate']['offset']
+    colors = project.get('colors', {'plate': 7, 'frame': 4, 'pv': 21})
+    
+    # === CREATE SUPPORT PLATE (GREY) ===
+    plate_width = cols * module_w + (cols - 1) * col_gap
+    plate_height = rows * module_h + (rows - 1) * row_gap
+    
+    plate_props = get_common_properties(colors['plate'])  # Grey
+    
+    plate = AllplanGeo.Polyhedron3D.CreateCuboid(
+        AllplanGeo.Point3D(0, 0, plate_off),
+        AllplanGeo.Point3D(plate_width, plate_height, plate_off + plate_t)
+    )
+    print(f"      + Support plate: {plate_width}x{plate_height}x{plate_t} mm")
+    yield RowChunk([AllplanBasisElements.ModelElement3D(plate_props, plate)], 0)
+    
+    # === CREATE SOLAR MODULES ===
+    frame_props = get_common_properties(colors['frame'])  # Blue
+    pv_props = get_common_properties(colors['pv'])  # Dark Blue
+    inset = FRAME_THICKNESS / 2
+    z = plate_off + plate_t
+    
+    for first_row in range(0, rows, chunk_rows):
+        last_row = min(first_row + chunk_rows, rows)
+        elements = []
+        for row in range(first_row, last_row):
+            for col in range(cols):
+                x = col * (module_w + col_gap)
+                y = row * (module_h + row_gap)
+                
+                # FRAME (BLUE)
+                frame = AllplanGeo.Polyhedron3D.CreateCuboid(
+                    AllplanGeo.Point3D(x, y, z),
+                    AllplanGeo.Point3D(x + module_w, y + module_h, z + FRAME_THICKNESS)
+                )
+                elements.append(AllplanBasisElements.ModelElement3D(frame_props, frame))
+                
+                # PV LAYER (DARK BLUE)
+                pv = AllplanGeo.Polyhedron3D.CreateCuboid(
+                    AllplanGeo.Point3D(x + inset, y + inset, z + FRAME_THICKNESS),
+                    AllplanGeo.Point3D(
+                        x + module_w - inset,
+                        y + module_h - inset,
+                        z + FRAME_THICKNESS + (module_t - FRAME_THICKNESS)
+                    )
+                )
+                elements.append(AllplanBasisElements.ModelElement3D(pv_props, pv))
+        
+        yield RowChunk(elements, last_row - first_row)
+
+
+def delete_elements(doc, created):
+    """Delete the elements of an unfinished project"""
+    adapters = AllplanElementAdapter.BaseElementAdapterList()
+    for adapter in created:
+        adapters.append(adapter)
+    if adapters:
+        AllplanBaseElements.DeleteElements(doc, adapters)
+
+
+# Get config file and chunk size from command line arguments
 config_file = sys.argv[1] if len(sys.argv) > 1 else "solar_config.json"
+chunk_rows = max(1, int(sys.argv[2])) if len(sys.argv) > 2 else CHUNK_ROWS
+
+# The stop file cancels between two chunks, one left by an earlier run is removed
+cancel = CancelToken(os.path.splitext(config_file)[0] + ".stop")
+cancel.clear_stop_file()
 
 print("\n" + "=" * 50)
 print("  Solar Carport Array Generator")
 print("=" * 50 + "\n")
 
-print(f"Config file: {config_file}\n")
+print(f"Config file: {config_file}")
+print(f"Chunks of {chunk_rows} rows, create {cancel.stop_file} to stop\n")
 
 try:
-    # Load configuration from JSON
-    with open(config_file) as f:
-        config = json.load(f)
+    # Projects are read one at a time (.json or .jsonl), not loaded up front
+    projects = iter_projects(config_file)
     
     # Get active Allplan document
     doc = AllplanElementAdapter.DocumentAdapter.GetActiveDocument()
@@ -36,108 +137,60 @@ try:
     
     print(f"Connected to: {doc.GetDocumentName()}\n")
     
-    # Process each project in configuration
-    total_projects = len(config.get('projects', []))
-    print(f"Found {total_projects} project(s)\n")
-    
-    for project_idx, project in enumerate(config.get('projects', []), 1):
-        # Skip disabled projects
-        if not project.get('enabled', True):
-            print(f"[{project_idx}] SKIPPED: {project['name']} (disabled)\n")
-            continue
-        
-        try:
-            print(f"[{project_idx}] Generating: {project['name']}")
-            
-            # Extract parameters from JSON
-            rows = project['modules']['rows']
-            cols = project['modules']['cols']
-            module_w = project['modules']['width']
-            module_h = project['modules']['height']
-            module_t = project['modules']['thickness']
-            row_gap = project['gaps']['row']
-            col_gap = project['gaps']['col']
-            plate_t = project['plate']['thickness']
-            plate_off = project['plate']['offset']
-            colors = project.get('colors', {'plate': 7, 'frame': 4, 'pv': 21})
-            
-            print(f"      Config: {rows}x{cols} modules, {plate_t}mm plate")
-            
-            elements = []
-            FRAME_THICKNESS = 30  # mm
-            
-            # === CREATE SUPPORT PLATE (GREY) ===
-            plate_width = cols * module_w + (cols - 1) * col_gap
-            plate_height = rows * module_h + (rows - 1) * row_gap
-            
-            plate_props = AllplanBaseElements.CommonProperties()
-            plate_props.Color = colors['plate']  # Grey
-            
-            plate = AllplanGeo.Polyhedron3D.CreateCuboid(
-                AllplanGeo.Point3D(0, 0, plate_off),
-                AllplanGeo.Point3D(plate_width, plate_height, plate_off + plate_t)
-            )
-            elements.append(AllplanBasisElements.ModelElement3D(plate_props, plate))
-            
-            print(f"      + Support plate: {plate_width}x{plate_height}x{plate_t} mm")
-            
-            # === CREATE SOLAR MODULES ===
-            module_count = 0
-            for row in range(rows):
-                for col in range(cols):
-                    x = col * (module_w + col_gap)
-                    y = row * (module_h + row_gap)
-                    z = plate_off + plate_t
-                    
-                    # FRAME (BLUE)
-                    frame_props = AllplanBaseElements.CommonProperties()
-                    frame_props.Color = colors['frame']  # Blue
-                    
-                    frame = AllplanGeo.Polyhedron3D.CreateCuboid(
-                        AllplanGeo.Point3D(x, y, z),
-                        AllplanGeo.Point3D(x + module_w, y + module_h, z + FRAME_THICKNESS)
-                    )
-                    elements.append(AllplanBasisElements.ModelElement3D(frame_props, frame))
-                    
-                    # PV LAYER (DARK BLUE)
-                    pv_props = AllplanBaseElements.CommonProperties()
-                    pv_props.Color = colors['pv']  # Dark Blue
-                    
-                    inset = FRAME_THICKNESS / 2
-                    pv = AllplanGeo.Polyhedron3D.CreateCuboid(
-                        AllplanGeo.Point3D(x + inset, y + inset, z + FRAME_THICKNESS),
-                        AllplanGeo.Point3D(
-                            x + module_w - inset,
-                            y + module_h - inset,
-                            z + FRAME_THICKNESS + (module_t - FRAME_THICKNESS)
-                        )
-                    )
-                    elements.append(AllplanBasisElements.ModelElement3D(pv_props, pv))
-                    
-                    module_count += 1
-            
-            print(f"      + {module_count} solar modules")
-            print(f"      + Total elements: {len(elements)}")
-            
-            # === INSERT INTO DOCUMENT ===
-            placement = project['placement']
-            transform = AllplanGeo.Matrix3D()
-            transform.SetTranslation(AllplanGeo.Vector3D(
-                placement['x'],
-                placement['y'],
-                placement['z']
-            ))
+    # Process each project as soon as it has been read
+    with cancel.on_interrupt():
+        for project_idx, project in enumerate(projects, 1):
+            if cancel.cancelled:
+                break
             
-            AllplanBaseElements.CreateElements(doc, transform, elements, [], None)
+            # Skip disabled projects
+            if not project.get('enabled', True):
+                print(f"[{project_idx}] SKIPPED: {project['name']} (disabled)\n")
+                continue
             
-            print(f"      ✓ SUCCESS\n")
+            created = []
+            try:
+                print(f"[{project_idx}] Generating: {project['name']}")
+                
+                rows = project['modules']['rows']
+                cols = project['modules']['cols']
+                print(f"      Config: {rows}x{cols} modules, {project['plate']['thickness']}mm plate")
+                
+                # === INSERT INTO DOCUMENT, CHUNK BY CHUNK ===
+                placement = project['placement']
+                transform = AllplanGeo.Matrix3D()
+                transform.SetTranslation(AllplanGeo.Vector3D(
+                    placement['x'],
+                    placement['y'],
+                    placement['z']
+                ))
+                
+                def insert(elements):
+                    created.extend(AllplanBaseElements.CreateElements(doc, transform, elements, [], None))
+                    return True
+                
+                progress = ProgressReporter(rows, lambda message: print(f"      {message}"))
+                consume_chunks(iter_row_chunks(project, chunk_rows), insert, progress, cancel)
+                
+                print(f"      + {rows * cols} solar modules")
+                print(f"      + Total elements: {progress.elements}")
+                print(f"      ✓ SUCCESS\n")
+                
+            except GenerationCancelled as e:
+                print(f"      ✗ CANCELLED: {str(e)}, removing {len(created)} inserted elements\n")
+                delete_elements(doc, created)
+                break
             
-        except Exception as e:
-            print(f"      ✗ ERROR: {str(e)}\n")
-            import traceback
-            traceback.print_exc()
-            print()
+            except Exception as e:
+                print(f"      ✗ ERROR: {str(e)}\n")
+                import traceback
+                traceback.print_exc()
+                print()
+                delete_elements(doc, created)
     
+    if cancel.cancelled:
+        print(f"Cancelled: {cancel.reason}\n")
+    print(f"Processed {projects.project_count} project(s)\n")
     print("=" * 50)
     print("  Generation Complete!")
     print("=" * 50 + "\n")
@@ -146,7 +199,8 @@ except FileNotFoundError:
     print(f"ERROR: Config file not found: {config_file}\n")
     sys.exit(1)
     
-except json.JSONDecodeError as e:
+except ValueError as e:
+    # Raised by the config stream, possibly after earlier projects were generated
     print(f"ERROR: Invalid JSON in config file: {str(e)}\n")
     sys.exit(1)
     
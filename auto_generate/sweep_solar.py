@@ -0,0 +1,252 @@
+"""
+Solar Carport Sweep - Design-space runner for quotes
+============================================================================
+Evaluates every combination of panel model, spacing, orientation and roof
+angle of a sweep spec on one site (see SolarCommon/sweep.py), in a process
+pool and without Allplan, and writes a ranked results table.
+
+Results are appended to a checkpoint file (JSON Lines) as they come in; an
+interrupted sweep started again with the same checkpoint only evaluates the
+configurations that are missing, and so does an extended spec.
+
+Usage:
+    python sweep_solar.py sweep.json
+    python sweep_solar.py sweep.json --workers 8 --output ranking.csv
+============================================================================
+"""
+
+import sys
+import os
+import argparse
+import csv
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Shared solar helpers (SolarCommon package next to the PythonParts scripts)
+PYTHONPARTS_SCRIPTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        "..", "PythonPartsScripts")
+if PYTHONPARTS_SCRIPTS_PATH not in sys.path:
+    sys.path.append(PYTHONPARTS_SCRIPTS_PATH)
+
+from SolarCommon.sweep import (expand_configs, config_key, evaluate_configs, rank_results,
+                               RESULT_FIELDS)
+from SolarCommon.logger import get_logger, flush_logs
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LOG_FILE = "sweep_log.txt"
+CHECKPOINT_SUFFIX = ".sweep.jsonl"
+RANKING_SUFFIX = ".ranking.csv"
+
+DEFAULT_CHUNK_SIZE = 64  # configurations per pool task
+DEFAULT_TOP = 10         # best configurations shown in the log
+
+# ============================================================================
+# LOGGING UTILITIES
+# ============================================================================
+
+logger = get_logger("sweep_solar", LOG_FILE, console=True)
+
+def log(msg, level="INFO"):
+    """
+    Print message and buffer it for the log file
+
+    The buffer is written synchronously, by the logging call that fills it,
+    by an ERROR record or by flush_logs() (see SolarCommon.logger).
+    """
+    logger.log(logging.getLevelName(level), msg)
+
+def log_section(title):
+    """Log a section header"""
+    separator = "=" * 80
+    log(separator)
+    log(f"  {title}")
+    log(separator)
+
+# ============================================================================
+# CHECKPOINT
+# ============================================================================
+
+def default_path(spec_file, suffix):
+    """File next to the spec: sweep.json -> sweep.sweep.jsonl"""
+    return os.path.splitext(spec_file)[0] + suffix
+
+def load_checkpoint(checkpoint_file):
+    """
+    Read the results of earlier runs
+
+    A line cut off by an interruption is ignored, its configuration is
+    evaluated again.
+
+    Args:
+        checkpoint_file (str): JSON Lines file, may not exist yet
+
+    Returns:
+        dict: key -> result
+    """
+    results = {}
+    if not os.path.exists(checkpoint_file):
+        return results
+    with open(checkpoint_file, 'r') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+                results[result['key']] = result
+            except (ValueError, KeyError, TypeError):
+                continue
+    return results
+
+def chunks(items, size):
+    """Consecutive slices of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def run_sweep(configs, checkpoint_file, workers, chunk_size):
+    """
+    Evaluate configurations and append each result to the checkpoint
+
+    Args:
+        configs (list):         Configurations still to evaluate
+        checkpoint_file (str):  JSON Lines file the results are appended to
+        workers (int):          Processes, 1 evaluates in this process
+        chunk_size (int):       Configurations per task
+
+    Returns:
+        list: New results
+    """
+    results = []
+    with open(checkpoint_file, 'a+') as checkpoint:
+        # End a line cut off by an interruption, so new results start on their own line
+        if checkpoint.tell():
+            checkpoint.seek(checkpoint.tell() - 1)
+            if checkpoint.read(1) != "\n":
+                checkpoint.write("\n")
+
+        def store(chunk_results):
+            for result in chunk_results:
+                checkpoint.write(json.dumps(result) + "\n")
+            checkpoint.flush()
+            results.extend(chunk_results)
+            log(f"  {len(results)}/{len(configs)} configurations evaluated")
+
+        if workers == 1:
+            for chunk in chunks(configs, chunk_size):
+                store(evaluate_configs(chunk))
+            return results
+
+        # Tasks finish in any order; each result is written as soon as its chunk is done
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(evaluate_configs, chunk) for chunk in chunks(configs, chunk_size)]
+            try:
+                for future in as_completed(futures):
+                    store(future.result())
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    return results
+
+def write_ranking(ranked, ranking_file):
+    """Write the ranked results as CSV"""
+    with open(ranking_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(ranked)
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments
+
+    Args:
+        argv (list): Arguments without program name, sys.argv[1:] if None
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Evaluate and rank carport configurations without Allplan")
+    parser.add_argument("spec_file", help="JSON sweep spec")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of processes evaluating configurations "
+                             "(default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Configurations per pool task (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Results of earlier runs, appended to as results come in "
+                             f"(default: spec file name with {CHECKPOINT_SUFFIX})")
+    parser.add_argument("--output", default=None,
+                        help=f"Ranked CSV (default: spec file name with {RANKING_SUFFIX})")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help=f"Best configurations shown in the log (default: {DEFAULT_TOP})")
+
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+
+    return args
+
+def main(argv=None):
+    """Main execution function"""
+
+    log_section("SOLAR CARPORT SWEEP")
+
+    args = parse_args(argv)
+    checkpoint_file = args.checkpoint or default_path(args.spec_file, CHECKPOINT_SUFFIX)
+    ranking_file = args.output or default_path(args.spec_file, RANKING_SUFFIX)
+
+    try:
+        with open(args.spec_file, 'r', encoding='utf-8') as f:
+            configs = list(expand_configs(json.load(f)))
+    except (OSError, ValueError) as e:
+        log(f"Spec error: {str(e)}", "ERROR")
+        return 1
+
+    # Configurations evaluated by an earlier run are taken from the checkpoint
+    done = load_checkpoint(checkpoint_file)
+    keys = [config_key(config) for config in configs]
+    todo = [config for config, key in zip(configs, keys) if key not in done]
+    log(f"{len(configs)} configurations, {len(configs) - len(todo)} already in {checkpoint_file}")
+
+    if todo:
+        workers = min(args.workers, -(-len(todo) // args.chunk_size))
+        log(f"Evaluating {len(todo)} configurations with {workers} worker process(es)")
+        for result in run_sweep(todo, checkpoint_file, workers, args.chunk_size):
+            done[result['key']] = result
+
+    # Rank only the configurations of this spec
+    ranked = rank_results(done[key] for key in dict.fromkeys(keys))
+    try:
+        write_ranking(ranked, ranking_file)
+    except OSError as e:
+        log(f"ERROR writing ranking: {str(e)}", "ERROR")
+        return 1
+
+    log_section("BEST CONFIGURATIONS")
+    for result in ranked[:args.top]:
+        log(f"{result['rank']:>4}. {result['panel']}, {result['orientation']}, "
+            f"spacing {result['spacing']} mm, roof {result['roof_angle']} deg: "
+            f"{result['modules']} modules, {result['kwp']} kWp, {result['weight_kg']} kg")
+    log(f"Ranking of {len(ranked)} configurations written to {ranking_file}", "SUCCESS")
+    return 0
+
+if __name__ == "__main__":
+    try:
+        exit_code = main()
+    except KeyboardInterrupt:
+        log("Sweep interrupted, run it again with the same checkpoint to resume", "WARNING")
+        exit_code = 130
+    except Exception as e:
+        log(f"Unexpected error: {str(e)}", "ERROR")
+        exit_code = 1
+    finally:
+        flush_logs()
+    sys.exit(exit_code)
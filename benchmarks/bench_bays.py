@@ -0,0 +1,144 @@
+"""
+Carport Bays Benchmark
+============================================================================
+A carport row of identical bays built three ways with auto_generate_solar.py
+on the headless backend: one project per bay (each with its own layout),
+one project with a "bays" block (one layout stamped by translation), and the
+same with a few overridden bay types. Reports time, element count and the
+memory held by the layouts. The SolarCarportRoof PythonPart is timed with
+BayCount against one call per bay.
+
+Usage:
+    python bench_bays.py [--bays N] [--rows R] [--cols C]
+============================================================================
+"""
+
+import argparse
+import copy
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "PythonPartsScripts"))
+sys.path.insert(0, os.path.join(ROOT, "auto_generate"))
+os.environ.setdefault("SOLAR_LOG_LEVEL", "WARNING")
+os.environ.setdefault("SOLAR_BACKEND", "headless")
+
+from SolarCommon.backend import make_build_element
+from SolarCommon.bays import bay_types
+from SolarCommon.layout import compute_project_layout
+import auto_generate_solar as generator
+
+DEFAULT_BAYS = 40
+DEFAULT_ROWS = 10
+DEFAULT_COLS = 10
+REPEATS = 5
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def make_project(rows, cols, bays=None):
+    project = {
+        'name': "Row",
+        'largeArray': True,
+        'modules': {'rows': rows, 'cols': cols, 'width': 1134, 'height': 1722, 'thickness': 35},
+        'gaps': {'row': 20, 'col': 20},
+        'plate': {'thickness': 50, 'offset': 0},
+        'roof': {'createSecondSide': False, 'angle': 10, 'ridgeHeight': 500},
+        'placement': {'x': 0, 'y': 0, 'z': 0},
+    }
+    if bays:
+        project['bays'] = bays
+    return project
+
+
+def best_of(function):
+    best, result = None, None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def layout_bytes(layouts):
+    return sum(layout.plate.nbytes + layout.frames.nbytes + layout.pvs.nbytes for layout in layouts)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Bay stamping against one project per bay")
+    parser.add_argument("--bays", type=int, default=DEFAULT_BAYS)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--cols", type=int, default=DEFAULT_COLS)
+    args = parser.parse_args()
+
+    generator.logger.disabled = True
+    single = make_project(args.rows, args.cols)
+    pitch = args.cols * 1154 + 500
+    bays = {'count': args.bays, 'pitch': pitch}
+    overridden = dict(bays, overrides=[{'bay': 0, 'modules': {'cols': max(1, args.cols // 2)}},
+                                       {'bay': args.bays - 1, 'modules': {'cols': max(1, args.cols // 2)}},
+                                       {'bay': args.bays // 2, 'modules': {'rows': max(1, args.rows - 2)}}])
+
+    def per_bay_projects():
+        elements, layouts = [], []
+        for bay in range(args.bays):
+            project = copy.deepcopy(single)
+            project['placement']['x'] = bay * pitch
+            layout = compute_project_layout(project)
+            layouts.append(layout)
+            inserter = generator.BatchInserter(None)
+            generator.queue_project(inserter, project, layout)
+            elements.extend(inserter.pending)
+        return elements, layouts
+
+    def stamped(bays_block):
+        project = make_project(args.rows, args.cols, bays_block)
+        layout = compute_project_layout(project)
+        layouts = [layout] + [compute_project_layout(bay_type.params)
+                              for bay_type in bay_types(project) if bay_type.params is not project]
+        inserter = generator.BatchInserter(None)
+        generator.queue_project(inserter, project, layout)
+        return inserter.pending, layouts
+
+    modules = args.bays * args.rows * args.cols
+    print(f"{args.bays} bays of {args.rows}x{args.cols} modules ({modules:,} modules)")
+    print(f"{'case':<34} {'time (s)':>9} {'elements':>9} {'layouts':>8} {'layout KB':>10}")
+
+    def report(name, seconds, result):
+        elements, layouts = result
+        print(f"{name:<34} {seconds:>9.3f} {len(elements):>9} {len(layouts):>8} "
+              f"{layout_bytes(layouts) / 1024:>10.1f}")
+
+    seconds, result = best_of(lambda: stamped(None))
+    report("single bay", seconds, result)
+    report("one project per bay", *best_of(per_bay_projects))
+    report("bays block, 1 type", *best_of(lambda: stamped(bays)))
+    report("bays block, 3 overrides (3 types)", *best_of(lambda: stamped(overridden)))
+
+    # SolarCarportRoof PythonPart, both roof sides
+    path = os.path.join(ROOT, "PythonPartsScripts", "SolarModuleArray", "SolarModuleArray.py")
+    spec = importlib.util.spec_from_file_location("SolarModuleArray", path)
+    roof = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(roof)
+    params = dict(NumRows=args.rows, NumCols=args.cols, ModuleWidth=1134, ModuleHeight=1722,
+                  ModuleThickness=35, RowGap=20, ColGap=20, PlateThickness=50, PlateOffset=0,
+                  CreateSecondSide=True, RoofAngle=10, RidgeHeight=500, GroupComponents=True)
+
+    one_call, result = best_of(lambda: roof.create_element(
+        make_build_element(BayCount=args.bays, BayPitch=pitch, BayOverrides="", **params), None))
+    per_bay, _ = best_of(lambda: [roof.create_element(make_build_element(**params), None)
+                                  for _ in range(args.bays)])
+    print(f"SolarCarportRoof, two sides: {args.bays} calls {per_bay:.3f} s, "
+          f"BayCount={args.bays} {one_call:.3f} s ({len(result.elements)} elements)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
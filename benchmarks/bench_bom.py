@@ -0,0 +1,112 @@
+"""
+Bill of Materials Benchmark
+============================================================================
+Configurations quoted per minute by SolarCommon.bom, against building the
+SystemCreator model to count its parts. Configurations are random surfaces
+and panel sizes; the mixed-orientation case includes the packing search.
+
+Usage:
+    python bench_bom.py [--configs N]
+============================================================================
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+
+SCRIPTS_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts")
+sys.path.insert(0, SCRIPTS_ROOT)
+os.environ.setdefault("SOLAR_LOG_LEVEL", "WARNING")
+
+from SolarCommon.backend import install_backend, make_build_element
+from SolarCommon.bom import system_bom, project_bom
+from SolarCommon.packing import pack_panels
+
+DEFAULT_CONFIGS = 5000
+GEOMETRY_CONFIGS = 50  # building the model is too slow for the full sweep
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def random_configs(count, seed=1):
+    """SystemCreator parameters: 2-80 m surfaces, common panel sizes"""
+    rng = random.Random(seed)
+    return [dict(SurfaceWidth=rng.uniform(2000, 80000), SurfaceHeight=rng.uniform(2000, 50000),
+                 PanelWidth=rng.choice([1000, 1134, 1300]), PanelHeight=rng.choice([1700, 1722, 2000]),
+                 Spacing=rng.choice([20, 23, 50]), PanelThickness=35, PanelOrientation=False,
+                 GutterWidth=100, GutterHeight=80, ProfileThickness=40, RungThickness=30,
+                 ModuleCount=0)
+            for _ in range(count)]
+
+
+def bom_of(params, mixed=False):
+    return system_bom(params['SurfaceWidth'], params['SurfaceHeight'],
+                      params['PanelWidth'], params['PanelHeight'], params['Spacing'],
+                      params['PanelThickness'], params['GutterWidth'], params['GutterHeight'],
+                      params['ProfileThickness'], params['RungThickness'], mixed)
+
+
+def per_minute(count, seconds):
+    return count / seconds * 60 if seconds else float('inf')
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytical BOM throughput")
+    parser.add_argument("--configs", type=int, default=DEFAULT_CONFIGS,
+                        help=f"configurations per case (default: {DEFAULT_CONFIGS})")
+    args = parser.parse_args()
+
+    install_backend("headless")
+    path = os.path.join(SCRIPTS_ROOT, "SolarModuleArray", "AutoArray_full.py")
+    spec = importlib.util.spec_from_file_location("AutoArray_full", path)
+    system = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(system)
+
+    configs = random_configs(args.configs)
+    print(f"{'case':<28} {'configs':>8} {'time (s)':>9} {'configs/min':>12}")
+
+    def report(name, count, seconds):
+        print(f"{name:<28} {count:>8} {seconds:>9.3f} {per_minute(count, seconds):>12,.0f}")
+
+    start = time.perf_counter()
+    modules = sum(bom_of(params).module_count for params in configs)
+    report("system_bom (grid)", len(configs), time.perf_counter() - start)
+
+    pack_panels.cache_clear()
+    mixed_configs = configs[:max(1, len(configs) // 50)]
+    start = time.perf_counter()
+    for params in mixed_configs:
+        bom_of(params, mixed=True)
+    report("system_bom (mixed)", len(mixed_configs), time.perf_counter() - start)
+
+    projects = [{'name': f"P{i}",
+                 'modules': {'rows': 1 + i % 40, 'cols': 1 + i % 60, 'width': 1000,
+                             'height': 2000, 'thickness': 35},
+                 'gaps': {'row': 50, 'col': 50}, 'plate': {'thickness': 50, 'offset': 0}}
+                for i in range(len(configs))]
+    start = time.perf_counter()
+    for project in projects:
+        project_bom(project)
+    report("project_bom", len(projects), time.perf_counter() - start)
+
+    # Counting on the model, as before the BOM
+    geometry_configs = configs[:GEOMETRY_CONFIGS]
+    start = time.perf_counter()
+    for params in geometry_configs:
+        build_ele = make_build_element(**params)
+        system.SystemCreator(None).create(build_ele)
+        assert build_ele.ModuleCount.value == bom_of(params).module_count
+    report("SystemCreator model", len(geometry_configs), time.perf_counter() - start)
+
+    print(f"{modules:,} modules quoted in the grid case")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Config Stream Benchmark
+============================================================================
+Compares reading a large multi-project config at once (json.load, as
+load_config does) with SolarCommon.config_stream (incremental .json parser
+and JSON Lines). Each reader runs in its own process; reported are the time
+until the first project is available, the total time to go through all
+projects and the peak memory of the process (see peak_memory.py).
+
+Usage:
+    python bench_config_stream.py [project_count]     # default 50000
+============================================================================
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+from SolarCommon.config_stream import iter_projects
+
+import peak_memory
+
+DEFAULT_PROJECTS = 50000
+
+# ============================================================================
+# CONFIG FILES
+# ============================================================================
+
+def make_project(index):
+    return {
+        'name': f"Portfolio_{index:06d}",
+        'enabled': True,
+        'modules': {'rows': 3 + index % 10, 'cols': 4 + index % 7,
+                    'width': 1000, 'height': 2000, 'thickness': 35},
+        'gaps': {'row': 50, 'col': 50},
+        'plate': {'thickness': 50, 'offset': 0},
+        'roof': {'createSecondSide': bool(index % 2), 'angle': 15, 'ridgeHeight': 1000},
+        'placement': {'x': index * 10000.0, 'y': 0, 'z': 0},
+        'colors': {'plate': 7, 'frame': 4, 'pv': 21},
+        'notes': "Exported from portfolio database " + "x" * 200,
+    }
+
+
+def write_configs(directory, project_count):
+    """Write the same projects as .json and .jsonl, return both paths"""
+    json_path = os.path.join(directory, "portfolio.json")
+    jsonl_path = os.path.join(directory, "portfolio.jsonl")
+
+    with open(json_path, 'w') as f_json, open(jsonl_path, 'w') as f_jsonl:
+        f_json.write('{"version": "1.0", "projects": [\n')
+        for index in range(project_count):
+            line = json.dumps(make_project(index))
+            f_json.write(("  " if index == 0 else ",\n  ") + line)
+            f_jsonl.write(line + "\n")
+        f_json.write('\n]}\n')
+    return json_path, jsonl_path
+
+# ============================================================================
+# SINGLE RUN
+# ============================================================================
+
+def run_once(path, reader):
+    peak_memory.start()
+    start = time.perf_counter()
+    first = None
+    count = 0
+
+    if reader == "json.load":
+        with open(path) as f:
+            projects = json.load(f)['projects']
+    else:
+        projects = iter_projects(path)
+
+    for project in projects:
+        if first is None:
+            first = time.perf_counter() - start
+        count += project['modules']['rows'] > 0
+
+    return {
+        'reader': reader,
+        'file': os.path.basename(path),
+        'projects': count,
+        'first_s': round(first, 4),
+        'total_s': round(time.perf_counter() - start, 3),
+        'peak_mb': round(peak_memory.peak_mb(), 1),
+    }
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        print(json.dumps(run_once(sys.argv[2], sys.argv[3])))
+        return 0
+
+    project_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PROJECTS
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path, jsonl_path = write_configs(tmp_dir, project_count)
+        size_mb = os.path.getsize(json_path) / 2 ** 20
+        print(f"{project_count} projects, {size_mb:.0f} MB config")
+        header = f"peak {peak_memory.source()} (MB)"
+        width = max(14, len(header))
+        print(f"{'reader':<10} {'file':<16} {'first (s)':>10} {'total (s)':>10} {header:>{width}}")
+
+        for path, reader in ((json_path, "json.load"), (json_path, "stream"), (jsonl_path, "stream")):
+            # Fresh process per run so peak memory is not inherited
+            output = subprocess.run([sys.executable, __file__, "--run", path, reader],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output)
+            print(f"{result['reader']:<10} {result['file']:<16} {result['first_s']:>10} "
+                  f"{result['total_s']:>10} {result['peak_mb']:>{width}}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Grid Fit Benchmark
+============================================================================
+Time of the grid computation done by AutoArray / SystemCreator on every
+PythonPart refresh: the former per-cell Python loop with its bounds check,
+SolarCommon.layout.fit_grid on a cache miss and on a cache hit (a value
+revisited while dragging a palette slider).
+
+Usage:
+    python bench_grid_fit.py
+============================================================================
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+from SolarCommon.layout import fit_grid
+
+PANEL_WIDTH = 1000
+PANEL_HEIGHT = 2000
+SPACING = 50
+GRIDS = [(3, 4), (10, 10), (32, 32), (100, 100), (224, 224)]
+REPEATS = 20
+
+# ============================================================================
+# GRID COMPUTATIONS
+# ============================================================================
+
+def loop_grid(surface_width, surface_height, panel_width, panel_height, spacing):
+    """Per-cell loop as in the creators before fit_grid"""
+    nb_col = int((surface_width + spacing) // (panel_width + spacing))
+    nb_row = int((surface_height + spacing) // (panel_height + spacing))
+    origins = []
+    for row in range(nb_row):
+        for col in range(nb_col):
+            x = col * (panel_width + spacing)
+            y = row * (panel_height + spacing)
+            if x + panel_width <= surface_width and y + panel_height <= surface_height:
+                origins.append((x, y))
+    return origins
+
+
+def best_of(function, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    print(f"{'panels':>8} {'loop (ms)':>10} {'fit miss (ms)':>14} {'fit hit (us)':>13}")
+    for rows, cols in GRIDS:
+        args = (cols * (PANEL_WIDTH + SPACING), rows * (PANEL_HEIGHT + SPACING),
+                PANEL_WIDTH, PANEL_HEIGHT, SPACING)
+
+        loop = best_of(lambda: loop_grid(*args))
+
+        def miss():
+            fit_grid.cache_clear()
+            fit_grid(*args)
+        fit_miss = best_of(miss)
+        fit_hit = best_of(lambda: fit_grid(*args))
+
+        assert fit_grid(*args).panel_count == len(loop_grid(*args)) == rows * cols
+        print(f"{rows * cols:>8} {loop * 1000:>10.3f} {fit_miss * 1000:>14.3f} {fit_hit * 1e6:>13.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
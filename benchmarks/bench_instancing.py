@@ -0,0 +1,160 @@
+"""
+Instancing Benchmark
+============================================================================
+Compares the two ways of building the frame and PV solids of an array:
+
+    - per module:  Polyhedron3D.CreateCuboid for every frame and PV layer
+    - instanced:   one CuboidPrototype per part, Move per module
+                   (SolarCommon.instancing, used by all creators)
+
+Allplan is not needed: when the Allplan Python API is not importable, a
+stand-in geometry backend is registered. Its cuboid mimics what a B-rep
+kernel does on creation (8 vertices, 6 oriented faces with normals, 12
+edges), while Move only offsets the vertices and shares the topology. The
+ratio therefore shows the construction work saved per module, not absolute
+Allplan timings.
+
+Usage:
+    python bench_instancing.py [module_count ...]    # default 1000 10000
+============================================================================
+"""
+
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+DEFAULT_SIZES = [1000, 10000]
+REPEATS = 3
+
+# ============================================================================
+# STAND-IN GEOMETRY BACKEND
+# ============================================================================
+
+# Vertex indices of the cuboid faces (counter-clockwise seen from outside)
+CUBOID_FACES = ((0, 3, 2, 1), (4, 5, 6, 7), (0, 1, 5, 4),
+                (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7))
+
+
+def install_geometry_stand_in():
+    """Register a NemAll_Python_Geometry stand-in if the real API is not available"""
+    try:
+        import NemAll_Python_Geometry  # noqa: F401
+        return "Allplan"
+    except ImportError:
+        pass
+
+    class Point3D:
+        __slots__ = ("X", "Y", "Z")
+
+        def __init__(self, x=0.0, y=0.0, z=0.0):
+            self.X, self.Y, self.Z = x, y, z
+
+    class Vector3D(Point3D):
+        __slots__ = ()
+
+    class Polyhedron3D:
+        __slots__ = ("vertices", "faces", "normals", "edges")
+
+        @staticmethod
+        def CreateCuboid(p1, p2):
+            solid = Polyhedron3D()
+            solid.vertices = [(x, y, z)
+                              for z in (p1.Z, p2.Z)
+                              for x, y in ((p1.X, p1.Y), (p2.X, p1.Y), (p2.X, p2.Y), (p1.X, p2.Y))]
+            solid.faces = CUBOID_FACES
+            solid.normals = [_face_normal(solid.vertices, face) for face in CUBOID_FACES]
+            solid.edges = sorted({tuple(sorted((face[i], face[(i + 1) % 4])))
+                                  for face in CUBOID_FACES for i in range(4)})
+            return solid
+
+    def Move(solid, vector):
+        moved = Polyhedron3D()
+        dx, dy, dz = vector.X, vector.Y, vector.Z
+        moved.vertices = [(x + dx, y + dy, z + dz) for x, y, z in solid.vertices]
+        moved.faces, moved.normals, moved.edges = solid.faces, solid.normals, solid.edges
+        return moved
+
+    geo = types.ModuleType("NemAll_Python_Geometry")
+    geo.Point3D, geo.Vector3D, geo.Polyhedron3D, geo.Move = Point3D, Vector3D, Polyhedron3D, Move
+    sys.modules[geo.__name__] = geo
+    return "stand-in"
+
+
+def _face_normal(vertices, face):
+    """Unit normal of a planar face (Newell's method)"""
+    nx = ny = nz = 0.0
+    for i, index in enumerate(face):
+        x1, y1, z1 = vertices[index]
+        x2, y2, z2 = vertices[face[(i + 1) % len(face)]]
+        nx += (y1 - y2) * (z1 + z2)
+        ny += (z1 - z2) * (x1 + x2)
+        nz += (x1 - x2) * (y1 + y2)
+    length = (nx * nx + ny * ny + nz * nz) ** 0.5
+    return (nx / length, ny / length, nz / length)
+
+# ============================================================================
+# VARIANTS
+# ============================================================================
+
+def run_per_module(layout):
+    import NemAll_Python_Geometry as AllplanGeo
+
+    solids = []
+    for frame_box, pv_box in zip(layout.frames.tolist(), layout.pvs.tolist()):
+        for p1, p2 in (frame_box, pv_box):
+            solids.append(AllplanGeo.Polyhedron3D.CreateCuboid(AllplanGeo.Point3D(*p1),
+                                                               AllplanGeo.Point3D(*p2)))
+    return solids
+
+
+def run_instanced(layout):
+    from SolarCommon.instancing import CuboidPrototype
+
+    frame_proto = CuboidPrototype.from_box(layout.frames[0].tolist())
+    pv_proto = CuboidPrototype.from_box(layout.pvs[0].tolist())
+
+    solids = []
+    for frame_origin, pv_origin in zip(layout.frames[:, 0].tolist(), layout.pvs[:, 0].tolist()):
+        solids.append(frame_proto.place(*frame_origin))
+        solids.append(pv_proto.place(*pv_origin))
+    return solids
+
+
+def best_of(function, layout):
+    """Best wall time of REPEATS runs (ms) and the solid count"""
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        solids = function(layout)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, len(solids)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    backend = install_geometry_stand_in()
+    from SolarCommon.layout import compute_array_layout
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"Geometry backend: {backend}, best of {REPEATS}")
+    print(f"{'modules':>8} {'solids':>7} {'per module (ms)':>16} {'instanced (ms)':>15} {'speed-up':>9}")
+    for size in sizes:
+        cols = max(1, int(size ** 0.5))
+        rows = -(-size // cols)
+        layout = compute_array_layout(rows, cols, 1000, 2000, 35, 50, 50, 50, 0)
+
+        per_module, solid_count = best_of(run_per_module, layout)
+        instanced, _ = best_of(run_instanced, layout)
+        print(f"{layout.module_count:>8} {solid_count:>7} {per_module:>16.1f} {instanced:>15.1f} "
+              f"{per_module / instanced:>8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Large-Array Benchmark
+============================================================================
+Measures generation time and peak memory of auto_generate_solar for large
+projects, comparing the standard path (all elements built before insertion)
+with the large-array batch path.
+
+Allplan is not needed: when the Allplan Python API is not importable, the
+headless backend (SolarCommon.backend) is installed and CreateElements
+discards the elements. The numbers therefore cover the script side only
+(layout, element construction, batching), not the host-side cost inside
+Allplan. Peak memory is the peak RSS where the platform reports it, see
+peak_memory.py for Windows.
+
+Usage:
+    python bench_large_array.py                 # default sizes 10k and 50k
+    python bench_large_array.py 2000 10000 50000
+============================================================================
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(REPO_ROOT, "PythonPartsScripts"))
+
+from SolarCommon.backend import install_backend
+
+import peak_memory
+
+DEFAULT_SIZES = [10000, 50000]
+
+# ============================================================================
+# SINGLE RUN
+# ============================================================================
+
+def make_project(module_count):
+    """Build a near-square large-array project with exactly module_count modules"""
+    cols = int(module_count ** 0.5)
+    while module_count % cols:
+        cols -= 1
+    rows = module_count // cols
+    return {
+        'name': f"Bench_{module_count}",
+        'largeArray': True,
+        'modules': {'rows': rows, 'cols': cols, 'width': 1000, 'height': 2000, 'thickness': 35},
+        'gaps': {'row': 50, 'col': 50},
+        'plate': {'thickness': 50, 'offset': 0},
+        'roof': {'createSecondSide': False, 'angle': 0, 'ridgeHeight': 0},
+        'placement': {'x': 0, 'y': 0, 'z': 0},
+    }
+
+def run_once(module_count, mode):
+    """Generate and insert one project, return timing and peak memory"""
+    install_backend()
+    sys.path.insert(0, os.path.join(REPO_ROOT, "auto_generate"))
+    import auto_generate_solar as generator
+
+    generator.logger.setLevel(logging.WARNING)
+    project = make_project(module_count)
+
+    peak_memory.start()
+    start = time.perf_counter()
+    element_count = 0
+    if mode == "batch":
+        for batch in generator.generate_solar_array_batches(project):
+            element_count += len(batch)
+            generator.insert_into_allplan(None, batch, project['placement'])
+    else:
+        elements = generator.generate_solar_array(project)
+        element_count = len(elements)
+        generator.insert_into_allplan(None, elements, project['placement'])
+    elapsed = time.perf_counter() - start
+
+    return {
+        'modules': project['modules']['rows'] * project['modules']['cols'],
+        'mode': mode,
+        'elements': element_count,
+        'seconds': round(elapsed, 3),
+        'peak_mb': round(peak_memory.peak_mb(), 1),
+    }
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        print(json.dumps(run_once(int(sys.argv[2]), sys.argv[3])))
+        return 0
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    header = f"peak {peak_memory.source()} (MB)"
+    width = max(14, len(header))
+    print(f"{'modules':>8} {'mode':>9} {'elements':>9} {'time (s)':>9} {header:>{width}}")
+    for size in sizes:
+        for mode in ("standard", "batch"):
+            # Fresh process per run so peak memory is not inherited
+            output = subprocess.run([sys.executable, __file__, "--run", str(size), mode],
+                                    capture_output=True, text=True, check=True).stdout
+            result = json.loads(output)
+            print(f"{result['modules']:>8} {result['mode']:>9} {result['elements']:>9} "
+                  f"{result['seconds']:>9} {result['peak_mb']:>{width}}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Layout Cache Benchmark
+============================================================================
+Compares computing project layouts (SolarCommon.layout) with loading them
+from SolarCommon.layout_cache: per array size the compute time, a cold run
+(compute + store) and a warm run (load) with every size cached, then a whole portfolio of projects
+run twice through cached_project_layout, as auto_generate_solar.py does.
+
+Usage:
+    python bench_layout_cache.py [project_count]     # default 2000
+============================================================================
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+from SolarCommon.layout import compute_project_layout
+from SolarCommon.layout_cache import LayoutCache, cached_project_layout, layout_key
+
+DEFAULT_PROJECTS = 2000
+SIZES = [(3, 4), (10, 10), (32, 32), (100, 100), (224, 224)]
+REPEATS = 20
+
+# ============================================================================
+# PROJECTS
+# ============================================================================
+
+def make_project(rows, cols, index=0):
+    return {
+        'name': f"Portfolio_{index:06d}",
+        'largeArray': True,
+        'modules': {'rows': rows, 'cols': cols, 'width': 1000, 'height': 2000, 'thickness': 35},
+        'gaps': {'row': 50, 'col': 50},
+        'plate': {'thickness': 50, 'offset': 0},
+        'roof': {'createSecondSide': False, 'angle': 15, 'ridgeHeight': 1000},
+        'placement': {'x': index * 10000.0, 'y': 0, 'z': 0},
+        'colors': {'plate': 7, 'frame': 4, 'pv': 21},
+    }
+
+
+def best_of(function, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    project_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PROJECTS
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LayoutCache(cache_dir, min_modules=0)
+
+        print(f"{'modules':>8} {'compute (ms)':>13} {'cold (ms)':>10} {'warm (ms)':>10} {'entry (KB)':>11}")
+        for rows, cols in SIZES:
+            project = make_project(rows, cols)
+            compute = best_of(lambda: compute_project_layout(project))
+
+            def cold():
+                cache.clear()
+                cached_project_layout(project, cache)
+            cold_time = best_of(cold)
+            warm = best_of(lambda: cached_project_layout(project, cache))
+            entry_kb = cache.size() / 1024
+            print(f"{rows * cols:>8} {compute * 1000:>13.3f} {cold_time * 1000:>10.3f} "
+                  f"{warm * 1000:>10.3f} {entry_kb:>11.1f}")
+
+        # Portfolio: a few array shapes repeated at different placements,
+        # 1000 to 4400 modules each
+        cache = LayoutCache(cache_dir)
+        cache.clear()
+        projects = [make_project(20 + i % 10 * 5, 50 + i % 5 * 10, i) for i in range(project_count)]
+        distinct = len({layout_key(project) for project in projects})
+        print(f"\n{project_count} projects, {distinct} distinct layouts")
+        print(f"{'run':<18} {'time (s)':>9} {'loaded':>7} {'stored':>7}")
+        start = time.perf_counter()
+        for project in projects:
+            compute_project_layout(project)
+        print(f"{'no cache':<18} {time.perf_counter() - start:>9.3f} {'':>7} {'':>7}")
+        for run in ("first run", "second run"):
+            cache.hits = cache.stored = 0
+            start = time.perf_counter()
+            for project in projects:
+                cached_project_layout(project, cache)
+            print(f"{run:<18} {time.perf_counter() - start:>9.3f} {cache.hits:>7} {cache.stored:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
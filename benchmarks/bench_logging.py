@@ -0,0 +1,84 @@
+"""
+Logging Benchmark
+============================================================================
+Compares the logging overhead of a 1,000 module array (two trace lines per
+module, as in the PythonParts module loops):
+
+    - legacy:         open(..., "a") and write for every line
+    - buffered TRACE: SolarCommon.logger with per-module tracing enabled
+    - buffered INFO:  SolarCommon.logger at default level (tracing disabled)
+
+"hot path" is the time spent in the module loop, "total" includes the final
+flush_logs() that writes the buffered records.
+
+Usage:
+    python bench_logging.py [module_count]
+============================================================================
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+from SolarCommon.logger import get_logger, flush_logs, TRACE, MESSAGE_FORMAT
+
+DEFAULT_MODULES = 1000
+
+# ============================================================================
+# VARIANTS
+# ============================================================================
+
+def run_legacy(log_file, module_count):
+    def log_debug(msg):
+        with open(log_file, "a") as f:
+            f.write(msg + "\n")
+
+    start = time.perf_counter()
+    for index in range(module_count):
+        row, col = divmod(index, 40)
+        log_debug(f"Creating module [{row},{col}]...")
+        log_debug(f"Module [{row},{col}] created with frame and PV layer")
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def run_buffered(log_file, module_count, level):
+    logger = get_logger(f"bench_{level}", log_file, level=level, fmt=MESSAGE_FORMAT)
+
+    start = time.perf_counter()
+    for index in range(module_count):
+        row, col = divmod(index, 40)
+        logger.log(TRACE, "Creating module [%d,%d]...", row, col)
+        logger.log(TRACE, "Module [%d,%d] created with frame and PV layer", row, col)
+    hot_path = time.perf_counter() - start
+    flush_logs()
+    return hot_path, time.perf_counter() - start
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    module_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MODULES
+    os.environ.pop("SOLAR_LOG_LEVEL", None)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = [
+            ("legacy", run_legacy(os.path.join(tmp_dir, "legacy.txt"), module_count)),
+            ("buffered TRACE", run_buffered(os.path.join(tmp_dir, "trace.txt"), module_count, TRACE)),
+            ("buffered INFO", run_buffered(os.path.join(tmp_dir, "info.txt"), module_count, logging.INFO)),
+        ]
+        flush_logs()
+
+        print(f"{module_count} modules, {2 * module_count} trace lines")
+        print(f"{'variant':<16} {'hot path (ms)':>14} {'total (ms)':>11}")
+        for name, (hot_path, total) in results:
+            print(f"{name:<16} {hot_path * 1000:>14.2f} {total * 1000:>11.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
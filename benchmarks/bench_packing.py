@@ -0,0 +1,56 @@
+"""
+Panel Packing Benchmark
+============================================================================
+Modules placed on a sweep of surface sizes by the single-orientation grid
+(fit_grid) and by the mixed-orientation packing (pack_panels) of
+SystemCreator, with the search time and whether the exact search finished
+within the time budget.
+
+Usage:
+    python bench_packing.py [--budget MS]
+============================================================================
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+from SolarCommon.packing import pack_panels, DEFAULT_TIME_BUDGET
+
+PANEL_WIDTH = 1134
+PANEL_HEIGHT = 1722
+SPACING = 23
+SURFACES = [(4000, 3000), (6000, 4500), (8000, 6000), (10000, 7000), (12500, 9000),
+            (16000, 10000), (20000, 15000), (30000, 20000), (50000, 30000), (85000, 50000)]
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid vs mixed-orientation packing")
+    parser.add_argument("--budget", type=float, default=DEFAULT_TIME_BUDGET * 1000,
+                        help="time budget of the exact search in ms")
+    args = parser.parse_args()
+
+    print(f"panel {PANEL_WIDTH} x {PANEL_HEIGHT} mm, spacing {SPACING} mm, budget {args.budget:.0f} ms")
+    print(f"{'surface (m)':>13} {'grid':>7} {'packed':>7} {'gain':>7} {'time (ms)':>10} {'complete':>9}")
+    grid_total = packed_total = 0
+    for surface_width, surface_height in SURFACES:
+        pack_panels.cache_clear()
+        result = pack_panels(surface_width, surface_height, PANEL_WIDTH, PANEL_HEIGHT, SPACING,
+                             args.budget / 1000)
+        grid_total += result.grid_count
+        packed_total += result.panel_count
+        surface = f"{surface_width / 1000:g} x {surface_height / 1000:g}"
+        print(f"{surface:>13} {result.grid_count:>7} {result.panel_count:>7} {result.gain_ratio:>7.1%} "
+              f"{result.elapsed * 1000:>10.1f} {str(result.complete):>9}")
+
+    print(f"total: {grid_total} -> {packed_total} modules "
+          f"({(packed_total - grid_total) / grid_total:+.1%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
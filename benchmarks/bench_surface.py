@@ -0,0 +1,101 @@
+"""
+Polygonal Surface Benchmark
+============================================================================
+Time of AutoArray's free-cell search on an irregular roof with obstacles:
+SolarCommon.surface.fit_surface (cells in a grid spatial index, every edge
+and obstacle tested against the cells near it) against testing every cell
+against every edge and obstacle.
+
+Usage:
+    python bench_surface.py [--obstacles N ...]
+============================================================================
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+from SolarCommon.layout import fit_grid
+from SolarCommon.surface import fit_surface, points_in_polygon, polygon_edges, segment_hits, EPS
+
+PANEL_WIDTH = 1000
+PANEL_HEIGHT = 1700
+SPACING = 50
+CLEARANCE = 100
+ROOF = ((0, 0), (250000, 0), (250000, 110000), (180000, 160000), (60000, 160000), (0, 100000))
+OBSTACLES = [50, 200, 500, 1000]
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def make_obstacles(count, seed=1):
+    """Columns, skylights and drains: regular polygons of 0.2 to 3 m radius"""
+    rng = random.Random(seed)
+    width = max(x for x, _ in ROOF)
+    height = max(y for _, y in ROOF)
+    obstacles = []
+    for _ in range(count):
+        cx, cy = rng.uniform(0, width), rng.uniform(0, height)
+        radius, sides = rng.uniform(200, 3000), rng.choice([3, 4, 6, 8])
+        obstacles.append(tuple((cx + radius * math.cos(2 * math.pi * k / sides + 0.3),
+                                cy + radius * math.sin(2 * math.pi * k / sides + 0.3))
+                               for k in range(sides)))
+    return tuple(obstacles)
+
+
+def brute_force(boundary, obstacles):
+    """Free cells testing all cells against all edges and obstacles"""
+    xs, ys = zip(*boundary)
+    grid = fit_grid(max(xs) - min(xs), max(ys) - min(ys), PANEL_WIDTH, PANEL_HEIGHT, SPACING)
+    cells = grid.origins[:, :2] + (min(xs), min(ys))
+    panel_mins = cells + EPS
+    panel_maxs = cells + (PANEL_WIDTH, PANEL_HEIGHT) - EPS
+    centers = cells + (PANEL_WIDTH / 2.0, PANEL_HEIGHT / 2.0)
+
+    free = points_in_polygon(boundary, centers)
+    for edge in polygon_edges(boundary).tolist():
+        free &= ~segment_hits(*edge, panel_mins, panel_maxs)
+    for obstacle in obstacles:
+        for edge in polygon_edges(obstacle).tolist():
+            free &= ~segment_hits(*edge, panel_mins - CLEARANCE, panel_maxs + CLEARANCE)
+        free &= ~points_in_polygon(obstacle, centers)
+    return len(cells), cells[free] - (min(xs), min(ys))
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed vs brute-force free-cell search")
+    parser.add_argument("--obstacles", type=int, nargs="+", default=OBSTACLES,
+                        help="obstacle counts to run")
+    args = parser.parse_args()
+
+    print(f"{'obstacles':>9} {'cells':>7} {'panels':>7} {'indexed (ms)':>13} {'brute (ms)':>11} {'speed-up':>9}")
+    for count in args.obstacles:
+        obstacles = make_obstacles(count)
+
+        fit_surface.cache_clear()
+        start = time.perf_counter()
+        fit = fit_surface(ROOF, obstacles, PANEL_WIDTH, PANEL_HEIGHT, SPACING, CLEARANCE)
+        indexed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cells, free = brute_force(ROOF, obstacles)
+        brute = time.perf_counter() - start
+
+        assert np.array_equal(free, fit.grid.origins[:, :2])
+        print(f"{count:>9} {cells:>7} {fit.panel_count:>7} {indexed * 1000:>13.1f} "
+              f"{brute * 1000:>11.1f} {brute / indexed:>8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Design Sweep Benchmark
+============================================================================
+Configurations evaluated per second by the sweep runner with 1, 2, 4...
+worker processes, from a grid spec over spacing and roof angle (mixed
+orientation included, so the packing search is part of the cost).
+Scaling is bounded by the CPUs of the machine.
+
+Usage:
+    python bench_sweep.py [--workers 1 2 4] [--chunk-size N]
+============================================================================
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "PythonPartsScripts"))
+sys.path.insert(0, os.path.join(ROOT, "auto_generate"))
+os.environ.setdefault("SOLAR_LOG_LEVEL", "WARNING")
+
+from SolarCommon.sweep import expand_configs
+import sweep_solar
+
+SPEC = {
+    'site': {'width': 40000, 'depth': 25000},
+    'panels': [{'name': "M400", 'width': 1134, 'height': 1722, 'thickness': 30, 'power': 400},
+               {'name': "M550", 'width': 1134, 'height': 2278, 'thickness': 35, 'power': 550}],
+    'spacing': {'from': 10, 'to': 60, 'step': 5},
+    'orientation': ["portrait", "landscape", "mixed"],
+    'roofAngle': {'from': 0, 'to': 20, 'step': 2},
+    'packingTimeBudget': 200,
+}
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep throughput per worker count")
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 2, 4],
+                        help="worker counts to time (default: 1 2 4)")
+    parser.add_argument("--chunk-size", type=int, default=sweep_solar.DEFAULT_CHUNK_SIZE,
+                        help=f"configurations per task (default: {sweep_solar.DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    configs = list(expand_configs(SPEC))
+    print(f"{len(configs)} configurations, {os.cpu_count()} CPU(s)")
+    print(f"{'workers':>7} {'time (s)':>9} {'configs/s':>10} {'speedup':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        # Fresh checkpoint each time: every configuration is evaluated
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, "bench.sweep.jsonl")
+            start = time.perf_counter()
+            results = sweep_solar.run_sweep(configs, checkpoint, workers, args.chunk_size)
+            seconds = time.perf_counter() - start
+        assert len(results) == len(configs)
+        baseline = baseline or seconds
+        print(f"{workers:>7} {seconds:>9.3f} {len(configs) / seconds:>10,.0f} {baseline / seconds:>7.2f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
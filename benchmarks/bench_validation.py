@@ -0,0 +1,85 @@
+"""
+Validation Benchmark
+============================================================================
+Times SolarCommon.config_schema on large configs: schema compilation (once
+per process), a valid config and the same config with errors in 1 % of the
+projects (every error is collected with its JSON path).
+
+Usage:
+    python bench_validation.py [project_count]     # default 10000
+============================================================================
+"""
+
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PythonPartsScripts"))
+
+from SolarCommon.config_schema import check_config, compiled_validator
+
+DEFAULT_PROJECTS = 10000
+REPEATS = 5
+
+# ============================================================================
+# CONFIGS
+# ============================================================================
+
+def make_project(index):
+    return {
+        'name': f"Portfolio_{index:06d}",
+        'enabled': True,
+        'modules': {'rows': 3 + index % 10, 'cols': 4 + index % 7,
+                    'width': 1000, 'height': 2000, 'thickness': 35},
+        'gaps': {'row': 50, 'col': 50},
+        'plate': {'thickness': 50, 'offset': 0},
+        'roof': {'createSecondSide': bool(index % 2), 'angle': 15, 'ridgeHeight': 1000},
+        'placement': {'x': index * 10000.0, 'y': 0, 'z': 0},
+        'colors': {'plate': 7, 'frame': 4, 'pv': 21},
+    }
+
+
+def break_projects(config, every=100):
+    """Copy of config with two errors in every `every`-th project"""
+    broken = copy.deepcopy(config)
+    for project in broken['projects'][::every]:
+        project['modules']['width'] = -1
+        del project['colors']['pv']
+    return broken
+
+
+def best_of(config):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        errors = check_config(config)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(errors)
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    project_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PROJECTS
+    config = {'version': '1.0', 'projects': [make_project(i) for i in range(project_count)]}
+    broken = break_projects(config)
+
+    start = time.perf_counter()
+    compiled_validator('config')
+    compile_time = time.perf_counter() - start
+
+    valid_time, valid_errors = best_of(config)
+    broken_time, broken_errors = best_of(broken)
+
+    print(f"{project_count} projects, best of {REPEATS}")
+    print(f"{'run':<22} {'time (ms)':>10} {'errors':>7}")
+    print(f"{'compile schema':<22} {compile_time * 1000:>10.2f} {'':>7}")
+    print(f"{'valid config':<22} {valid_time * 1000:>10.1f} {valid_errors:>7}")
+    print(f"{'1 % invalid projects':<22} {broken_time * 1000:>10.1f} {broken_errors:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
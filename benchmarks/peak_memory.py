@@ -0,0 +1,62 @@
+"""
+Peak Memory - Peak memory of a benchmark process on any platform
+============================================================================
+The benchmarks run each case in a fresh process and report its peak memory:
+
+    resource     peak RSS (Linux, macOS)
+    psutil       peak working set (Windows, if psutil is installed)
+    tracemalloc  peak of the Python allocations only, traced from start()
+                 on; tracing slows allocations, so such runs are slower
+
+Call start() before the measured work and peak_mb() after it; source()
+names what was measured, for the column header.
+============================================================================
+"""
+
+import sys
+import tracemalloc
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RESOURCE = "RSS"
+PSUTIL = "working set"
+TRACEMALLOC = "tracemalloc"
+
+
+def source():
+    """What peak_mb() measures on this machine"""
+    if resource is not None:
+        return RESOURCE
+    if psutil is not None and hasattr(psutil.Process().memory_info(), 'peak_wset'):
+        return PSUTIL
+    return TRACEMALLOC
+
+
+def start():
+    """Start tracing allocations when no process-level peak is available"""
+    if source() == TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def peak_mb():
+    """
+    Peak memory of this process
+
+    Returns:
+        float: Peak memory (MB), see source()
+    """
+    measured = source()
+    if measured == RESOURCE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+    if measured == PSUTIL:
+        return psutil.Process().memory_info().peak_wset / 2 ** 20
+    return tracemalloc.get_traced_memory()[1] / 2 ** 20
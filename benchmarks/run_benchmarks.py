@@ -0,0 +1,372 @@
+"""
+Benchmark Suite - All solar creators on the headless backend
+============================================================================
+Runs every creator at several array sizes and reports, per case and size:
+
+    seconds      best wall time of --repeat runs
+    elements     number of elements returned
+    allocations  memory blocks still allocated by the result
+    retained_mb  memory held by the result (tracemalloc)
+    peak_mb      peak memory during creation (tracemalloc)
+
+Cases:
+    auto_array            AutoArray.py           AutoArrayCreator.create
+    auto_array_plan       auto_array with PlanSymbols (3D view + 2D plan view)
+    system                AutoArray_full.py      SystemCreator.create
+    system_profiles       AutoArray_full_real_profiles.py  SystemCreator.create
+    system_merged         system with MergeMembers (collinear profiles/rungs merged)
+    system_profiles_merged  system_profiles with MergeMembers
+    system_plan           system with PlanSymbols
+    roof_one_side         SolarModuleArray.py    create_element, first side only
+    roof_two_sides        SolarModuleArray.py    create_element, CreateSecondSide
+    roof_two_sides_plan   roof_two_sides with PlanSymbols
+    pv_color              multi_pv/pv_color.py   create_element
+    pv_color_plan         pv_color with PlanSymbols
+    generate_solar_array  auto_generate_solar.py generate_solar_array
+    generate_solar_array_roof  generate_solar_array, roof.createSecondSide
+
+Every case can run at each level of detail (--lods full box slab, see
+SolarCommon.lod); full detail is the default. Sizes are module counts per
+side, laid out as a near-square grid. Results
+can be saved as JSON and compared with an earlier run (e.g. from the
+previous commit); --compare exits with 1 if a case got slower or uses more
+peak memory than --threshold allows (differences below 2 ms / 0.5 MB are
+treated as noise).
+
+Usage:
+    python run_benchmarks.py                                 # all cases, default sizes
+    python run_benchmarks.py --sizes 12 1000 --cases pv_color roof_two_sides
+    python run_benchmarks.py --sizes 10000 --lods full box slab
+    python run_benchmarks.py --output before.json
+    python run_benchmarks.py --output after.json --compare before.json
+============================================================================
+"""
+
+import argparse
+import datetime
+import gc
+import importlib.util
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+SCRIPTS_ROOT = os.path.join(REPO_ROOT, "PythonPartsScripts")
+sys.path.insert(0, SCRIPTS_ROOT)
+
+# Keep the PythonParts debug logs quiet, they are configured on import
+os.environ.setdefault("SOLAR_LOG_LEVEL", "WARNING")
+
+from SolarCommon.backend import install_backend, make_build_element
+from SolarCommon.lod import LEVELS, FULL
+
+DEFAULT_SIZES = [12, 100, 1000, 10000, 50000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10  # 10 % slower / more peak memory counts as regression
+NOISE_SECONDS = 0.002     # smaller time differences are never regressions
+NOISE_MB = 0.5            # smaller peak memory differences are never regressions
+
+MODULE_WIDTH = 1000
+MODULE_HEIGHT = 2000
+MODULE_THICKNESS = 35
+SPACING = 50
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def grid(module_count):
+    """Near-square (rows, cols) grid with at least module_count modules"""
+    cols = max(1, int(module_count ** 0.5))
+    rows = -(-module_count // cols)
+    return rows, cols
+
+
+def load_script(relative_path):
+    """Import a PythonPart script by path (module name = file name)"""
+    path = os.path.join(SCRIPTS_ROOT, relative_path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def count_elements(result):
+    """Element count of a create_element / create result"""
+    if hasattr(result, 'elements'):
+        return len(result.elements)
+    if isinstance(result, tuple):
+        return len(result[0])
+    return len(result)
+
+# ============================================================================
+# CASES
+# ============================================================================
+# Each case takes a module count and a level of detail and returns a
+# callable creating the array.
+
+def _auto_array_case(plan_symbols=False):
+    def case(module_count, lod=FULL):
+        module = load_script("SolarModuleArray/AutoArray.py")
+        rows, cols = grid(module_count)
+        params = dict(SurfaceWidth=cols * MODULE_WIDTH + (cols - 1) * SPACING,
+                      SurfaceHeight=rows * MODULE_HEIGHT + (rows - 1) * SPACING,
+                      PanelWidth=MODULE_WIDTH, PanelHeight=MODULE_HEIGHT, Spacing=SPACING,
+                      PanelThickness=MODULE_THICKNESS, FrameBarHeight=50,
+                      LevelOfDetail=LEVELS.index(lod), PlanSymbols=plan_symbols)
+        return lambda: module.AutoArrayCreator(None).create(make_build_element(**params))
+    return case
+
+
+def _system_case(relative_path, merge_members=False, plan_symbols=False):
+    def case(module_count, lod=FULL):
+        module = load_script(relative_path)
+        rows, cols = grid(module_count)
+        params = dict(SurfaceWidth=cols * MODULE_WIDTH + (cols - 1) * SPACING,
+                      SurfaceHeight=rows * MODULE_HEIGHT + (rows - 1) * SPACING,
+                      PanelWidth=MODULE_WIDTH, PanelHeight=MODULE_HEIGHT, Spacing=SPACING,
+                      PanelThickness=MODULE_THICKNESS, PanelOrientation=False,
+                      GutterWidth=100, GutterHeight=80, ProfileThickness=40,
+                      RungThickness=30, ModuleCount=0, MergeMembers=merge_members,
+                      LevelOfDetail=LEVELS.index(lod), PlanSymbols=plan_symbols)
+        return lambda: module.SystemCreator(None).create(make_build_element(**params))
+    return case
+
+
+def _roof_params(module_count, second_side, lod=FULL, plan_symbols=False):
+    rows, cols = grid(module_count)
+    return dict(NumRows=rows, NumCols=cols,
+                ModuleWidth=MODULE_WIDTH, ModuleHeight=MODULE_HEIGHT,
+                ModuleThickness=MODULE_THICKNESS, RowGap=SPACING, ColGap=SPACING,
+                PlateThickness=50, PlateOffset=0,
+                CreateSecondSide=second_side, RoofAngle=15, RidgeHeight=1000,
+                GroupComponents=True, LevelOfDetail=LEVELS.index(lod), PlanSymbols=plan_symbols)
+
+
+def _roof_case(second_side, plan_symbols=False):
+    def case(module_count, lod=FULL):
+        module = load_script("SolarModuleArray/SolarModuleArray.py")
+        params = _roof_params(module_count, second_side, lod, plan_symbols)
+        return lambda: module.create_element(make_build_element(**params), None)
+    return case
+
+
+def _pv_color_case(plan_symbols=False):
+    def case(module_count, lod=FULL):
+        module = load_script("multi_pv/pv_color.py")
+        params = _roof_params(module_count, False, lod, plan_symbols)
+        return lambda: module.create_element(make_build_element(**params), None)
+    return case
+
+
+def _generate_case(second_side):
+    def case(module_count, lod=FULL):
+        return _generate_solar_array(module_count, second_side, lod)
+    return case
+
+
+def _generate_solar_array(module_count, second_side, lod=FULL):
+    sys.path.insert(0, os.path.join(REPO_ROOT, "auto_generate"))
+    import auto_generate_solar as generator
+
+    generator.logger.setLevel(logging.WARNING)
+    rows, cols = grid(module_count)
+    project = {
+        'name': f"Bench_{module_count}",
+        'largeArray': True,
+        'lod': lod,
+        'modules': {'rows': rows, 'cols': cols, 'width': MODULE_WIDTH,
+                    'height': MODULE_HEIGHT, 'thickness': MODULE_THICKNESS},
+        'gaps': {'row': SPACING, 'col': SPACING},
+        'plate': {'thickness': 50, 'offset': 0},
+        'roof': {'createSecondSide': second_side, 'angle': 15, 'ridgeHeight': 1000},
+        'placement': {'x': 0, 'y': 0, 'z': 0},
+    }
+    return lambda: generator.generate_solar_array(project)
+
+
+CASES = {
+    'auto_array': _auto_array_case(),
+    'auto_array_plan': _auto_array_case(plan_symbols=True),
+    'system': _system_case("SolarModuleArray/AutoArray_full.py"),
+    'system_profiles': _system_case("SolarModuleArray/AutoArray_full_real_profiles.py"),
+    'system_merged': _system_case("SolarModuleArray/AutoArray_full.py", merge_members=True),
+    'system_profiles_merged': _system_case("SolarModuleArray/AutoArray_full_real_profiles.py",
+                                           merge_members=True),
+    'system_plan': _system_case("SolarModuleArray/AutoArray_full.py", plan_symbols=True),
+    'roof_one_side': _roof_case(False),
+    'roof_two_sides': _roof_case(True),
+    'roof_two_sides_plan': _roof_case(True, plan_symbols=True),
+    'pv_color': _pv_color_case(),
+    'pv_color_plan': _pv_color_case(plan_symbols=True),
+    'generate_solar_array': _generate_case(False),
+    'generate_solar_array_roof': _generate_case(True),
+}
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def measure(case_name, module_count, repeat, lod=FULL):
+    """Run one case at one size and level of detail, return its result record"""
+    create = CASES[case_name](module_count, lod)
+
+    # Wall time without tracing overhead
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = create()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        element_count = count_elements(result)
+        del result
+
+    if element_count == 0:
+        raise RuntimeError(f"{case_name} created no elements for {module_count} modules")
+
+    # Memory in a separate, traced run
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = create()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    allocations = sys.getallocatedblocks() - blocks_before
+    del result
+
+    return {
+        'case': case_name,
+        'modules': module_count,
+        'lod': lod,
+        'seconds': round(best, 6),
+        'elements': element_count,
+        'allocations': allocations,
+        'retained_mb': round(retained / 2 ** 20, 2),
+        'peak_mb': round(peak / 2 ** 20, 2),
+    }
+
+
+def git_revision():
+    """Short hash of HEAD, None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def print_results(results):
+    print(f"{'case':<26} {'modules':>8} {'lod':>5} {'time (s)':>9} {'elements':>9} "
+          f"{'allocations':>12} {'retained (MB)':>14} {'peak (MB)':>10}")
+    for r in results:
+        print(f"{r['case']:<26} {r['modules']:>8} {r.get('lod', FULL):>5} {r['seconds']:>9.4f} "
+              f"{r['elements']:>9} {r['allocations']:>12} {r['retained_mb']:>14.2f} {r['peak_mb']:>10.2f}")
+
+
+def compare_results(results, baseline, threshold):
+    """
+    Print time and peak memory against a baseline run
+
+    Returns:
+        int: Number of regressions above threshold
+    """
+    # Runs saved before levels of detail existed are full detail
+    previous = {(r['case'], r['modules'], r.get('lod', FULL)): r for r in baseline['results']}
+    regressions = 0
+
+    print(f"\nCompared with {baseline['meta'].get('revision') or 'baseline'} "
+          f"(threshold {threshold:.0%})")
+    print(f"{'case':<26} {'modules':>8} {'lod':>5} {'time':>9} {'peak':>9}")
+    for r in results:
+        old = previous.get((r['case'], r['modules'], r['lod']))
+        if old is None:
+            print(f"{r['case']:<26} {r['modules']:>8} {r['lod']:>5} {'new':>9} {'new':>9}")
+            continue
+
+        time_change = r['seconds'] / old['seconds'] - 1 if old['seconds'] else 0.0
+        peak_change = r['peak_mb'] / old['peak_mb'] - 1 if old['peak_mb'] else 0.0
+        slower = time_change > threshold and r['seconds'] - old['seconds'] > NOISE_SECONDS
+        larger = peak_change > threshold and r['peak_mb'] - old['peak_mb'] > NOISE_MB
+        flag = ""
+        if slower or larger:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{r['case']:<26} {r['modules']:>8} {r['lod']:>5} {time_change:>+9.1%} {peak_change:>+9.1%}{flag}")
+
+    return regressions
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the solar creators on the headless backend")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Module counts per side (default: %(default)s)")
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES),
+                        help="Cases to run (default: all)")
+    parser.add_argument('--lods', nargs='+', choices=LEVELS, default=[FULL],
+                        help="Levels of detail to run every case at (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="Timed runs per case and size, the best is reported")
+    parser.add_argument('--output', help="Save the results to this JSON file")
+    parser.add_argument('--compare', help="JSON file of an earlier run to compare with")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative increase counted as regression (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    backend = install_backend()
+
+    results = []
+    for case_name in args.cases:
+        for lod in args.lods:
+            for module_count in args.sizes:
+                results.append(measure(case_name, module_count, args.repeat, lod))
+                print(f"  {case_name} {lod} {module_count}: {results[-1]['seconds']:.4f} s",
+                      file=sys.stderr)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'backend': backend,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare_results(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Test setup: SolarCommon and the automation script run on the headless
+stand-ins (see SolarCommon.backend), no Allplan needed.
+"""
+
+import os
+import sys
+
+import pytest
+
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(REPO_PATH, "PythonPartsScripts"), os.path.join(REPO_PATH, "auto_generate")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from SolarCommon.backend import install_backend, HEADLESS
+
+install_backend(HEADLESS)
+
+
+@pytest.fixture(scope="session")
+def solar(tmp_path_factory):
+    """auto_generate_solar, with its log file in a temporary directory"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("run"))
+    try:
+        import auto_generate_solar
+    finally:
+        os.chdir(cwd)
+    return auto_generate_solar
+
+
+@pytest.fixture
+def project():
+    """Small single-side project configuration"""
+    return {
+        'name': "A",
+        'modules': {'rows': 2, 'cols': 3, 'width': 1000, 'height': 2000, 'thickness': 35},
+        'gaps': {'row': 50, 'col': 20},
+        'plate': {'thickness': 50, 'offset': 100},
+        'roof': {'createSecondSide': False, 'angle': 0, 'ridgeHeight': 0},
+        'placement': {'x': 0, 'y': 0, 'z': 0},
+    }
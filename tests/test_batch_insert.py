@@ -0,0 +1,80 @@
+"""BatchInserter against a fake NemAll_Python_BaseElements that counts calls"""
+
+import pytest
+
+from NemAll_Python_IFW_ElementAdapter import DocumentAdapter
+
+
+class FakeBaseElements:
+    """CreateElements/DeleteElements on a headless document, counting the calls"""
+
+    def __init__(self, fail_on_call=None):
+        self.create_calls = []  # element count per CreateElements call
+        self.delete_calls = 0
+        self.fail_on_call = fail_on_call
+
+    def CreateElements(self, doc, insertion_matrix, model_elements, model_uuids, asso_ref_obj):
+        self.create_calls.append(len(model_elements))
+        if len(self.create_calls) == self.fail_on_call:
+            raise RuntimeError("insertion failed")
+        return doc.add_elements(insertion_matrix, model_elements)
+
+    def DeleteElements(self, doc, elements):
+        self.delete_calls += 1
+        return doc.delete_elements(elements)
+
+
+@pytest.fixture
+def doc():
+    return DocumentAdapter("Test")
+
+
+def test_single_call_on_flush(solar, doc):
+    fake = FakeBaseElements()
+    inserter = solar.BatchInserter(doc, base_elements=fake)
+    inserter.add("A", ["a"] * 4)
+    inserter.add("B", ["b"] * 3)
+    assert fake.create_calls == []
+
+    inserter.flush()
+    assert fake.create_calls == [7]
+    assert inserter.call_count == 1
+    assert inserter.inserted_count == 7
+    assert [len(inserter.created[name]) for name in ("A", "B")] == [4, 3]
+    assert doc.element_count == 7
+
+
+def test_chunk_size_splits_calls(solar, doc):
+    fake = FakeBaseElements()
+    inserter = solar.BatchInserter(doc, chunk_size=3, base_elements=fake)
+    inserter.add("A", ["a"] * 4)
+    inserter.add("B", ["b"] * 4)
+    inserter.flush()
+
+    assert fake.create_calls == [3, 3, 2]
+    assert [len(inserter.created[name]) for name in ("A", "B")] == [4, 4]
+    assert doc.element_count == 8
+
+
+def test_failed_call_removes_whole_projects(solar, doc):
+    # Chunks: [A A A] [A B B] [B C C] [C] - the second call fails
+    fake = FakeBaseElements(fail_on_call=2)
+    inserter = solar.BatchInserter(doc, chunk_size=3, base_elements=fake)
+    inserter.add("A", ["a"] * 4)
+    inserter.add("B", ["b"] * 4)
+    inserter.add("C", ["c"] * 3)
+    inserter.flush()
+
+    # A and B had elements in the failed call: the A chunk committed before is
+    # deleted again and the rest of B is dropped; C is inserted normally
+    assert inserter.failed_projects == {"A", "B"}
+    assert fake.delete_calls == 1
+    assert fake.create_calls == [3, 3, 3]
+    assert "A" not in inserter.created and "B" not in inserter.created
+    assert len(inserter.created["C"]) == 3
+    assert doc.element_count == 3
+
+    # Later elements of a failed project are ignored
+    inserter.add("A", ["a"])
+    inserter.flush()
+    assert fake.create_calls == [3, 3, 3]
@@ -0,0 +1,35 @@
+"""Bill of materials from the parameters and from already computed blocks"""
+
+import pytest
+
+from SolarCommon.bom import blocks_bom, system_bom
+from SolarCommon.layout import fit_grid
+from SolarCommon.packing import PanelBlock, pack_panels
+
+SURFACE = (30000, 20000)
+PANEL = (1134, 1722, 23)   # width, height, spacing (mm)
+STRUCTURE = (35, 40, 40, 30, 20)  # panel thickness, gutter width/height, profile, rung (mm)
+
+
+def lines(bom):
+    return [line.to_dict() for line in bom.items]
+
+
+def test_grid_bom_counts():
+    bom = system_bom(*SURFACE, *PANEL, *STRUCTURE)
+    grid = fit_grid(*SURFACE, *PANEL)
+    assert bom.module_count == grid.panel_count
+    assert bom.get('rung').count == 2 * grid.panel_count
+    assert bom.get('profile').count == grid.rows + 1
+    assert bom.get('profile').length == pytest.approx((grid.rows + 1) * grid.used_width / 1000)
+
+
+@pytest.mark.parametrize('mixed', [False, True])
+def test_blocks_bom_matches_system_bom(mixed):
+    if mixed:
+        blocks = pack_panels(*SURFACE, *PANEL).blocks
+    else:
+        blocks = [PanelBlock(0.0, 0.0, False, PANEL[0], PANEL[1], fit_grid(*SURFACE, *PANEL))]
+    spacing = PANEL[2]
+    assert (lines(blocks_bom(blocks, spacing, *STRUCTURE)) ==
+            lines(system_bom(*SURFACE, *PANEL, *STRUCTURE, mixed_orientation=mixed)))
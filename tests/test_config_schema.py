@@ -0,0 +1,19 @@
+"""Duplicate project names, whole config and streamed"""
+
+import pytest
+
+from SolarCommon.config_schema import ConfigError, check_config, unique_projects
+
+
+def test_check_config_reports_duplicate_names(project):
+    errors = check_config({'projects': [project, dict(project), dict(project, name="B")]})
+    assert [str(error) for error in errors] == ["$.projects[1].name: duplicate of $.projects[0].name 'A'"]
+
+
+def test_unique_projects_rejects_a_repeated_name(project):
+    projects = [project, dict(project, name="B", enabled=False), dict(project, name="B")]
+    stream = unique_projects(iter(projects))
+    assert next(stream) is projects[0]
+    assert next(stream) is projects[1]
+    with pytest.raises(ConfigError, match=r"\$\.projects\[2\]\.name: duplicate of \$\.projects\[1\]\.name 'B'"):
+        next(stream)
@@ -0,0 +1,103 @@
+"""Layout maths of SolarCommon.layout"""
+
+import math
+
+import numpy as np
+import pytest
+
+from SolarCommon.layout import (FRAME_THICKNESS, block_grid, compute_array_layout,
+                                compute_project_layout, fit_grid, merge_runs, module_origins,
+                                roof_second_side_matrix, roof_side_transforms, transform_points,
+                                translation_matrix)
+
+
+def test_module_origins_row_major():
+    origins = module_origins(2, 3, 10.0, 20.0, z=5.0)
+    assert origins.tolist() == [[0, 0, 5], [10, 0, 5], [20, 0, 5],
+                                [0, 20, 5], [10, 20, 5], [20, 20, 5]]
+
+
+def test_compute_array_layout_boxes():
+    layout = compute_array_layout(2, 3, 1000, 2000, 35, 50, 20, 50, 100)
+
+    assert layout.module_count == 6
+    assert layout.plate_size == (3 * 1000 + 2 * 20, 2 * 2000 + 50, 50)
+    assert layout.plate[0].tolist() == [0, 0, 100]
+
+    # Last module: column 2, row 1, on top of the plate
+    frame = layout.frames[-1]
+    assert frame[0].tolist() == [2 * 1020, 2050, 150]
+    assert frame[1].tolist() == [2 * 1020 + 1000, 2050 + 2000, 150 + FRAME_THICKNESS]
+
+    # PV layer inset by half the frame thickness, from the frame top to the module top
+    inset = FRAME_THICKNESS / 2
+    pv = layout.pvs[-1]
+    assert pv[0].tolist() == [2 * 1020 + inset, 2050 + inset, 150 + FRAME_THICKNESS]
+    assert pv[1].tolist() == [2 * 1020 + 1000 - inset, 2050 + 2000 - inset, 150 + 35]
+
+
+def test_compute_project_layout_matches_parameters(project):
+    layout = compute_project_layout(project)
+    expected = compute_array_layout(2, 3, 1000, 2000, 35, 50, 20, 50, 100)
+    assert (layout.rows, layout.cols) == (2, 3)
+    np.testing.assert_array_equal(layout.frames, expected.frames)
+    np.testing.assert_array_equal(layout.pvs, expected.pvs)
+
+
+def test_translated_moves_every_box():
+    layout = compute_array_layout(1, 2, 100, 200, 35, 0, 10, 5, 0)
+    moved = layout.translated(1, 2, 3)
+    np.testing.assert_array_equal(moved.plate, layout.plate + [1, 2, 3])
+    np.testing.assert_array_equal(moved.frames, layout.frames + [1, 2, 3])
+    np.testing.assert_array_equal(moved.pvs, layout.pvs + [1, 2, 3])
+
+
+def test_fit_grid_counts_panels_that_fit():
+    fit = fit_grid(1050.0, 420.0, 200.0, 100.0, 10.0)
+    assert (fit.rows, fit.cols) == (3, 5)
+    assert fit.panel_count == 15
+    assert fit.used_width == 5 * 200 + 4 * 10
+    assert not fit.origins.flags.writeable
+
+
+def test_block_grid_fills_every_cell():
+    grid = block_grid(2, 4, 200.0, 100.0, 10.0)
+    assert grid.panel_count == 8
+    assert grid.used_height == 2 * 100 + 10
+
+
+def test_merge_runs_bridges_small_gaps():
+    segments = [[0, 0, 10], [0, 12, 20], [0, 30, 40], [5, 0, 10]]
+    runs = merge_runs(segments, gap=2)
+    assert runs.tolist() == [[0, 0, 20], [0, 30, 40], [5, 0, 10]]
+
+
+def test_merge_runs_empty():
+    assert merge_runs([], gap=1).shape == (0, 3)
+
+
+def test_transform_points_translation():
+    points = np.array([[0.0, 0.0, 0.0], [1.0, 2.0, 3.0]])
+    moved = transform_points(translation_matrix(10, 20, 30), points)
+    assert moved.tolist() == [[10, 20, 30], [11, 22, 33]]
+
+
+def test_roof_second_side_matrix_permutes_and_rotates():
+    matrix = roof_second_side_matrix(4050.0, 150.0, 0.0, 1000.0)
+    # Without a roof angle: X -> Y, Y -> Z, Z -> X, origin at the ridge
+    point = transform_points(matrix, np.array([[1.0, 2.0, 3.0]]))[0]
+    assert point.tolist() == pytest.approx([3.0, 4050.0 + 1.0, 150.0 + 1000.0 + 2.0])
+
+    tilted = roof_second_side_matrix(0.0, 0.0, 45.0, 0.0)
+    # Twice 45 degrees about X: the side's Y axis ends up along -Y
+    assert tilted[:3, :3] @ [0.0, 1.0, 0.0] == pytest.approx([0.0, -1.0, 0.0])
+    assert math.isclose(np.linalg.det(tilted[:3, :3]), 1.0)
+
+
+def test_roof_side_transforms(project):
+    assert len(roof_side_transforms(project)) == 1
+
+    project['roof'] = {'createSecondSide': True, 'angle': 15, 'ridgeHeight': 1000}
+    first, second = roof_side_transforms(project)
+    np.testing.assert_array_equal(first, np.eye(4))
+    np.testing.assert_allclose(second, roof_second_side_matrix(2 * 2000 + 50, 150, 15, 1000))
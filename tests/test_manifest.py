@@ -0,0 +1,175 @@
+"""Run manifest diff, checked on a headless document"""
+
+import copy
+
+import pytest
+
+from NemAll_Python_IFW_ElementAdapter import DocumentAdapter
+
+from SolarCommon.layout_cache import layout_key
+from SolarCommon.manifest import (ADDED, CHANGED, UNCHANGED, ManifestDiff, RunManifest,
+                                  diff_projects)
+
+
+@pytest.fixture
+def doc():
+    return DocumentAdapter("Test")
+
+
+def named(project, name, **placement):
+    project = copy.deepcopy(project)
+    project['name'] = name
+    project['placement'].update(placement)
+    return project
+
+
+def test_status(project):
+    manifest = RunManifest()
+    assert manifest.status(project) == ADDED
+
+    manifest.record(project, [])
+    assert manifest.status(project) == UNCHANGED
+
+    moved = named(project, "A", x=500)
+    assert manifest.status(moved) == CHANGED
+
+    resized = copy.deepcopy(project)
+    resized['modules']['rows'] = 3
+    assert manifest.status(resized) == CHANGED
+
+
+def test_diff_projects(project):
+    manifest = RunManifest()
+    for name in ("A", "B", "C"):
+        manifest.record(named(project, name), [])
+
+    projects = [named(project, "A"), named(project, "B", y=100), named(project, "D")]
+    diff = diff_projects(manifest, projects)
+
+    assert diff.unchanged == ["A"]
+    assert diff.changed == ["B"]
+    assert diff.added == ["D"]
+    assert diff.removed == ["C"]
+    assert diff.has_changes
+
+
+def test_save_and_load(project, tmp_path):
+    manifest_file = str(tmp_path / "manifest.json")
+    manifest = RunManifest("Test")
+    manifest.record(project, ["id"])
+    manifest.save(manifest_file)
+
+    loaded = RunManifest.load(manifest_file)
+    assert loaded.document == "Test"
+    assert loaded.projects == manifest.projects
+    assert RunManifest.load(str(tmp_path / "missing.json")).projects == {}
+
+
+def test_changed_project_replaces_its_elements(solar, doc, project):
+    manifest = RunManifest()
+    old = doc.add_elements(None, ["old"] * 2)
+    manifest.record(project, solar.element_ids(old))
+
+    moved = named(project, "A", x=500)
+    diff = ManifestDiff()
+    assert list(solar.select_changed_projects([(0, moved)], manifest, diff)) == [(0, moved)]
+    assert diff.changed == ["A"]
+
+    new = doc.add_elements(None, ["new"] * 3)
+    solar.record_project(doc, manifest, moved, new)
+
+    assert sorted(doc.elements.values()) == ["new"] * 3
+    assert manifest.projects["A"]['elements'] == solar.element_ids(new)
+    assert manifest.status(moved) == UNCHANGED
+
+
+def test_unchanged_project_is_skipped(solar, doc, project):
+    manifest = RunManifest()
+    manifest.record(project, solar.element_ids(doc.add_elements(None, ["a"])))
+
+    diff = ManifestDiff()
+    assert list(solar.select_changed_projects([(0, project)], manifest, diff)) == []
+    assert diff.unchanged == ["A"]
+    assert not diff.has_changes
+    assert doc.element_count == 1
+
+
+def test_removed_project_is_deleted(solar, doc, project):
+    manifest = RunManifest()
+    manifest.record(project, solar.element_ids(doc.add_elements(None, ["a"] * 2)))
+    kept = named(project, "B")
+    manifest.record(kept, solar.element_ids(doc.add_elements(None, ["b"])))
+
+    diff = ManifestDiff()
+    list(solar.select_changed_projects([(1, kept)], manifest, diff))
+    assert solar.delete_removed_projects(doc, manifest, diff) == 0
+
+    assert diff.removed == ["A"]
+    assert list(manifest.projects) == ["B"]
+    assert list(doc.elements.values()) == ["b"]
+
+
+def test_manifest_of_another_document_is_ignored(solar, doc, project, tmp_path):
+    manifest_file = str(tmp_path / "manifest.json")
+    other = RunManifest("Other")
+    other.record(project, ["id"])
+    other.save(manifest_file)
+
+    manifest = solar.load_manifest(manifest_file, doc)
+    assert manifest.document == "Test"
+    assert manifest.projects == {}
+    assert manifest.status(project) == ADDED
+
+
+def test_invalid_streamed_project_is_not_removed(solar, doc, project):
+    manifest = RunManifest()
+    manifest.record(project, solar.element_ids(doc.add_elements(None, ["a"] * 2)))
+
+    broken = copy.deepcopy(project)
+    del broken['modules']
+    diff = ManifestDiff()
+    assert list(solar.select_changed_projects([(0, broken)], manifest, diff)) == [(0, broken)]
+    assert diff.invalid == ["A"]
+
+    assert solar.delete_removed_projects(doc, manifest, diff) == 0
+    assert diff.removed == []
+    assert list(manifest.projects) == ["A"]
+    assert doc.element_count == 2
+
+
+def test_diff_projects_keeps_invalid_projects(project):
+    manifest = RunManifest()
+    manifest.record(project, [])
+    broken = copy.deepcopy(project)
+    del broken['placement']
+
+    diff = diff_projects(manifest, [broken])
+    assert diff.invalid == ["A"]
+    assert diff.removed == []
+
+
+@pytest.mark.parametrize('spelling', [None, 0, "0", "full", "Full"])
+def test_lod_spelling_does_not_change_the_hash(project, spelling):
+    manifest = RunManifest()
+    manifest.record(project, [])
+    respelled = copy.deepcopy(project)
+    if spelling is not None:
+        respelled['lod'] = spelling
+    assert manifest.status(respelled) == UNCHANGED
+
+
+def test_lod_change_changes_the_hash(project):
+    manifest = RunManifest()
+    manifest.record(dict(project, lod="box"), [])
+    assert manifest.status(dict(project, lod=1)) == UNCHANGED
+    assert manifest.status(dict(project, lod="slab")) == CHANGED
+
+
+def test_roof_change_changes_the_project_not_the_layout(project):
+    manifest = RunManifest()
+    manifest.record(project, [])
+    roofed = copy.deepcopy(project)
+    roofed['roof'] = {'createSecondSide': True, 'angle': 15, 'ridgeHeight': 1000}
+
+    assert layout_key(roofed) == layout_key(project)
+    assert manifest.status(roofed) == CHANGED
@@ -0,0 +1,28 @@
+"""Mixed-orientation packing: time budget and memoization"""
+
+from SolarCommon.packing import pack_panels
+
+PANEL = (1134, 1722, 23)  # width, height, spacing (mm)
+
+
+def test_packing_is_never_worse_than_the_grid():
+    result = pack_panels(8000, 6000, *PANEL)
+    assert result.complete
+    assert result.panel_count == sum(block.grid.panel_count for block in result.blocks)
+    assert result.panel_count >= result.grid_count
+
+
+def test_time_budget_covers_the_whole_search():
+    # Without a budget this search takes most of a second; the loose bound
+    # only catches work done outside the deadline checks
+    pack_panels.cache_clear()
+    result = pack_panels(85000, 50000, *PANEL, 0.02)
+    assert not result.complete
+    assert result.panel_count >= result.grid_count
+    assert result.elapsed < 10 * 0.02
+
+
+def test_only_finished_searches_are_memoized():
+    pack_panels.cache_clear()
+    assert pack_panels(8000, 6000, *PANEL) is pack_panels(8000, 6000, *PANEL)
+    assert pack_panels(85000, 50000, *PANEL, 0.0) is not pack_panels(85000, 50000, *PANEL, 0.0)
@@ -0,0 +1,21 @@
+"""Polygonal surfaces: runs of panels cut by obstacles"""
+
+from SolarCommon.surface import fit_surface, parse_polygon, parse_polygons
+
+SQUARE = parse_polygon("0,0; 10000,0; 10000,10000; 0,10000")
+
+
+def test_row_spans_without_obstacle():
+    fit = fit_surface(SQUARE, (), 1000.0, 1700.0, 20.0)
+    spans = fit.row_spans(1000.0, 20.0)
+    assert sorted(spans) == list(range(fit.grid.rows))
+    assert all(row == [(0.0, 8 * 1020.0 + 1000.0)] for row in spans.values())
+
+
+def test_row_spans_are_cut_by_an_obstacle():
+    obstacles = parse_polygons("4000,-10; 6000,-10; 6000,10010; 4000,10010")
+    fit = fit_surface(SQUARE, obstacles, 1000.0, 1700.0, 20.0)
+    for runs in fit.row_spans(1000.0, 20.0).values():
+        assert len(runs) == 2
+        (_, left_end), (right_start, _) = runs
+        assert left_end <= 4000.0 and right_start >= 6000.0